@@ -0,0 +1,61 @@
+from argparse import ArgumentParser
+import sys
+from src.benchmark.runner import compare, format_comparison, format_result, load_baseline, run_suite, write_report
+from src.benchmark.workloads import SUITES, get_suite
+from src.turing_machine.engines import ENGINES
+
+if __name__ != "__main__":
+    exit(1)
+
+parser = ArgumentParser(description="Benchmarks of the Turing machine engines on the generated workloads")
+parser.add_argument("--suite", type=str, default="quick", choices=SUITES, help="workloads to run: 'quick' (small sizes) or 'full' (the scaling runs, up to 10^5 cells and states) (default: quick)")
+parser.add_argument("--engine", type=str, action="append", choices=list(ENGINES.keys()), help="engine to benchmark, can be repeated (default: all engines)")
+parser.add_argument("--workload", type=str, action="append", help="run only the workloads with the name (search, counter, busy_beaver, copy, generated), can be repeated")
+parser.add_argument("--repeat", type=int, default=3, help="number of the timed runs of each case (default: 3)")
+parser.add_argument("--no-sweeps", action="store_true", help="execute every step of the sweeps (the sweep acceleration is enabled by default, as in main.py)")
+parser.add_argument("--in-process", action="store_true", help="run all the cases in this process (by default each case runs in the new process, so the peak RSS is measured per case)")
+parser.add_argument("--output", type=str, help="file for the JSON report (default: the report is not written)")
+parser.add_argument("--baseline", type=str, help="JSON report of the previous run to compare the steps per second with")
+parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown against the baseline reported as the regression (default: 0.1)")
+parser.add_argument("--fail-on-regression", action="store_true", help="exit with the code 3 if any of the cases regressed against the baseline")
+args = parser.parse_args()
+
+if args.repeat <= 0:
+    print(f"Unexpected repeat value {args.repeat}. The value must be greater than 0")
+    exit(1)
+
+baseline = None
+if args.baseline is not None:
+    try:
+        with open(args.baseline) as baseline_file:
+            baseline = load_baseline(baseline_file)
+    except Exception as e:
+        print(f"Failed to read the baseline: {e}")
+        exit(1)
+
+workloads = [workload for workload in get_suite(args.suite) if args.workload is None or workload.name in args.workload]
+engines = args.engine or list(ENGINES.keys())
+try:
+    results = run_suite(workloads, engines, args.repeat, not args.no_sweeps, not args.in_process, lambda result: print(format_result(result), flush=True))
+except Exception as e:
+    print(f"Benchmark failed: {e}")
+    exit(2)
+
+comparisons = None
+if baseline is not None:
+    comparisons = compare(results, baseline, args.threshold)
+    print("--------------------------------------------------------------------------------")
+    print("Comparison with the baseline:")
+    for comparison in comparisons:
+        print(format_comparison(comparison))
+
+if args.output is not None:
+    try:
+        with open(args.output, "w") as output:
+            write_report(output, args.suite, args.repeat, results, comparisons)
+    except OSError as e:
+        print(f"Failed to write the report: {e}")
+        exit(1)
+
+if args.fail_on_regression and comparisons is not None and any(comparison.regression for comparison in comparisons):
+    exit(3)
@@ -1,6 +1,11 @@
 from argparse import ArgumentParser
-from src.config.config import load_from_file, load_from_string
-from src.turing_machine.ast_turing_machine import ASTTuringMachine
+import sys
+from src.config.config import load_from_string, read_config_file
+from src.turing_machine.engines import ENGINES, create_machine
+from src.turing_machine.governor import ResourceBudget
+from src.turing_machine.profiler import PROFILE_FORMATS, Profiler
+from src.turing_machine.snapshot import COMPRESSIONS, Checkpointer, load_snapshot
+from src.turing_machine.trace import TRACE_COMPRESSIONS, TraceRecorder
 
 if __name__ != "__main__":
     exit(1)
@@ -9,28 +14,171 @@ parser = ArgumentParser(description="Turing machine created as an exercise for t
 parser.add_argument("--input", type=str, help="Turing machine specification in text format")
 parser.add_argument("--file", type=str, help="configuration file with the Turing machine specification")
 parser.add_argument("--debug", type=int, help="run in debug mode [DEBUG represents the debug level; available options: 0, 1 (default: 0)]")
+parser.add_argument("--engine", type=str, default="interpreter", choices=list(ENGINES.keys()), help="execution engine: 'interpreter' walks the program tree, 'codegen' runs the program compiled into Python code (default: interpreter)")
+parser.add_argument("--cache-size", type=int, help="maximum number of entries in the transition cache [0 disables the cache] (default: unbounded)")
+parser.add_argument("--max-tape-cells", type=int, help="maximum number of cells of each tape (used only if the blank symbol is defined in the [tape] section)")
+parser.add_argument("--max-steps", type=int, help="maximum number of the machine steps (in batch mode it is applied to the inputs without the 'max_steps' value)")
+parser.add_argument("--timeout", type=float, help="maximum wall-clock time of the machine run in seconds (applied to each of the batch inputs)")
+parser.add_argument("--batch", type=str, help="JSONL file with the batch inputs (one JSON object per line: {\"tapes\": [[...], ...], \"max_steps\": N}); the program is run for each of the inputs")
+parser.add_argument("--output", type=str, help="JSONL file for the batch results (default: standard output)")
+parser.add_argument("--unordered", action="store_true", help="write the batch results in the completion order (default: input order)")
+parser.add_argument("--workers", type=int, help="number of the batch worker processes (default: number of available cores)")
+parser.add_argument("--chunk-size", type=int, default=64, help="number of the batch inputs sent to the worker at once (default: 64)")
+parser.add_argument("--detect-cycles", action="store_true", help="stop the machine when it enters the cycle of configurations (the program would never stop)")
+parser.add_argument("--no-cache", action="store_true", help="compile the config even if it was compiled before (the compiled configs are cached in the directory set with the TURING_MACHINE_CACHE_DIR environment variable, default: ~/.cache/turing_machine)")
+parser.add_argument("--checkpoint", type=str, help="file for the periodic snapshots of the machine (saved every --checkpoint-steps steps or --checkpoint-interval seconds, and when the machine is stopped by the steps or time limit)")
+parser.add_argument("--checkpoint-steps", type=int, help="number of steps between the snapshots")
+parser.add_argument("--checkpoint-interval", type=float, help="wall-clock time between the snapshots in seconds (default: 60, if --checkpoint-steps is not set)")
+parser.add_argument("--checkpoint-compression", type=str, default="none", choices=COMPRESSIONS, help="compression of the snapshots (default: none)")
+parser.add_argument("--resume", type=str, help="snapshot file to resume the machine from (the snapshot must be taken from the same program)")
+parser.add_argument("--profile", action="store_true", help="record the visits, the time and the executed transitions of each state and print the report of the hottest states after the machine stops")
+parser.add_argument("--profile-output", type=str, help="file for the profile (written in the --profile-format format)")
+parser.add_argument("--profile-format", type=str, default="json", choices=PROFILE_FORMATS, help="format of the --profile-output file: 'json' or 'collapsed' stacks for the flame graph tools (default: json)")
+parser.add_argument("--trace", type=str, help="file for the binary trace of the run (the state, the written cells and the head moves of each step, see --replay)")
+parser.add_argument("--trace-compression", type=str, default="none", choices=TRACE_COMPRESSIONS, help="compression of the trace chunks (default: none)")
+parser.add_argument("--trace-sample", type=int, default=1, help="record the configuration every TRACE_SAMPLE steps (default: 1, every step)")
+parser.add_argument("--trace-keyframe", type=int, default=65536, help="number of the trace records between the keyframes with the whole tapes (default: 65536)")
+parser.add_argument("--replay", type=str, help="trace file to inspect (prints the recorded steps and the configuration at --replay-step)")
+parser.add_argument("--replay-step", type=int, help="step of the trace to display (the last recorded step before it, if the trace is sampled)")
+parser.add_argument("--no-minimize", action="store_true", help="keep the unreachable and the equivalent states of the program (they are removed by default, except in debug mode)")
+parser.add_argument("--minimization-report", action="store_true", help="print the states removed by the program minimization")
+parser.add_argument("--status-window", type=int, default=64, help="number of the cells displayed on each side of the heads in the machine status [0 displays the whole tapes] (default: 64)")
+parser.add_argument("--cache-stats", action="store_true", help="print the transition cache statistics after the machine finishes")
 
 args = parser.parse_args()
 
+if args.replay is not None:
+    from src.turing_machine.trace_replay import TraceReader
+    try:
+        with TraceReader.open(args.replay) as reader:
+            print(f"Trace of {len(reader.header.state_names)} states and {reader.header.tape_count} tapes, steps {reader.get_first_step()}-{reader.get_last_step()} "
+                  f"({len(reader.chunks)} keyframes, every {reader.header.sample_interval} step(s) recorded)")
+            if args.replay_step is not None:
+                print(reader.seek(args.replay_step))
+    except Exception as e:
+        print(f"Failed to replay the trace: {e}")
+        exit(1)
+    exit(0)
+
 if args.input is None and args.file is None:
     print("No Turing machine config specified.\nUse option -h[--help] to check all the available options.")
     exit(1)
 
-config = None
+config_source = None
 if args.file is not None:
-    config = load_from_file(args.file)
+    config_source = read_config_file(args.file)
 else:
-    config = load_from_string(args.input)
+    config_source = args.input
+
+# in debug mode the program is executed as it's written
+config = None
+if config_source is not None:
+    config = load_from_string(config_source, use_cache=not args.no_cache, minimize=not args.no_minimize and args.debug is None)
 
 if config is None:
     print("Failed to load config")
     exit(1)
 
-machine = ASTTuringMachine(config, args.debug is not None and args.debug == 1)
+if args.minimization_report:
+    if config.program.minimization is None:
+        print("Program was not minimized")
+    else:
+        print(config.program.minimization)
+
+if args.cache_size is not None and args.cache_size < 0:
+    print(f"Unexpected cache size value {args.cache_size}. The value must be greater or equal to 0")
+    exit(1)
+
+if args.max_tape_cells is not None and args.max_tape_cells <= 0:
+    print(f"Unexpected max tape cells value {args.max_tape_cells}. The value must be greater than 0")
+    exit(1)
+
+if args.max_steps is not None and args.max_steps < 0:
+    print(f"Unexpected max steps value {args.max_steps}. The value must be greater or equal to 0")
+    exit(1)
+
+if args.timeout is not None and args.timeout <= 0:
+    print(f"Unexpected timeout value {args.timeout}. The value must be greater than 0")
+    exit(1)
+
+budget = ResourceBudget(max_steps=args.max_steps, timeout=args.timeout, max_tape_cells=args.max_tape_cells)
+
+checkpointer = None
+if args.checkpoint is not None:
+    checkpoint_interval = args.checkpoint_interval
+    if checkpoint_interval is None and args.checkpoint_steps is None:
+        checkpoint_interval = 60
+    try:
+        checkpointer = Checkpointer(args.checkpoint, args.checkpoint_steps, checkpoint_interval, args.checkpoint_compression)
+    except Exception as e:
+        print(f"{e}")
+        exit(1)
+
+profiler = None
+if args.profile:
+    if args.debug is not None or args.batch is not None or args.detect_cycles:
+        print("Option --profile can't be used with --debug, --batch or --detect-cycles")
+        exit(1)
+    profiler = Profiler(config.program)
+elif args.profile_output is not None:
+    print("Option --profile-output requires the --profile option")
+    exit(1)
+
+recorder = None
+if args.trace is not None:
+    if args.debug is not None or args.batch is not None or args.detect_cycles or args.profile:
+        print("Option --trace can't be used with --debug, --batch, --detect-cycles or --profile")
+        exit(1)
+    try:
+        recorder = TraceRecorder.open(args.trace, args.trace_compression, args.trace_sample, args.trace_keyframe)
+    except Exception as e:
+        print(f"{e}")
+        exit(1)
+
+if args.batch is not None:
+    from src.turing_machine.batch_runner import run_batch
+    if args.workers is not None and args.workers <= 0:
+        print(f"Unexpected workers value {args.workers}. The value must be greater than 0")
+        exit(1)
+    if args.chunk_size <= 0:
+        print(f"Unexpected chunk size value {args.chunk_size}. The value must be greater than 0")
+        exit(1)
+    try:
+        with open(args.batch) as batch_input:
+            if args.output is not None:
+                with open(args.output, "w") as batch_output:
+                    run_batch(config_source, batch_input, batch_output, not args.unordered, args.workers, args.chunk_size, args.cache_size, args.max_tape_cells, args.engine, args.detect_cycles, budget, not args.no_cache)
+            else:
+                run_batch(config_source, batch_input, sys.stdout, not args.unordered, args.workers, args.chunk_size, args.cache_size, args.max_tape_cells, args.engine, args.detect_cycles, budget, not args.no_cache)
+    except Exception as e:
+        print(f"Error occurred during batch runtime: {e}", file=sys.stderr)
+        exit(2)
+    exit(0)
 
-print("Machine initial state:")
+if args.status_window < 0:
+    print(f"Unexpected status window value {args.status_window}. The value must be greater or equal to 0")
+    exit(1)
+
+# in debug mode every step is displayed, so the sweep steps can't be skipped
+try:
+    machine = create_machine(config, args.engine, args.debug is not None and args.debug == 1, args.cache_size, args.max_tape_cells, args.debug is None)
+except Exception as e:
+    print(f"Failed to create the machine: {e}")
+    exit(1)
+machine.status_renderer.window = args.status_window or None
+
+if args.resume is not None:
+    try:
+        load_snapshot(machine, args.resume)
+    except Exception as e:
+        print(f"Failed to resume the machine from the snapshot: {e}")
+        exit(1)
+    print(f"Machine resumed at step {machine.steps}:")
+else:
+    print("Machine initial state:")
 machine.print_status()
 
+result = None
 try:
     if args.debug is not None:
         if args.debug not in [0, 1]:
@@ -38,12 +186,42 @@ try:
             exit(1)
         machine.run_tick()
     else:
-        machine.run_auto()
+        try:
+            result = machine.run_governed(budget, args.detect_cycles, checkpointer, profiler, recorder)
+        finally:
+            # the trace is readable up to the failed step
+            if recorder is not None:
+                recorder.close()
 except Exception as e:
     print(f"Error occurred during machine runtime: {e}")
     exit(2)
 
+if profiler is not None:
+    print("--------------------------------------------------------------------------------")
+    print(profiler.report())
+    if args.profile_output is not None:
+        try:
+            with open(args.profile_output, "w") as profile_output:
+                if args.profile_format == "json":
+                    profiler.write_json(profile_output)
+                else:
+                    profiler.write_collapsed(profile_output)
+        except OSError as e:
+            print(f"Failed to write the profile: {e}")
+            exit(1)
+
+if result is not None and not result.finished:
+    print("--------------------------------------------------------------------------------")
+    print(f"{result}. Machine stopped in state:")
+    machine.print_status()
+    exit(3 if result.cycle is not None else 4)
+
 print("--------------------------------------------------------------------------------")
 print("Machine finished! Final state:")
 machine.print_status()
 
+if args.cache_stats:
+    if machine.transition_cache is None:
+        print("Transition cache: disabled")
+    else:
+        print(f"Transition cache: {machine.transition_cache}")
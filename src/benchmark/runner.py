@@ -0,0 +1,169 @@
+import json
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, List, TextIO
+from src.benchmark.workloads import Workload
+from src.config.config import load_from_string
+from src.turing_machine.engines import create_machine
+
+# the peak RSS is not measured on the platforms without the resource module
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# the statistics of the repeated runs are computed with NumPy, if it's installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BENCHMARK_FORMAT_VERSION = 1
+
+# result of the workload run on the engine
+#    first_step_time - time from the config source to the first executed step (compilation, machine creation and the step)
+#    run_times - time of each of the repeated runs (from the initial configuration)
+#    peak_rss - peak resident set size of the process in bytes (of the worker process, if the case was run in isolation)
+#    tape_bytes - bytes allocated for the tapes after the run, tape_cells - number of the cells with the content (or under the heads)
+@dataclass
+class BenchmarkResult:
+    workload: str
+    engine: str
+    finished: bool
+    state: str
+    steps: int
+    load_time: float
+    first_step_time: float
+    run_times: List[float]
+    steps_per_second: float
+    steps_per_second_stdev: float
+    peak_rss: int | None
+    tape_bytes: int
+    tape_cells: int
+    bytes_per_cell: float
+
+# change of the steps per second against the baseline (ratio > 1 - faster)
+@dataclass
+class BenchmarkComparison:
+    workload: str
+    engine: str
+    steps_per_second: float
+    baseline_steps_per_second: float
+    ratio: float
+    first_step_ratio: float
+    regression: bool
+
+def run_case(workload: Workload, engine: str, repeat: int = 3, accelerate_sweeps: bool = True) -> BenchmarkResult:
+    if repeat <= 0:
+        raise Exception(f"Benchmark repeat count must be greater than 0 (got {repeat})")
+    start = time.perf_counter()
+    config = load_from_string(workload.source, use_cache=False)
+    if config is None:
+        raise Exception(f"Failed to load the {workload.get_key()} workload")
+    load_time = time.perf_counter() - start
+    machine = create_machine(config, engine, accelerate_sweeps=accelerate_sweeps)
+    if machine.state not in machine.final_states:
+        machine.step()
+    first_step_time = time.perf_counter() - start
+
+    run_times = []
+    for _ in range(repeat):
+        machine = create_machine(config, engine, accelerate_sweeps=accelerate_sweeps)
+        start = time.perf_counter()
+        finished = machine.run_auto(workload.max_steps)
+        run_times.append(time.perf_counter() - start)
+    if finished and workload.final_state is not None and machine.state != workload.final_state:
+        raise Exception(f"Workload {workload.get_key()} finished in state {machine.state} on {engine} engine (expected {workload.final_state})")
+
+    tape_bytes = sum(memoryview(tape.cells).nbytes for tape in machine.tapes)
+    tape_cells = 0
+    for tape in machine.tapes:
+        begin, end = tape._get_content_range()
+        tape_cells += max(end, tape.head + 1) - min(begin, tape.head)
+    # the timer resolution limits the shortest run time
+    median, stdev = __summarize__([machine.steps / max(run_time, 1e-9) for run_time in run_times])
+    return BenchmarkResult(workload.get_key(), engine, finished, machine.state, machine.steps, load_time, first_step_time, run_times,
+                           median, stdev, __get_peak_rss__(), tape_bytes, tape_cells, tape_bytes / tape_cells)
+
+# runs every workload on every engine
+#    isolate - run each case in the new process (the peak RSS is measured per case, the cases don't share the warmed up caches)
+#    on_result - called with each of the results when it's ready
+def run_suite(workloads: List[Workload], engines: List[str], repeat: int = 3, accelerate_sweeps: bool = True, isolate: bool = True,
+              on_result: Callable[[BenchmarkResult], None] | None = None) -> List[BenchmarkResult]:
+    results = []
+    for workload in workloads:
+        for engine in engines:
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    result = executor.submit(run_case, workload, engine, repeat, accelerate_sweeps).result()
+            else:
+                result = run_case(workload, engine, repeat, accelerate_sweeps)
+            if on_result is not None:
+                on_result(result)
+            results.append(result)
+    return results
+
+# compares the results with the cases of the baseline report (the cases missing in the baseline are skipped)
+#    threshold - relative slowdown of the steps per second reported as the regression
+def compare(results: List[BenchmarkResult], baseline: dict, threshold: float = 0.1) -> List[BenchmarkComparison]:
+    baseline_results = {(result["workload"], result["engine"]): result for result in baseline.get("results", [])}
+    comparisons = []
+    for result in results:
+        baseline_result = baseline_results.get((result.workload, result.engine))
+        if baseline_result is None or baseline_result["steps_per_second"] <= 0:
+            continue
+        ratio = result.steps_per_second / baseline_result["steps_per_second"]
+        first_step_ratio = baseline_result["first_step_time"] / result.first_step_time if result.first_step_time > 0 else 0.0
+        comparisons.append(BenchmarkComparison(result.workload, result.engine, result.steps_per_second, baseline_result["steps_per_second"],
+                                               ratio, first_step_ratio, ratio < 1 - threshold))
+    return comparisons
+
+def load_baseline(file: TextIO) -> dict:
+    try:
+        baseline = json.load(file)
+    except ValueError as e:
+        raise Exception(f"Baseline is not a valid JSON: {e}")
+    if not isinstance(baseline, dict) or baseline.get("version") != BENCHMARK_FORMAT_VERSION:
+        raise Exception(f"Unsupported baseline format (expected version {BENCHMARK_FORMAT_VERSION})")
+    return baseline
+
+def write_report(file: TextIO, suite: str, repeat: int, results: List[BenchmarkResult], comparisons: List[BenchmarkComparison] | None = None):
+    report = {
+        "version": BENCHMARK_FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "platform": platform.platform(),
+        "numpy": None if numpy is None else numpy.__version__,
+        "suite": suite,
+        "repeat": repeat,
+        "results": [asdict(result) for result in results],
+    }
+    if comparisons is not None:
+        report["comparison"] = [asdict(comparison) for comparison in comparisons]
+    json.dump(report, file, indent=2)
+    file.write("\n")
+
+def format_result(result: BenchmarkResult) -> str:
+    rss = "-" if result.peak_rss is None else f"{result.peak_rss / 2 ** 20:.1f} MiB"
+    return (f"{result.workload:<32} {result.engine:<12} {result.steps:>10} steps {result.steps_per_second:>12.0f} steps/s "
+            f"first step {result.first_step_time * 1000:>9.1f} ms  rss {rss:>10}  {result.bytes_per_cell:.2f} B/cell")
+
+def format_comparison(comparison: BenchmarkComparison) -> str:
+    mark = "REGRESSION" if comparison.regression else ""
+    return f"{comparison.workload:<32} {comparison.engine:<12} {comparison.ratio:>6.2f}x steps/s  {comparison.first_step_ratio:>6.2f}x first step  {mark}"
+
+def __summarize__(values: List[float]) -> tuple[float, float]:
+    if numpy is not None:
+        return float(numpy.median(values)), float(numpy.std(values, ddof=1)) if len(values) > 1 else 0.0
+    return statistics.median(values), statistics.stdev(values) if len(values) > 1 else 0.0
+
+def __get_peak_rss__() -> int | None:
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
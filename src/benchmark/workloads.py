@@ -0,0 +1,185 @@
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "config.toml")
+
+# configuration of the benchmarked machine
+#    max_steps - the run is stopped after max_steps steps (None - the machine runs until it finishes)
+@dataclass
+class Workload:
+    name: str
+    params: Dict[str, int]
+    source: str
+    max_steps: int | None = None
+    # expected final state (if the machine finishes)
+    final_state: str | None = None
+
+    def get_key(self) -> str:
+        params = ",".join(f"{name}={value}" for name, value in self.params.items())
+        return f"{self.name}({params})"
+
+# the busy beaver champions (the most steps before halting): (state, read value) -> (written value, move, next state)
+BUSY_BEAVERS: Dict[int, Dict[tuple[str, str], tuple[str, str, str]]] = {
+    2: {
+        ("A", "0"): ("1", "MOV_R", "B"), ("A", "1"): ("1", "MOV_L", "B"),
+        ("B", "0"): ("1", "MOV_L", "A"), ("B", "1"): ("1", "MOV_R", "halt"),
+    },
+    3: {
+        ("A", "0"): ("1", "MOV_R", "B"), ("A", "1"): ("1", "MOV_R", "halt"),
+        ("B", "0"): ("1", "MOV_L", "B"), ("B", "1"): ("0", "MOV_R", "C"),
+        ("C", "0"): ("1", "MOV_L", "C"), ("C", "1"): ("1", "MOV_L", "A"),
+    },
+    4: {
+        ("A", "0"): ("1", "MOV_R", "B"), ("A", "1"): ("1", "MOV_L", "B"),
+        ("B", "0"): ("1", "MOV_L", "A"), ("B", "1"): ("0", "MOV_L", "C"),
+        ("C", "0"): ("1", "MOV_R", "halt"), ("C", "1"): ("1", "MOV_L", "D"),
+        ("D", "0"): ("1", "MOV_R", "D"), ("D", "1"): ("0", "MOV_R", "A"),
+    },
+    # 47176870 steps
+    5: {
+        ("A", "0"): ("1", "MOV_R", "B"), ("A", "1"): ("1", "MOV_L", "C"),
+        ("B", "0"): ("1", "MOV_R", "C"), ("B", "1"): ("1", "MOV_R", "B"),
+        ("C", "0"): ("1", "MOV_R", "D"), ("C", "1"): ("0", "MOV_L", "E"),
+        ("D", "0"): ("1", "MOV_L", "A"), ("D", "1"): ("1", "MOV_L", "D"),
+        ("E", "0"): ("1", "MOV_R", "halt"), ("E", "1"): ("0", "MOV_L", "A"),
+    },
+}
+
+# the substring search of config.toml on the random text of the given length (the pattern is at the end of the text)
+def search_workload(length: int, seed: int = 0) -> Workload:
+    with open(CONFIG_PATH) as f:
+        program = f.read().split("[program]", 1)[1]
+    rng = random.Random(seed)
+    pattern = ["t", "e", "s", "t"]
+    text = [rng.choice("abcdefghijklmnopqrs_") for _ in range(max(length - len(pattern), 0))] + pattern
+    # the index tape must fit the length of the text
+    index = ["0"] * len(str(length))
+    source = (f"[tape]\nalphabet = [a-z, A-Z, 0-9, _, ^, $]\n"
+              f"T.0 = [{__join__(['^'] + text + ['$'])}]\n"
+              f"T.1 = [{__join__(['^'] + pattern + ['$'])}]\n"
+              f"T.2 = [{__join__(['^'] + index + ['$'])}]\n\n"
+              f"[program]{program}")
+    return Workload("search", {"length": length}, source, final_state="ok_found")
+
+# binary counter on T.0 counting from 0 until it overflows (the carry moves to the blank cell)
+def counter_workload(bits: int) -> Workload:
+    source = f'''[tape]
+alphabet = [0, 1, _]
+T.0 = [{__join__(["0"] * bits)}]
+blank = _
+
+[program]
+START right
+END [done]
+right {{
+    IF (T.0 == "_") THEN {{
+        GOTO inc {{ T.0: [T.0, MOV_L] }}
+    }} ELSE {{
+        GOTO right {{ T.0: [T.0, MOV_R] }}
+    }}
+}}
+inc {{
+    IF (T.0 == "1") THEN {{
+        GOTO inc {{ T.0: ["0", MOV_L] }}
+    }} ELIF (T.0 == "0") THEN {{
+        GOTO right {{ T.0: ["1", MOV_R] }}
+    }} ELSE {{
+        GOTO done {{}}
+    }}
+}}
+done {{}}
+'''
+    return Workload("counter", {"bits": bits}, source, final_state="done")
+
+# the busy beaver champion of the given number of states on the blank tape
+#    max_steps - the run is stopped after max_steps steps (the 5 states champion runs 47176870 steps)
+def busy_beaver_workload(states: int, max_steps: int | None = None) -> Workload:
+    table = BUSY_BEAVERS.get(states)
+    if table is None:
+        raise Exception(f"Unknown busy beaver of {states} states. Available: {', '.join(str(key) for key in BUSY_BEAVERS)}")
+    lines = ["[tape]", "alphabet = [0, 1]", "T.0 = [0]", "blank = 0", "", "[program]", "START A", "END [halt]"]
+    for name in sorted({state for state, _ in table}):
+        lines.append(f"{name} {{")
+        for value, keyword in [("0", "IF"), ("1", "} ELSE")]:
+            written, move, target = table[(name, value)]
+            lines.append(f'    {keyword} (T.0 == "{value}") THEN {{' if keyword == "IF" else f"    {keyword} {{")
+            lines.append(f'        GOTO {target} {{ T.0: ["{written}", {move}] }}')
+        lines += ["    }", "}"]
+    lines.append("halt {}")
+    return Workload("busy_beaver", {"states": states}, "\n".join(lines) + "\n", max_steps, "halt")
+
+# copies the text of T.0 to all the other tapes, then moves all the heads back to the start
+def copy_workload(tapes: int, length: int, seed: int = 0) -> Workload:
+    if tapes < 2:
+        raise Exception(f"Copy workload requires at least 2 tapes (got {tapes})")
+    rng = random.Random(seed)
+    text = [rng.choice("abcd") for _ in range(length)]
+    lines = ["[tape]", "alphabet = [a, b, c, d, ^, _]", f"T.0 = [{__join__(['^'] + text)}]"]
+    lines += [f"T.{tape_id} = [^]" for tape_id in range(1, tapes)]
+    lines += ["blank = _", "", "[program]", "START init", "END [done]"]
+    move_right = ", ".join(f"T.{tape_id}: [T.{tape_id}, MOV_R]" for tape_id in range(tapes))
+    move_left = ", ".join(f"T.{tape_id}: [T.{tape_id}, MOV_L]" for tape_id in range(tapes))
+    copy = ", ".join(["T.0: [T.0, MOV_R]"] + [f"T.{tape_id}: [T.0, MOV_R]" for tape_id in range(1, tapes)])
+    lines += [
+        f"init {{ GOTO copy {{ {move_right} }} }}",
+        "copy {",
+        '    IF (T.0 == "_") THEN {',
+        f"        GOTO rewind {{ {move_left} }}",
+        "    } ELSE {",
+        f"        GOTO copy {{ {copy} }}",
+        "    }",
+        "}",
+        "rewind {",
+        '    IF (T.0 == "^") THEN {',
+        "        GOTO done {}",
+        "    } ELSE {",
+        f"        GOTO rewind {{ {move_left} }}",
+        "    }",
+        "}",
+        "done {}",
+    ]
+    return Workload("copy", {"tapes": tapes, "length": length}, "\n".join(lines) + "\n", final_state="done")
+
+# random program of the given number of states walking over the bits of T.0, every state is reachable from the start state
+#    (the "1" branch of the state goes to the next state), the program never finishes, it runs max_steps steps
+def generated_workload(states: int, max_steps: int, seed: int = 0) -> Workload:
+    rng = random.Random(seed)
+    bits = [rng.choice("01") for _ in range(64)]
+    lines = ["[tape]", "alphabet = [0, 1, _]", f"T.0 = [{__join__(bits)}]", "blank = _", "", "[program]", "START s0", "END [done]"]
+    for state_id in range(states):
+        zero_target = rng.randrange(states)
+        blank_target = rng.randrange(states)
+        zero_move = rng.choice(["MOV_L", "MOV_R"])
+        lines += [
+            f"s{state_id} {{",
+            '    IF (T.0 == "0") THEN {',
+            f'        GOTO s{zero_target} {{ T.0: ["1", {zero_move}] }}',
+            '    } ELIF (T.0 == "1") THEN {',
+            f'        GOTO s{(state_id + 1) % states} {{ T.0: ["0", MOV_L] }}',
+            "    } ELSE {",
+            f'        GOTO s{blank_target} {{ T.0: ["0", STAY] }}',
+            "    }",
+            "}",
+        ]
+    lines.append("done {}")
+    return Workload("generated", {"states": states}, "\n".join(lines) + "\n", max_steps)
+
+# workloads of the suites ("quick" - seconds, "full" - the scaling runs)
+def get_suite(name: str) -> List[Workload]:
+    if name == "quick":
+        return [search_workload(100), search_workload(1000), counter_workload(12), busy_beaver_workload(5, 100000),
+                copy_workload(4, 1000), generated_workload(1000, 20000)]
+    if name == "full":
+        return ([search_workload(length) for length in [1000, 10000, 100000]] +
+                [counter_workload(bits) for bits in [12, 16]] +
+                [busy_beaver_workload(4), busy_beaver_workload(5, 2000000)] +
+                [copy_workload(tapes, 10000) for tapes in [2, 8, 32]] +
+                [generated_workload(states, 1000000) for states in [1000, 10000, 100000]])
+    raise Exception(f"Unknown benchmark suite '{name}'. Available suites: {', '.join(SUITES)}")
+
+SUITES = ["quick", "full"]
+
+def __join__(values: List[str]) -> str:
+    return ", ".join(values)
@@ -0,0 +1,206 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from weakref import WeakKeyDictionary
+from src.compiler.parser.program_ast import ProgramAST
+from src.compiler.parser.node.node import EncodedExecuteResult, Node, NodeType
+from src.compiler.parser.node.if_node import IfCondition, IfConditionType, IfNode
+
+# limits of the state decision tree: the number of the decision nodes, and the number of the comparisons in the flattened
+#    conditions of the state (the compile time grows with their product), the larger states are executed by walking the state tree
+MAX_DECISION_NODES = 1024
+MAX_DECISION_COMPARISONS = 1024
+
+# selects the branch by the value of the tape (the values not found in the branches select the default branch)
+@dataclass
+class Dispatch:
+    tape: int
+    branches: Dict[int, "DecisionNode"] = field(default_factory=dict)
+    default: "DecisionNode" = None
+
+# compares the values of two tapes
+@dataclass
+class TapeComparison:
+    lhs: int
+    rhs: int
+    equal: "DecisionNode" = None
+    not_equal: "DecisionNode" = None
+
+# leaves of the tree are the GOTO results (None - none of the GOTO statements is executed for the values)
+DecisionNode = Dispatch | TapeComparison | EncodedExecuteResult | None
+
+# whole conditional block of the state compiled into the tree over the tape values: each of the tapes is read
+#    at most once on the path, so the conditions shared by the branches are checked once, and the equality
+#    ladders on the single tape (IF (T.0 == "a") ... ELIF (T.0 == "b") ...) become the single dict lookup
+#    the result is the same as the first matching GOTO statement found by Node.execute
+class DecisionTree:
+    def __init__(self, root: DecisionNode, size: int):
+        self.root = root
+        self.size = size
+
+    def execute(self, tape_state: List[int]) -> EncodedExecuteResult | None:
+        node = self.root
+        while True:
+            if isinstance(node, Dispatch):
+                node = node.branches.get(tape_state[node.tape], node.default)
+            elif isinstance(node, TapeComparison):
+                node = node.equal if tape_state[node.lhs] == tape_state[node.rhs] else node.not_equal
+            else:
+                return node
+
+# decision trees are shared by all the machines running the same ProgramAST
+__decision_trees__: WeakKeyDictionary = WeakKeyDictionary()
+
+# returns the decision trees of the states (None for the states exceeding the limits)
+def get_decision_trees(program: ProgramAST) -> Dict[str, DecisionTree | None]:
+    trees = __decision_trees__.get(program)
+    if trees is None:
+        if program.symbols is None:
+            raise Exception("Program must be encoded with the alphabet symbols before compiling the decision trees")
+        trees = {name: compile_decision_tree(state) for name, state in program.nodes.items()}
+        __decision_trees__[program] = trees
+    return trees
+
+# known facts about the tape values on the path from the root: the values of the tapes, the values excluded by the default
+#    branches of the dispatches, and the results of the tape comparisons
+@dataclass
+class PathFacts:
+    values: Dict[int, int] = field(default_factory=dict)
+    excluded: Dict[int, frozenset] = field(default_factory=dict)
+    relations: Dict[Tuple[int, int], bool] = field(default_factory=dict)
+
+def compile_decision_tree(state: Node, max_nodes: int = MAX_DECISION_NODES, max_comparisons: int = MAX_DECISION_COMPARISONS) -> DecisionTree | None:
+    rules = __get_rules__(state, max_comparisons)
+    if rules is None:
+        return None
+    size = 0
+    root = Dispatch(tape=-1)
+    # (parent, branch key, facts, rules which can still match), the nodes are attached to the parents when they are built
+    pending = [(root, None, PathFacts(), rules)]
+    while len(pending) > 0:
+        parent, key, facts, rules = pending.pop()
+        node, comparison, rules = __resolve__(facts, rules)
+        if comparison is not None:
+            size += 1
+            if size > max_nodes:
+                return None
+            node = __split__(comparison, facts, rules, pending)
+        __attach__(parent, key, node)
+    return DecisionTree(root.default, size)
+
+# flattens the state into the list of (IF conditions on the path, GOTO result) in the execution order, the state executes
+#    the first GOTO statement which conditions are all true (IF statement executes only its first child, see IfNode.enter)
+#    returns None if the rules contain more than max_comparisons comparisons (the conditions are counted in each rule)
+def __get_rules__(state: Node, max_comparisons: int) -> List[Tuple[Tuple[IfCondition, ...], EncodedExecuteResult]] | None:
+    rules = []
+    comparisons = 0
+    stack = [(state, (), 0)]
+    while len(stack) > 0:
+        node, guards, size = stack.pop()
+        if node.node_type == NodeType.GOTO:
+            if node.encoded_result is None:
+                raise Exception(f"GOTO statement must be encoded before compiling the decision tree:\n{node}")
+            comparisons += size
+            if comparisons > max_comparisons:
+                return None
+            rules.append((guards, node.encoded_result))
+            continue
+        children = node.children
+        if isinstance(node, IfNode):
+            if node.condition is None:
+                continue
+            size += len(node.condition.get_conditions())
+            if size > max_comparisons:
+                return None
+            guards = guards + (node.condition,)
+            children = children[:1]
+        stack.extend((child, guards, size) for child in reversed(children))
+    return rules
+
+# finds the first rule which is not false for the facts: returns the GOTO result if its conditions are true,
+#    otherwise the first comparison which can't be decided (and the rules starting with this rule)
+def __resolve__(facts: PathFacts, rules: list) -> tuple:
+    for index, (guards, result) in enumerate(rules):
+        is_true = True
+        for guard in guards:
+            value, comparison = __evaluate__(guard, facts)
+            if comparison is not None:
+                return None, comparison, rules[index:]
+            if not value:
+                is_true = False
+                break
+        if is_true:
+            return result, None, []
+    return None, None, []
+
+# walks the condition graph while the comparisons can be decided from the facts
+def __evaluate__(condition: IfCondition, facts: PathFacts) -> Tuple[bool, IfCondition | None]:
+    while True:
+        is_equal = __compare__(condition, facts)
+        if is_equal is None:
+            return False, condition
+        result = is_equal if condition.type == IfConditionType.EQUAL else not is_equal
+        following = condition.down if result else condition.next
+        if following is None:
+            return result, None
+        condition = following
+
+def __compare__(condition: IfCondition, facts: PathFacts) -> bool | None:
+    lhs = condition.lhs
+    if condition.rhs_tape is None:
+        if lhs in facts.values:
+            return facts.values[lhs] == condition.rhs_code
+        if condition.rhs_code in facts.excluded.get(lhs, ()):
+            return False
+        return None
+    rhs = condition.rhs_tape
+    if lhs == rhs:
+        return True
+    if lhs in facts.values and rhs in facts.values:
+        return facts.values[lhs] == facts.values[rhs]
+    relation = facts.relations.get((min(lhs, rhs), max(lhs, rhs)))
+    if relation is not None:
+        return relation
+    if lhs in facts.values and facts.values[lhs] in facts.excluded.get(rhs, ()):
+        return False
+    if rhs in facts.values and facts.values[rhs] in facts.excluded.get(lhs, ()):
+        return False
+    return None
+
+# creates the node deciding the comparison, its branches are queued with the extended facts
+def __split__(comparison: IfCondition, facts: PathFacts, rules: list, pending: list) -> DecisionNode:
+    if comparison.rhs_tape is not None and comparison.lhs not in facts.values and comparison.rhs_tape not in facts.values:
+        pair = (min(comparison.lhs, comparison.rhs_tape), max(comparison.lhs, comparison.rhs_tape))
+        node = TapeComparison(lhs=pair[0], rhs=pair[1])
+        for key, is_equal in (("equal", True), ("not_equal", False)):
+            pending.append((node, key, PathFacts(facts.values, facts.excluded, {**facts.relations, pair: is_equal}), rules))
+        return node
+
+    # the tape compared with the constant value (or with the tape which value is known) is dispatched over all the
+    #    constants compared with the tape in the remaining rules
+    tape = comparison.lhs if comparison.lhs not in facts.values else comparison.rhs_tape
+    constants = __get_constants__(tape, rules) - facts.excluded.get(tape, frozenset())
+    if comparison.rhs_tape is not None:
+        constants.add(facts.values[comparison.lhs if tape == comparison.rhs_tape else comparison.rhs_tape])
+    node = Dispatch(tape=tape)
+    for value in sorted(constants, reverse=True):
+        pending.append((node, value, PathFacts({**facts.values, tape: value}, facts.excluded, facts.relations), rules))
+    excluded = {**facts.excluded, tape: facts.excluded.get(tape, frozenset()) | frozenset(constants)}
+    pending.append((node, None, PathFacts(facts.values, excluded, facts.relations), rules))
+    return node
+
+def __get_constants__(tape: int, rules: list) -> set:
+    constants = set()
+    for guards, _ in rules:
+        for guard in guards:
+            for condition in guard.get_conditions():
+                if condition.lhs == tape and condition.rhs_tape is None:
+                    constants.add(condition.rhs_code)
+    return constants
+
+def __attach__(parent: Dispatch | TapeComparison, key, node: DecisionNode):
+    if isinstance(parent, TapeComparison):
+        setattr(parent, key, node)
+    elif key is None:
+        parent.default = node
+    else:
+        parent.branches[key] = node
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from weakref import WeakKeyDictionary
+from src.compiler.parser.program_ast import ProgramAST
+from src.compiler.parser.node.node import EncodedExecuteResult, NodeType
+from src.compiler.optimizer.decision_tree import DecisionNode, Dispatch, TapeComparison, get_decision_trees
+
+# maximum number of the steps fused into one transition (the programs looping without reading the tapes are fused in parts)
+MAX_FUSED_STEPS = 64
+
+# the GOTO statement followed by the steps which GOTO statements are known at compile time, applied as one transition
+#    the offsets are relative to the head positions before the first step
+#    reads - cells read before any of the writes (tape, offset), writes - the last value written to each of the changed
+#    cells (tape, offset, symbol code or None, index in reads of the copied value), moves - total head movement of each tape,
+#    bounds - the lowest and the highest offset visited by the head of each tape (the cells must be allocated)
+@dataclass
+class FusedTransition:
+    steps: int
+    new_state: str
+    reads: List[Tuple[int, int]]
+    writes: List[Tuple[int, int, int | None, int | None]]
+    moves: List[int]
+    bounds: List[Tuple[int, int]]
+
+# fused transitions are shared by all the machines running the same ProgramAST
+__fused_transitions__: WeakKeyDictionary = WeakKeyDictionary()
+
+# returns the fused transitions of the GOTO statements of the states (by the state name and the id of the encoded result)
+def get_fused_transitions(program: ProgramAST) -> Dict[str, Dict[int, FusedTransition]]:
+    fused = __fused_transitions__.get(program)
+    if fused is None:
+        fused = find_fused_transitions(program)
+        __fused_transitions__[program] = fused
+    return fused
+
+# finds the GOTO statements followed by the steps whose GOTO statement doesn't depend on the tape contents, e.g.:
+#    increment { IF (T.0 == "0") THEN { GOTO check { T.0: ["1", STAY] } } ... }
+#    check { IF (T.0 == "$") THEN { ... } ELSE { GOTO next { T.0: [T.0, MOV_R] } } }
+#    the value of T.0 in check is the value written by increment, so check always executes the ELSE branch; the states
+#    with the lone GOTO statement (GOTO next {}) are always followed
+#    the values under the heads are known if they were written as the constants by one of the previous fused steps,
+#    the following GOTO statement is selected by the decision tree of the state (the states without the tree end the fusion)
+def find_fused_transitions(program: ProgramAST) -> Dict[str, Dict[int, FusedTransition]]:
+    if program.symbols is None:
+        raise Exception("Program must be encoded with the alphabet symbols before fusing the transitions")
+    trees = get_decision_trees(program)
+    end_nodes = set(program.end_nodes)
+    fused_transitions = {}
+    for name, state in program.nodes.items():
+        if name in end_nodes:
+            continue
+        for node in state.get_nodes():
+            if node.node_type != NodeType.GOTO or node.encoded_result is None:
+                continue
+            fused = __fuse__(node.encoded_result, trees, end_nodes, program.tape_count)
+            if fused is not None:
+                fused_transitions.setdefault(name, {})[id(node.encoded_result)] = fused
+    return fused_transitions
+
+# the value of the cell is the symbol code ("code", code), or the value of the cell before the fused steps ("cell", tape, offset)
+def __fuse__(result: EncodedExecuteResult, trees: Dict, end_nodes: set, tape_count: int) -> FusedTransition | None:
+    written: Dict[Tuple[int, int], tuple] = {}
+    positions = [0] * tape_count
+    bounds = [[0, 0] for _ in range(tape_count)]
+
+    def get_value(tape_id: int) -> tuple:
+        return written.get((tape_id, positions[tape_id]), ("cell", tape_id, positions[tape_id]))
+
+    steps = 0
+    while True:
+        # all the values are read before the writes (see parse_tape_value_result)
+        values = [("code", value) if source is None else get_value(source) for value, source in zip(result.tape_value, result.tape_source)]
+        for tape_id, value in enumerate(values):
+            written[(tape_id, positions[tape_id])] = value
+        for tape_id, move in enumerate(result.tape_movement):
+            positions[tape_id] += move
+            bounds[tape_id][0] = min(bounds[tape_id][0], positions[tape_id])
+            bounds[tape_id][1] = max(bounds[tape_id][1], positions[tape_id])
+        steps += 1
+        if steps >= MAX_FUSED_STEPS or result.new_state in end_nodes:
+            break
+        tree = trees.get(result.new_state)
+        following = None if tree is None else __decide__(tree.root, get_value)
+        if following is None:
+            break
+        result = following
+    # the single GOTO statement is executed by the machine
+    if steps < 2:
+        return None
+
+    reads = []
+    read_ids = {}
+    writes = []
+    for (tape_id, offset), value in written.items():
+        if value == ("cell", tape_id, offset):
+            continue
+        if value[0] == "code":
+            writes.append((tape_id, offset, value[1], None))
+            continue
+        if value not in read_ids:
+            read_ids[value] = len(reads)
+            reads.append(value[1:])
+        writes.append((tape_id, offset, None, read_ids[value]))
+    return FusedTransition(steps, result.new_state, reads, writes, positions, [(low, high) for low, high in bounds])
+
+# walks the decision tree with the known values (see DecisionTree.execute), returns None if the GOTO statement depends
+#    on the unknown value (or none of the GOTO statements is executed, the machine reports the error)
+def __decide__(node: DecisionNode, get_value) -> EncodedExecuteResult | None:
+    while True:
+        if isinstance(node, Dispatch):
+            value = get_value(node.tape)
+            if value[0] != "code":
+                return None
+            node = node.branches.get(value[1], node.default)
+        elif isinstance(node, TapeComparison):
+            lhs = get_value(node.lhs)
+            rhs = get_value(node.rhs)
+            # the same cell is always equal to itself
+            if lhs == rhs:
+                node = node.equal
+            elif lhs[0] == "code" and rhs[0] == "code":
+                node = node.not_equal
+            else:
+                return None
+        else:
+            return node
@@ -0,0 +1,147 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+from src.compiler.parser.node.node import Node, NodeType
+from src.compiler.parser.node.if_node import IfNode
+
+# states removed by minimize_program
+#    unreachable - the states not reachable from the start state, merged - the removed states by the equivalent state replacing them
+@dataclass
+class MinimizationReport:
+    unreachable: List[str] = field(default_factory=list)
+    merged: Dict[str, str] = field(default_factory=dict)
+
+    def get_removed_count(self) -> int:
+        return len(self.unreachable) + len(self.merged)
+
+    def __str__(self):
+        if self.get_removed_count() == 0:
+            return "No states removed"
+        res = [f"Removed {self.get_removed_count()} states ({len(self.unreachable)} unreachable, {len(self.merged)} merged into the equivalent states)"]
+        if len(self.unreachable) > 0:
+            res.append(f"Unreachable: {', '.join(self.unreachable)}")
+        merged_into: Dict[str, List[str]] = {}
+        for name, target in self.merged.items():
+            merged_into.setdefault(target, []).append(name)
+        for target, names in merged_into.items():
+            res.append(f"Merged into {target}: {', '.join(names)}")
+        return "\n".join(res)
+
+# removes the states not reachable from the start state, and merges the equivalent states: the states with the same statements
+#    (conditions, writes and moves) whose GOTO statements lead to the equivalent states, the GOTO statements are redirected to
+#    the kept state (the start state or the first defined state of the equivalent states), the END states are never removed or merged
+#    (the program must be checked, see analyze_program)
+#    the equivalence is found by the partition refinement (Hopcroft's algorithm): the states are split by their statements, then
+#    the blocks are split by the blocks of their GOTO targets (the n-th GOTO statement of the state is the n-th transition letter)
+def minimize_program(program) -> MinimizationReport:
+    end_nodes = set(program.end_nodes)
+    # statements of the reachable states (walked once), and their GOTO statements
+    nodes = {}
+    gotos = {}
+    reachable = {program.start_node}
+    pending = [program.start_node]
+    while len(pending) > 0:
+        name = pending.pop()
+        # the statements of the END states are never executed
+        if name in end_nodes:
+            continue
+        nodes[name] = program.nodes[name].get_nodes()
+        gotos[name] = [node for node in nodes[name] if node.node_type == NodeType.GOTO]
+        for goto in gotos[name]:
+            if goto.execute_result.new_state not in reachable:
+                reachable.add(goto.execute_result.new_state)
+                pending.append(goto.execute_result.new_state)
+
+    report = MinimizationReport()
+    states = []
+    for name in program.nodes:
+        if name in reachable or name in end_nodes:
+            states.append(name)
+        else:
+            report.unreachable.append(name)
+
+    ids = {name: state_id for state_id, name in enumerate(states)}
+    targets = [[ids[goto.execute_result.new_state] for goto in gotos.get(name, [])] for name in states]
+    # states leading to the target state with their n-th GOTO statement, by (n, target)
+    sources: Dict[tuple[int, int], List[int]] = {}
+    for state_id, state_targets in enumerate(targets):
+        for letter, target in enumerate(state_targets):
+            sources.setdefault((letter, target), []).append(state_id)
+
+    shapes: Dict[tuple, int] = {}
+    block_of = []
+    blocks: List[set] = []
+    for name in states:
+        shape = ("END", name) if name in end_nodes else __get_shape__(nodes[name])
+        block = shapes.setdefault(shape, len(blocks))
+        if block == len(blocks):
+            blocks.append(set())
+        blocks[block].add(ids[name])
+        block_of.append(block)
+
+    letters = max((len(state_targets) for state_targets in targets), default=0)
+    splitters = {(block, letter) for block in range(len(blocks)) for letter in range(letters)}
+    while len(splitters) > 0:
+        block, letter = splitters.pop()
+        # states leading to the block with the letter, by their blocks
+        touched: Dict[int, set] = {}
+        for target in list(blocks[block]):
+            for source in sources.get((letter, target), ()):
+                touched.setdefault(block_of[source], set()).add(source)
+        for split_block, inside in touched.items():
+            if len(inside) == len(blocks[split_block]):
+                continue
+            outside = blocks[split_block] - inside
+            # the smaller part becomes the new block, it's enough to split by it (the larger part is split by the rest of the old block)
+            smaller, larger = (inside, outside) if len(inside) <= len(outside) else (outside, inside)
+            blocks[split_block] = larger
+            new_block = len(blocks)
+            blocks.append(smaller)
+            for state_id in smaller:
+                block_of[state_id] = new_block
+            for split_letter in range(letters):
+                splitters.add((new_block, split_letter))
+
+    start_id = ids[program.start_node]
+    for block in blocks:
+        if len(block) < 2:
+            continue
+        kept = start_id if start_id in block else min(block)
+        for state_id in sorted(block):
+            if state_id != kept:
+                report.merged[states[state_id]] = states[kept]
+
+    for name in states:
+        for goto in gotos.get(name, []):
+            target = report.merged.get(goto.execute_result.new_state)
+            if target is not None and name not in report.merged:
+                goto.next_state = target
+                goto.execute_result.new_state = target
+                if goto.encoded_result is not None:
+                    goto.encoded_result.new_state = target
+    program.nodes = {name: program.nodes[name] for name in states if name not in report.merged}
+    return report
+
+# statements of the state without the names of the GOTO targets: the pre-order list of the nodes with the number of their children
+def __get_shape__(nodes: List[Node]) -> tuple:
+    shape = []
+    for node in nodes:
+        if isinstance(node, IfNode):
+            data = None if node.condition is None else __get_condition_shape__(node)
+        elif node.node_type == NodeType.GOTO:
+            result = node.execute_result
+            data = (tuple(result.tape_movement), tuple(__get_value_shape__(value) for value in result.tape_value))
+        else:
+            data = None
+        shape.append((node.node_type.value, len(node.children), data))
+    return tuple(shape)
+
+def __get_condition_shape__(node: IfNode) -> tuple:
+    conditions = node.condition.get_conditions()
+    ids = {id(condition): no for no, condition in enumerate(conditions)}
+    return tuple((condition.type.value, condition.lhs, __get_value_shape__(condition.rhs),
+                  -1 if condition.down is None else ids[id(condition.down)],
+                  -1 if condition.next is None else ids[id(condition.next)]) for condition in conditions)
+
+# the tape ids and the alphabet values are distinguished (T.0 and "0")
+def __get_value_shape__(value: int | str) -> tuple:
+    return ("tape", value) if isinstance(value, int) else ("value", value)
@@ -0,0 +1,55 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+from src.compiler.parser.program_ast import ProgramAST
+from src.compiler.parser.node.node import Node, NodeType
+from src.compiler.optimizer.tape_access import get_read_tapes
+
+@dataclass
+class SweepState:
+    # tape scanned by the state and the direction of the head movement (MOV_R = 1, MOV_L = -1)
+    tape: int
+    move: int
+    # other tapes, which values are read by the state (in conditions or copied to the tapes)
+    read_tapes: List[int] = field(default_factory=list)
+
+# finds the states that can loop to themselves while only moving the head of a single tape, e.g.:
+#    move_to_end { IF (T.0 == "$") THEN { GOTO next {} } ELSE { GOTO move_to_end { T.0: [T.0, MOV_R] } } }
+#    the GOTO statement must write back the value read from the tape, and all the other tapes must stay untouched
+#    (the runtime checks which symbols actually continue the sweep, see src/turing_machine/sweep.py)
+def find_sweep_states(program: ProgramAST) -> Dict[str, SweepState]:
+    sweep_states = {}
+    for state_name, state in program.nodes.items():
+        if state_name in program.end_nodes:
+            continue
+        for goto in __get_goto_nodes__(state):
+            sweep = __get_sweep__(goto, state_name, program.tape_count)
+            if sweep is not None:
+                sweep.read_tapes = [tape_id for tape_id in get_read_tapes(state) if tape_id != sweep.tape]
+                sweep_states[state_name] = sweep
+                break
+    return sweep_states
+
+def __get_goto_nodes__(node: Node) -> List[Node]:
+    gotos = []
+    nodes = [node]
+    while len(nodes) > 0:
+        current = nodes.pop()
+        if current.node_type == NodeType.GOTO:
+            gotos.append(current)
+        nodes.extend(reversed(current.children))
+    return gotos
+
+def __get_sweep__(goto: Node, state_name: str, tape_count: int) -> SweepState | None:
+    result = goto.encoded_result
+    if result is None or result.new_state != state_name:
+        return None
+    sweep = None
+    for tape_id in range(tape_count):
+        if result.tape_source[tape_id] != tape_id:
+            return None
+        move = result.tape_movement[tape_id]
+        if move != 0:
+            if sweep is not None:
+                return None
+            sweep = SweepState(tape=tape_id, move=move)
+    return sweep
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+from weakref import WeakKeyDictionary
+from src.compiler.parser.program_ast import ProgramAST
+from src.compiler.parser.node.node import EncodedExecuteResult, Node, NodeType
+from src.compiler.parser.node.if_node import IfNode
+
+# changes of the tapes made by the GOTO statement, the tapes not mentioned in the statement keep their values and heads
+#    writes - (tape, symbol code or None, tape of the copied value), the identity writes (T.0: [T.0, ...]) are skipped
+#    moves - (tape, MOV_R = 1 or MOV_L = -1) of the moved tapes
+@dataclass
+class WritePlan:
+    writes: Tuple[Tuple[int, int | None, int | None], ...]
+    moves: Tuple[Tuple[int, int], ...]
+
+# tapes accessed by the states of the program
+#    read_tapes - tapes read by each of the states (in the conditions, or copied to the other tapes by its GOTO statements)
+#    plans - write plans of the GOTO statements (by the id of the encoded result)
+@dataclass
+class TapeAccess:
+    read_tapes: Dict[str, Tuple[int, ...]]
+    plans: Dict[int, WritePlan]
+
+# tape accesses are shared by all the machines running the same ProgramAST
+__tape_accesses__: WeakKeyDictionary = WeakKeyDictionary()
+
+def get_tape_access(program: ProgramAST) -> TapeAccess:
+    access = __tape_accesses__.get(program)
+    if access is None:
+        if program.symbols is None:
+            raise Exception("Program must be encoded with the alphabet symbols before computing the tape accesses")
+        access = TapeAccess({}, {})
+        for name, state in program.nodes.items():
+            access.read_tapes[name] = get_read_tapes(state)
+            for node in state.get_nodes():
+                if node.node_type == NodeType.GOTO and node.encoded_result is not None:
+                    access.plans[id(node.encoded_result)] = get_write_plan(node.encoded_result)
+        __tape_accesses__[program] = access
+    return access
+
+def get_read_tapes(state: Node) -> Tuple[int, ...]:
+    tapes = set()
+    for node in state.get_nodes():
+        if isinstance(node, IfNode) and node.condition is not None:
+            for condition in node.condition.get_conditions():
+                tapes.add(condition.lhs)
+                if condition.rhs_tape is not None:
+                    tapes.add(condition.rhs_tape)
+        elif node.node_type == NodeType.GOTO:
+            if node.encoded_result is None:
+                raise Exception(f"GOTO statement must be encoded before computing the tape accesses:\n{node}")
+            for tape_id, source in enumerate(node.encoded_result.tape_source):
+                if source is not None and source != tape_id:
+                    tapes.add(source)
+    return tuple(sorted(tapes))
+
+def get_write_plan(result: EncodedExecuteResult) -> WritePlan:
+    writes = tuple((tape_id, value, source) for tape_id, (value, source) in enumerate(zip(result.tape_value, result.tape_source)) if source != tape_id)
+    moves = tuple((tape_id, move) for tape_id, move in enumerate(result.tape_movement) if move != 0)
+    return WritePlan(writes, moves)
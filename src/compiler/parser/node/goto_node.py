@@ -1,12 +1,14 @@
-from typing import Dict, List, Tuple
+from typing import Container, Dict, List, Tuple
 from src.compiler.tokenizer.tokenizer import SectionLine, Token, TokenValue, TokenizerProgram, TokenizerResult
-from src.compiler.parser.node.node import Node, NodeType, NodeExecuteResult
+from src.compiler.parser.node.node import Node, NodeType, NodeExecuteResult, EncodedExecuteResult
+from src.compiler.symbol_table import SymbolTable
 from src.compiler.parser import get_tape_id, print_err
 
 class GotoNode(Node):
     def __init__(self, line: SectionLine):
         super().__init__(NodeType.GOTO, line)
         self.execute_result = None
+        self.encoded_result = None
         self.next_state = None
         self.tape_values = {}
         self.tape_movement = {}
@@ -67,36 +69,32 @@ class GotoNode(Node):
         self.tape_movement = tape_movement
         return True
 
-    def self_check(self, states: List[str], tape_count: int, alphabet: List[str]) -> bool:
+    def get_errors(self, states: Container[str], tape_count: int, alphabet: Container[str]) -> List[str]:
         execute_result = self.__parse_execute_result__(tape_count)
         if execute_result is None:
-            return False
+            return ["Next state is not defined"]
         self.execute_result = execute_result
 
+        errors = []
         if self.execute_result.new_state not in states:
-            self.__print_err__(f"State '{self.execute_result.new_state}' is not defined")
-            return False
+            errors.append(f"State '{self.execute_result.new_state}' is not defined")
         for move in self.execute_result.tape_movement:
-            if move not in [-1, 0, 1]:
-                self.__print_err__(f"Unrecognized tape move value: {move}.")
-                return False
+            if move not in (-1, 0, 1):
+                errors.append(f"Unrecognized tape move value: {move}.")
         for value in self.execute_result.tape_value:
             if type(value).__name__ == "int":
                 if value < 0 or value >= tape_count:
-                    self.__print_err__(f"Tape T.{value} is undefined")
-                    return False
+                    errors.append(f"Tape T.{value} is undefined")
             else:
                 if value not in alphabet:
-                    self.__print_err__(f"Value '{value}' is not defined in the alphabet")
-                    return False
-        return True
+                    errors.append(f"Value '{value}' is not defined in the alphabet")
+        return errors
 
     def __parse_execute_result__(self, tape_count: int) -> NodeExecuteResult | None:
         tape_values = []
         tape_mov = []
 
         if self.next_state is None:
-            self.__print_err__("Next state is not defined")
             return None
 
         for i in range(tape_count):
@@ -111,9 +109,23 @@ class GotoNode(Node):
 
         return NodeExecuteResult(tape_movement=tape_mov, tape_value=tape_values, new_state=self.next_state)
 
-    def execute(self, tape_state: List[str], is_debug_mode: bool = False) -> NodeExecuteResult | None:
+    def encode_node(self, symbols: SymbolTable):
+        if self.execute_result is None:
+            raise Exception(f"GOTO statement must be checked before encoding:\n{self}")
+        tape_value = []
+        tape_source = []
+        for value in self.execute_result.tape_value:
+            if type(value).__name__ == "int":
+                tape_value.append(None)
+                tape_source.append(value)
+            else:
+                tape_value.append(symbols.encode(value))
+                tape_source.append(None)
+        self.encoded_result = EncodedExecuteResult(tape_movement=self.execute_result.tape_movement, tape_value=tape_value, tape_source=tape_source, new_state=self.execute_result.new_state)
+
+    def execute(self, tape_state: List[int], is_debug_mode: bool = False) -> EncodedExecuteResult | None:
         if is_debug_mode:
             print(f"    > Changing state:")
-            print(f"{self}")
-        return self.execute_result
+            print(self.get_source())
+        return self.encoded_result
 
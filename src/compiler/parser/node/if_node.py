@@ -1,20 +1,26 @@
-from typing import List, Optional
+from typing import Container, List, Optional
 from src.compiler.tokenizer.tokenizer import SectionLine, Token, TokenValue, TokenizerProgram, TokenizerResult
 from enum import Enum
-from src.compiler.parser.node.node import Node, NodeType, NodeExecuteResult
+from src.compiler.parser.node.node import Node, NodeType
+from src.compiler.symbol_table import SymbolTable
 
 class IfConditionType(Enum):
     EQUAL = '=='
     NOT_EQUAL = '!='
 
-# tree representing the IF statement
-#    conditions objects on the same level (siblings) represents the OR relation
-#    children objects of the IfCondition represents the AND relation
+# graph representing the IF statement
+#    if the comparison is true the child (down) condition is checked next (no child - the condition is true),
+#    otherwise the sibling (next) condition is checked (no sibling - the condition is false)
+#    siblings represent the OR relation and children represent the AND relation, the conditions can be shared by
+#    multiple parents, e.g. in (T.0 == "a" && T.1 == "b") || T.2 == "c" both of the AND conditions have T.2 as the sibling
 class IfCondition:
     def __init__(self, cond_type: IfConditionType, lhs: int, rhs: int | str):
         self.type = cond_type
         self.lhs = lhs
         self.rhs = rhs
+        # rhs compiled against the symbol codes: either the code of the const value or the tape id
+        self.rhs_code: int | None = None
+        self.rhs_tape: int | None = None
         self.next = None
         self.down = None
 
@@ -24,63 +30,85 @@ class IfCondition:
     def add_sibling(self, cond):
         self.next = cond
 
-    def _get_lhs(self, tapes_values: List[str]) -> str:
+    def _get_lhs(self, tapes_values: List[int]) -> int:
         return tapes_values[self.lhs]
 
-    def _get_rhs(self, tapes_values: List[str]) -> str:
-        if type(self.rhs).__name__ == "int":
-            return tapes_values[self.rhs]
-        return self.rhs
-
-    def self_check_syntax(self, tape_count: int, alphabet: List[str]) -> bool:
-        if self.lhs < 0 or self.lhs >= tape_count:
-            raise Exception(f"Tape T.{self.lhs} is not defined")
-        if type(self.rhs).__name__ == "int":
-            if self.rhs < 0 or self.rhs >= tape_count:
-                raise Exception(f"Tape T.{self.rhs} is not defined")
-        else:
-            if self.rhs not in alphabet:
-                raise Exception(f"Value '{self.rhs}' is not defined in the alphabet.")
-
-        if self.down is not None:
-            self.down.self_check_syntax(tape_count, alphabet)
-        if self.next is not None:
-            self.next.self_check_syntax(tape_count, alphabet)
-
-    def check_condition(self, tapes_values: List[str]) -> bool:
-        if self.lhs is None:
-            raise Exception("Left side condition argument is undefined")
-        if self.rhs is None:
-            raise Exception("Right side condition argument is undefined")
-        if self.type == IfConditionType.EQUAL:
-            if self._get_lhs(tapes_values) != self._get_rhs(tapes_values):
-                if self.next is not None:
-                    return self.next.check_condition(tapes_values)
-                return False
-        if self.type == IfConditionType.NOT_EQUAL:
-            if self._get_lhs(tapes_values) == self._get_rhs(tapes_values):
-                if self.next is not None:
-                    return self.next.check_condition(tapes_values)
-                return False
-
-        if self.down is not None:
-            return self.down.check_condition(tapes_values)
-
+    def _get_rhs(self, tapes_values: List[int]) -> int:
+        if self.rhs_tape is not None:
+            return tapes_values[self.rhs_tape]
+        return self.rhs_code
+
+    # returns all the conditions of the graph (each of them once) in the topological order: every condition is placed
+    #    before its down and next conditions, so the first one is this condition (reversed post-order of the iterative walk)
+    def get_conditions(self) -> List["IfCondition"]:
+        conditions = []
+        visited = set()
+        stack = [(self, False)]
+        while len(stack) > 0:
+            condition, is_walked = stack.pop()
+            if is_walked:
+                conditions.append(condition)
+                continue
+            if id(condition) in visited:
+                continue
+            visited.add(id(condition))
+            stack.append((condition, True))
+            for following in (condition.down, condition.next):
+                if following is not None and id(following) not in visited:
+                    stack.append((following, False))
+        conditions.reverse()
+        return conditions
+
+    def encode(self, symbols: SymbolTable):
+        for condition in self.get_conditions():
+            if type(condition.rhs).__name__ == "int":
+                condition.rhs_tape = condition.rhs
+            else:
+                condition.rhs_code = symbols.encode(condition.rhs)
+
+    def get_errors(self, tape_count: int, alphabet: Container[str]) -> List[str]:
+        errors = []
+        for condition in self.get_conditions():
+            if condition.lhs < 0 or condition.lhs >= tape_count:
+                errors.append(f"Tape T.{condition.lhs} is not defined")
+            if type(condition.rhs).__name__ == "int":
+                if condition.rhs < 0 or condition.rhs >= tape_count:
+                    errors.append(f"Tape T.{condition.rhs} is not defined")
+            elif condition.rhs not in alphabet:
+                errors.append(f"Value '{condition.rhs}' is not defined in the alphabet.")
+        return errors
+
+    def self_check_syntax(self, tape_count: int, alphabet: Container[str]) -> bool:
+        errors = self.get_errors(tape_count, alphabet)
+        if len(errors) > 0:
+            raise Exception(errors[0])
         return True
 
-    def __str__(self):
-        res = ""
-        if self.down is not None:
-            res += f"({self.lhs} {self.type} {self.rhs} && ({self.down}))"
-        if self.next is not None:
-            if self.down is not None:
-                res += f" || {self.next}"
+    def check_condition(self, tapes_values: List[int]) -> bool:
+        condition = self
+        while True:
+            if condition.lhs is None:
+                raise Exception("Left side condition argument is undefined")
+            if condition.rhs is None:
+                raise Exception("Right side condition argument is undefined")
+            if condition.type == IfConditionType.EQUAL:
+                result = condition._get_lhs(tapes_values) == condition._get_rhs(tapes_values)
             else:
-                res += f"{self.lhs} {self.type} {self.rhs} || {self.next}"
-        elif self.down is None:
-            res += f"{self.lhs} {self.type} {self.rhs}"
+                result = condition._get_lhs(tapes_values) != condition._get_rhs(tapes_values)
+            following = condition.down if result else condition.next
+            if following is None:
+                return result
+            condition = following
 
-        return res
+    def __str__(self):
+        conditions = self.get_conditions()
+        ids = {id(condition): no for no, condition in enumerate(conditions)}
+        res = []
+        for no, condition in enumerate(conditions):
+            down = "true" if condition.down is None else f"#{ids[id(condition.down)]}"
+            next = "false" if condition.next is None else f"#{ids[id(condition.next)]}"
+            res.append(f"#{no}: {condition.lhs} {condition.type.value} {condition.rhs} ? {down} : {next}")
+        return ", ".join(res)
 
 class IfNode(Node):
     def __init__(self, line: SectionLine):
@@ -93,32 +121,28 @@ class IfNode(Node):
     def set_condition(self, cond: IfCondition):
         self.condition = cond
 
-    def self_check(self, states: List[str], tape_count: int, alphabet: List[str]) -> bool:
+    def get_errors(self, states: Container[str], tape_count: int, alphabet: Container[str]) -> List[str]:
         if self.condition is None:
-            self.__print_err__(f"No condition defined for the IF statement.")
-            return False
-        try:
-            self.condition.self_check_syntax(tape_count, alphabet)
-        except Exception as e:
-            self.__print_err__(f"{e}")
-            return False
-        return True
+            return ["No condition defined for the IF statement."]
+        return self.condition.get_errors(tape_count, alphabet)
 
-    def execute(self, tape_state: List[str], is_debug_mode: bool = False) -> NodeExecuteResult | None:
+    def encode_node(self, symbols: SymbolTable):
+        if self.condition is not None:
+            self.condition.encode(symbols)
+
+    # IF statement executes only its first child (THEN statement), if the condition is true
+    def enter(self, tape_state: List[int], is_debug_mode: bool = False) -> List[Node]:
         if is_debug_mode:
             print("    > Running IF statement")
-            print(f"{self}")
+            print(self.get_source())
         if self.condition is None:
-            return None
+            return []
         if self.condition.check_condition(tape_state):
             if is_debug_mode:
                 print("    > IF condition check is successful")
-            for child in self.children:
-                return child.execute(tape_state, is_debug_mode)
-        else:
-            if is_debug_mode:
-                print("    > IF condition check failed")
-
-        return None
+            return self.children[:1]
+        if is_debug_mode:
+            print("    > IF condition check failed")
+        return []
 
 
@@ -1,8 +1,8 @@
-from typing import List
+from typing import Container, Dict, List
 from dataclasses import dataclass
 from enum import Enum
 from src.compiler.tokenizer.tokenizer import SectionLine, Token, TokenValue, TokenizerProgram, TokenizerResult
-from functools import reduce
+from src.compiler.symbol_table import SymbolTable
 
 class NodeType(Enum):
     STATE = 0
@@ -19,103 +19,133 @@ class NodeExecuteResult:
     tape_value: List[int | str]
     new_state: str
 
+@dataclass
+class EncodedExecuteResult:
+    # MOV_R = 1, MOV_L = -1
+    tape_movement: List[int]
+    # symbol codes written to the tapes (None if the value is copied from the tape defined in tape_source)
+    tape_value: List[int | None]
+    tape_source: List[int | None]
+    new_state: str
 
 class Node:
     def __init__(self, node_type: NodeType, line: SectionLine):
         self.node_type = node_type
+        # lines of the node itself (the lines of the whole component are collected with get_lines)
         self.lines = {}
         self.lines[line.no] = line
         self.children = []
+        # source text of the component printed in debug mode (see get_source)
+        self.source: str | None = None
 
     def add_line(self, line: SectionLine):
         self.lines[line.no] = line
 
     def add_child(self, node):
         self.children.append(node)
-        for line in node.lines.values():
-            self.add_line(line)
 
-    def does_end_with_goto(self) -> bool:
-        if len(self.children) == 0:
-            if self.node_type == NodeType.GOTO:
-                return True
+    # returns the nodes of the subtree in pre-order (the tree is walked with the explicit stack)
+    def get_nodes(self) -> List["Node"]:
+        nodes = []
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(reversed(node.children))
+        return nodes
+
+    def get_lines(self) -> Dict[int, SectionLine]:
+        lines = {}
+        for node in self.get_nodes():
+            lines.update(node.lines)
+        return lines
+
+    # checks the order of the IF, ELIF and ELSE children in one scan, returns the error message (None if the order is correct)
+    def get_children_error(self) -> str | None:
+        if len(self.children) == 1:
+            node_type = self.children[0].node_type
+            if node_type == NodeType.IF:
+                return "Missing ELSE statement"
+            if node_type == NodeType.ELSE:
+                return "Missing IF statement"
+            return None
+
+        if_count = elif_count = else_count = 0
+        if_pos = else_pos = last_elif_pos = 0
+        first_elif_pos = -1
+        for pos, child in enumerate(self.children):
+            if child.node_type == NodeType.IF:
+                if_count += 1
+                if_pos = pos
+            elif child.node_type == NodeType.ELIF:
+                elif_count += 1
+                if first_elif_pos == -1:
+                    first_elif_pos = pos
+                last_elif_pos = pos
+            elif child.node_type == NodeType.ELSE:
+                else_count += 1
+                else_pos = pos
+
+        if else_count > 1:
+            return "Multiple ELSE definitions"
+        if if_count == 1 and else_count == 0:
+            return "Missing ELSE statement"
+        if if_count == 0 and (elif_count > 0 or else_count > 0):
+            return "Missing IF statement"
+        if if_count > 1:
+            return "Multiple IF statements"
+        if elif_count > 0:
+            if first_elif_pos != if_pos + 1:
+                return "ELIF statement must be after IF statement"
+            if (last_elif_pos - first_elif_pos + 1) != elif_count:
+                return "ELIF statements must begin with IF statement and end with ELSE statement"
+            if else_pos != last_elif_pos + 1:
+                return "ELSE statement must be after last ELIF statement"
+        elif else_pos != if_pos + 1:
+            return "ELSE statement must be after IF statement"
+        return None
+
+    def encode(self, symbols: SymbolTable):
+        for node in self.get_nodes():
+            node.encode_node(symbols)
+
+    # compiles the node itself (without its children, see encode)
+    def encode_node(self, symbols: SymbolTable):
+        pass
+
+    # the children are executed in order, until one of them returns the GOTO result
+    #    the nested statements are kept on the explicit stack of the children iterators
+    def execute(self, tape_state: List[int], is_debug_mode: bool = False) -> EncodedExecuteResult | None:
+        stack = [iter(self.enter(tape_state, is_debug_mode))]
+        while len(stack) > 0:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+            elif child.node_type == NodeType.GOTO:
+                result = child.execute(tape_state, is_debug_mode)
+                if result is not None:
+                    return result
             else:
-                return False
-
-        for child in self.children:
-            if not child.does_end_with_goto():
-                return False
-        return True
-
-    def check_children(self, states: List[str], tape_count: int, alphabet: List[str]) -> bool:
-        for child in self.children:
-            if len(self.children) == 1:
-                child = self.children[0]
-                if child.node_type == NodeType.IF:
-                    self.__print_err__("Missing ELSE statement")
-                    return False
-                elif child.node_type == NodeType.ELSE:
-                    self.__print_err__("Missing IF statement")
-                    return False
-            elif len(self.children) > 1:
-                node_types = list(map(lambda child: child.node_type, self.children))
-                if_count = reduce(lambda count, node_type: count + 1 if node_type == NodeType.IF else count, node_types, 0)
-                if_pos = reduce(lambda pos, node_enum: node_enum[0] if node_enum[1] == NodeType.IF else pos, enumerate(node_types), 0)
-                else_count = reduce(lambda count, node_type: count + 1 if node_type == NodeType.ELSE else count, node_types, 0)
-                else_pos = reduce(lambda pos, node_enum: node_enum[0] if node_enum[1] == NodeType.ELSE else pos, enumerate(node_types), 0)
-                elif_count = reduce(lambda count, node_type: count + 1 if node_type == NodeType.ELIF else count, node_types, 0)
-                first_elif_pos = reduce(lambda pos, node_enum: node_enum[0] if node_enum[1] == NodeType.ELIF and pos == -1 else pos, enumerate(node_types), -1)
-                last_elif_pos = reduce(lambda pos, node_enum: node_enum[0] if node_enum[1] == NodeType.ELIF else pos, enumerate(node_types), 0)
-
-                if else_count > 1:
-                    self.__print_err__("Multiple ELSE definitions")
-                    return False
-                elif if_count == 1 and else_count == 0:
-                    self.__print_err__("Missing ELSE statement")
-                    return False
-                elif if_count == 0 and (elif_count > 0 or else_count > 0):
-                    self.__print_err__("Missing IF statement")
-                    return False
-                elif if_count > 1:
-                    self.__print_err__("Multiple IF statements")
-                    return False
-                elif elif_count > 0:
-                    if first_elif_pos != if_pos + 1:
-                        self.__print_err__("ELIF statement must be after IF statement")
-                        return False
-                    if (last_elif_pos - first_elif_pos + 1) != elif_count:
-                        self.__print_err__("ELIF statements must begin with IF statement and end with ELSE statement")
-                        return False
-                    if else_pos != last_elif_pos + 1:
-                        self.__print_err__("ELSE statement must be after last ELIF statement")
-                        return False
-                elif elif_count == 0:
-                    if else_pos != if_pos + 1:
-                        self.__print_err__("ELSE statement must be after IF statement")
-                        return False
-
-            if not child.self_check(states, tape_count, alphabet):
-                return False
-            if not child.check_children(states, tape_count, alphabet):
-                return False
-
-        return True
-
-    def execute(self, tape_state: List[str], is_debug_mode: bool = False) -> NodeExecuteResult | None:
-        for child in self.children:
-            result = child.execute(tape_state, is_debug_mode)
-            if result is not None:
-                return result
+                stack.append(iter(child.enter(tape_state, is_debug_mode)))
 
         return None
 
-    def self_check(self, states: List[str], tape_count: int, alphabet: List[str]) -> bool:
-        return True
+    # returns the children executed when the node is reached
+    def enter(self, tape_state: List[int], is_debug_mode: bool = False) -> List["Node"]:
+        return self.children
+
+    # returns the error messages of the node (without its children, see analyze_program)
+    #    states and alphabet - sets (or dicts) of the defined states and alphabet values
+    def get_errors(self, states: Container[str], tape_count: int, alphabet: Container[str]) -> List[str]:
+        return []
 
-    def __print_err__(self, msg: str):
-        print(f"In component:\n{self}\n{msg}")
+    # source text of the component, rendered once (the program must not change after it's parsed)
+    def get_source(self) -> str:
+        if self.source is None:
+            self.source = str(self)
+        return self.source
 
     def __str__(self):
-        lines = map(lambda v: v[1].value, sorted(list(self.lines.items()), key=lambda v: v[0]))
+        lines = map(lambda v: v[1].value, sorted(list(self.get_lines().items()), key=lambda v: v[0]))
         return "\n".join(lines)
 
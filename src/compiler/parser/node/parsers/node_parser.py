@@ -1,36 +1,67 @@
 from typing import Iterator
-from src.compiler.tokenizer.tokenizer import Token, TokenValue
+from src.compiler.tokenizer.tokenizer import SectionLine, Token, TokenValue
 
-from src.compiler.parser.node.node import Node
+from src.compiler.parser.node.node import Node, NodeType
 from src.compiler.parser import print_err
 
-from src.compiler.parser.node.if_node import IfNode
 from src.compiler.parser.node.parsers.if_node_parser import parse_if_node
 from src.compiler.parser.node.parsers.then_node_parser import parse_then_node
 from src.compiler.parser.node.parsers.else_node_parser import parse_else_node
 from src.compiler.parser.node.parsers.goto_node_parser import parse_goto_node
 
+# parses the statements of the block (state, THEN or ELSE section) up to its closing '}' tag (the opening tag is already read)
+#    the nested THEN and ELSE sections are kept on the explicit stack of the open blocks, so the nesting depth
+#    is not limited by the recursion limit
+#    the stack contains the open blocks with the lines of their opening tags
+def parse_block(block: Node, begin_section: TokenValue, tokens_iter: Iterator[TokenValue]) -> bool:
+    stack = [(block, begin_section.line)]
+    current_token = begin_section
+    try:
+        while len(stack) > 0:
+            node, _ = stack[-1]
+            current_token = tokens_iter.__next__()
+            if current_token.token == Token.SECTION_END:
+                node.add_line(current_token.line)
+                stack.pop()
+                continue
+            child = parse_node(current_token, tokens_iter)
+            if child is None:
+                return False
+            node.add_child(child)
+            if child.node_type == NodeType.IF or child.node_type == NodeType.ELIF:
+                then_node = parse_then_node(tokens_iter)
+                if then_node is None:
+                    return False
+                child.add_child(then_node)
+                child = then_node
+            # THEN and ELSE nodes are created with the line of their opening tag
+            if child.node_type == NodeType.THEN or child.node_type == NodeType.ELSE:
+                stack.append((child, next(iter(child.lines.values()))))
+    except StopIteration:
+        print_unclosed_block_err(stack[-1][0], stack[-1][1], current_token)
+        return False
+
+    return True
+
+# parses the statement beginning with current_token, the sections of the IF and ELSE statements are parsed by parse_block
 def parse_node(current_token: TokenValue, tokens_iter: Iterator[TokenValue]) -> Node | None:
     if current_token.token == Token.IF:
-        return parse_if_then_node(tokens_iter, is_elif=False)
+        return parse_if_node(tokens_iter, is_elif=False)
     elif current_token.token == Token.ELSE_IF:
-        return parse_if_then_node(tokens_iter, is_elif=True)
+        return parse_if_node(tokens_iter, is_elif=True)
     elif current_token.token == Token.ELSE:
-        return parse_else_node(tokens_iter, parse_node)
+        return parse_else_node(tokens_iter)
     elif current_token.token == Token.GOTO:
         return parse_goto_node(tokens_iter)
     else:
         print_err(f"Unexpected token {current_token.token}", current_token.line)
         return None
 
-def parse_if_then_node(tokens_iter: Iterator[TokenValue], is_elif: bool) -> IfNode | None:
-    if_node = parse_if_node(tokens_iter, is_elif)
-    if if_node is None:
-        return None
-    then_node = parse_then_node(tokens_iter, parse_node)
-    if then_node is None:
-        return None
-    if_node.add_child(then_node)
-    return if_node
-
-
+def print_unclosed_block_err(node: Node, begin_line: SectionLine, current_token: TokenValue):
+    begin = f"{begin_line.no}: {begin_line.value}"
+    if node.node_type == NodeType.THEN:
+        print_err(f"Expected }} tag, for the section opened at line: '{begin}', not found.", current_token.line)
+    elif node.node_type == NodeType.ELSE:
+        print_err(f"Expected '}}' tag, for the section opened at line: '{begin}' not found.", current_token.line)
+    else:
+        print_err(f"Expected closing tag '}}' for tag opened at line '{begin}', found {current_token}", current_token.line)
@@ -7,7 +7,7 @@ from src.compiler.parser import print_err, get_tape_id
 from src.compiler.parser.node.state_node import StateNode
 from src.compiler.parser.node.node import Node
 
-def parse_state(tokens_iter: Iterator[TokenValue], parse_node: Callable[[TokenValue, Iterator[TokenValue]], Node | None]) -> StateNode | None:
+def parse_state(tokens_iter: Iterator[TokenValue], parse_block: Callable[[Node, TokenValue, Iterator[TokenValue]], bool]) -> StateNode | None:
     state_name = tokens_iter.__next__()
     if state_name.token != Token.VAR:
         print_err("Expected state definition.", state_name.line)
@@ -21,18 +21,7 @@ def parse_state(tokens_iter: Iterator[TokenValue], parse_node: Callable[[TokenVa
         print_err(f"Expected '{{', found {section_start}", section_start.line)
         return None
     state.add_line(section_start.line)
-    section_end = tokens_iter.__next__()
-    try:
-        while section_end.token != Token.SECTION_END:
-            node = parse_node(section_end, tokens_iter)
-            if node is None:
-                return None
-            state.add_child(node)
-            section_end = tokens_iter.__next__()
-    except StopIteration:
-        print_err(f"Expected closing tag '}}' for tag opened at line '{section_start.line.no}: {section_start.line.value}', found {section_end}", section_end.line)
+    if not parse_block(state, section_start, tokens_iter):
         return None
 
-    state.add_line(section_end.line)
-
     return state
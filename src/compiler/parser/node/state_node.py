@@ -1,4 +1,4 @@
-from src.compiler.parser.node.node import Node, NodeType, NodeExecuteResult
+from src.compiler.parser.node.node import Node, NodeType
 from src.compiler.tokenizer.tokenizer import SectionLine, Token, TokenValue, TokenizerProgram, TokenizerResult
 from typing import List
 
@@ -7,9 +7,9 @@ class StateNode(Node):
         super().__init__(NodeType.STATE, line)
         self.name = name
 
-    def execute(self, tape_state: List[str], is_debug_mode: bool = False) -> NodeExecuteResult | None:
+    def enter(self, tape_state: List[int], is_debug_mode: bool = False) -> List[Node]:
         if is_debug_mode:
             print(f"    > Current state: {self.name}")
-            print(f"{self}")
-        return super().execute(tape_state, is_debug_mode)
+            print(self.get_source())
+        return self.children
 
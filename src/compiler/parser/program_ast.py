@@ -2,8 +2,11 @@ from typing import List
 from src.compiler.tokenizer.tokenizer import Token, TokenizerProgram
 from src.compiler.parser import print_err
 from src.compiler.parser.node.node import Node
+from src.compiler.parser.semantic_analysis import analyze_program
+from src.compiler.optimizer.state_minimization import MinimizationReport, minimize_program
+from src.compiler.symbol_table import SymbolTable
 from src.compiler.parser.node.parsers.state_parser import parse_state
-from src.compiler.parser.node.parsers.node_parser import parse_node
+from src.compiler.parser.node.parsers.node_parser import parse_block
 
 class ProgramAST:
     def __init__(self, tape_count: int, alphabet: List[str]):
@@ -12,6 +15,9 @@ class ProgramAST:
         self.start_node = None
         self.end_nodes = []
         self.nodes = {}
+        self.symbols = None
+        # states removed by minimize (None if the program was not minimized)
+        self.minimization: MinimizationReport | None = None
 
     def set_start_node(self, start_node: str):
         self.start_node = start_node
@@ -22,43 +28,27 @@ class ProgramAST:
     def add_node(self, name: str, node: Node):
         self.nodes[name] = node
 
+    # prints all the semantic errors of the program (see analyze_program)
     def check_syntax(self) -> bool:
-        if self.start_node is None:
-            self.__print_err__("Start state is undefined!")
-            return False
-
-        if self.start_node not in self.nodes:
-            self.__print_err__(f"Start state '{self.start_node}' is undefined")
-            return False
-
-        if not self.__check_end_nodes__():
-            return False
-
-        for state_name, state in self.nodes.items():
-            if not state.does_end_with_goto():
-                if state_name not in self.end_nodes:
-                    self.__print_err__(f"State '{state_name}' have a path that does not result in tape action.")
-                    return False
-            if not state.self_check(list(self.nodes.keys()), self.tape_count, self.alphabet):
-                return False
-            if not state.check_children(list(self.nodes.keys()), self.tape_count, self.alphabet):
-                return False
-        return True
+        errors = analyze_program(self)
+        for error in errors:
+            self.__print_err__(f"{error}")
+        return len(errors) == 0
+
+    # removes the unreachable states and merges the equivalent states (must be called after check_syntax, see minimize_program)
+    def minimize(self) -> MinimizationReport:
+        self.minimization = minimize_program(self)
+        return self.minimization
+
+    # compiles the conditions and the tape actions against the symbol codes (must be called after check_syntax)
+    def encode(self, symbols: SymbolTable):
+        for state in self.nodes.values():
+            state.encode(symbols)
+        self.symbols = symbols
 
     def get_state(self, name: str) -> Node | None:
         return self.nodes[name]
 
-    def __check_end_nodes__(self) -> bool:
-        if len(self.end_nodes) == 0:
-            self.__print_err__("End states are undefined!")
-            return False
-
-        for node in self.end_nodes:
-            if node not in self.nodes:
-                self.__print_err__(f"End state '{node}' is undefined")
-                return False
-        return True
-
     def __print_err__(self, msg: str):
         print(msg)
 
@@ -113,7 +103,7 @@ def parse_program(tokenizer_result: TokenizerProgram, tape_count: int, alphabet:
         ast.set_end_nodes(end_states)
 
         while True:
-            state = parse_state(tokens, parse_node)
+            state = parse_state(tokens, parse_block)
             if state is None:
                 return None
             ast.add_node(state.name, state)
@@ -0,0 +1,51 @@
+from typing import List
+from src.compiler.parser.node.node import Node, NodeType
+
+class SemanticError:
+    def __init__(self, message: str, node: Node | None = None):
+        self.message = message
+        self.node = node
+
+    def __str__(self):
+        if self.node is None:
+            return self.message
+        return f"In component:\n{self.node}\n{self.message}"
+
+# checks the whole program in one pass over the state trees and returns all the errors found
+#    the states and the alphabet are looked up in the sets, so the pass is linear in the size of the program
+def analyze_program(program) -> List[SemanticError]:
+    if program.start_node is None:
+        return [SemanticError("Start state is undefined!")]
+
+    errors = []
+    if program.start_node not in program.nodes:
+        errors.append(SemanticError(f"Start state '{program.start_node}' is undefined"))
+    if len(program.end_nodes) == 0:
+        errors.append(SemanticError("End states are undefined!"))
+    for name in program.end_nodes:
+        if name not in program.nodes:
+            errors.append(SemanticError(f"End state '{name}' is undefined"))
+
+    end_nodes = set(program.end_nodes)
+    alphabet = set(program.alphabet)
+    for name, state in program.nodes.items():
+        ends_with_goto = True
+        state_errors = []
+        stack = [state]
+        while len(stack) > 0:
+            node = stack.pop()
+            if len(node.children) == 0:
+                if node.node_type != NodeType.GOTO:
+                    ends_with_goto = False
+            else:
+                children_error = node.get_children_error()
+                if children_error is not None:
+                    state_errors.append(SemanticError(children_error, node))
+                stack.extend(reversed(node.children))
+            for message in node.get_errors(program.nodes, program.tape_count, alphabet):
+                state_errors.append(SemanticError(message, node))
+
+        if not ends_with_goto and name not in end_nodes:
+            errors.append(SemanticError(f"State '{name}' have a path that does not result in tape action."))
+        errors.extend(state_errors)
+    return errors
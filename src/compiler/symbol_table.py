@@ -0,0 +1,74 @@
+from array import array
+from typing import Iterable, List
+
+# interns the alphabet values into small integer codes (the position of the value in the alphabet)
+#    tapes are stored as the packed arrays of codes: bytearray if the alphabet fits in a byte,
+#    array('H') or array('I') otherwise
+class SymbolTable:
+    def __init__(self, alphabet: List[str]):
+        self.symbols = list(alphabet)
+        self.codes = {symbol: code for code, symbol in enumerate(self.symbols)}
+        if len(self.symbols) <= 0x100:
+            self.typecode = 'B'
+        elif len(self.symbols) <= 0x10000:
+            self.typecode = 'H'
+        else:
+            self.typecode = 'I'
+        # translation of the bytes into the codes (see encode_bytes)
+        self.byte_table = None
+        self.byte_values = None
+
+    def encode(self, symbol: str) -> int:
+        code = self.codes.get(symbol)
+        if code is None:
+            raise Exception(f"Value '{symbol}' is not defined in the alphabet")
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.symbols[code]
+
+    def new_cells(self, codes: Iterable[int]) -> bytearray | array:
+        if self.typecode == 'B':
+            return bytearray(codes)
+        return array(self.typecode, codes)
+
+    def fill_cells(self, code: int, count: int) -> bytearray | array:
+        if self.typecode == 'B':
+            return bytearray((code,)) * count
+        return array(self.typecode, (code,)) * count
+
+    def cells_from_bytes(self, data: bytes) -> bytearray | array:
+        if self.typecode == 'B':
+            return bytearray(data)
+        cells = array(self.typecode)
+        cells.frombytes(data)
+        return cells
+
+    # each byte is the one character symbol (the bytes are translated into the codes at once)
+    def encode_bytes(self, data: bytes) -> bytes:
+        if self.typecode != 'B':
+            raise Exception("Only the alphabets of at most 256 symbols can be read from the bytes")
+        if self.byte_table is None:
+            table = bytearray(256)
+            values = bytearray()
+            for value in range(256):
+                code = self.codes.get(chr(value))
+                if code is not None:
+                    table[value] = code
+                    values.append(value)
+            self.byte_table = bytes(table)
+            self.byte_values = bytes(values)
+        invalid = data.translate(None, self.byte_values)
+        if len(invalid) > 0:
+            raise Exception(f"Value '{chr(invalid[0])}' is not defined in the alphabet")
+        return data.translate(self.byte_table)
+
+    def encode_tape(self, tape: List[str]) -> bytearray | array:
+        return self.new_cells(self.encode(symbol) for symbol in tape)
+
+    def decode_tape(self, cells: Iterable[int]) -> List[str]:
+        symbols = self.symbols
+        return [symbols[code] for code in cells]
+
+    def __len__(self):
+        return len(self.symbols)
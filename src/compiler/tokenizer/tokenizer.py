@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 import re
-from typing import List, Dict
+from typing import BinaryIO, Dict, Iterable, List
 from enum import Enum
 
 class Token(Enum):
@@ -44,11 +44,33 @@ class TokenValue:
 class TokenizerProgram:
     tokens: List[TokenValue]
 
+# tape stored in the file (see MappedTape), format: "bytes" - one symbol per byte (the byte is the one character symbol),
+#    "codes" - packed symbol codes (the positions of the symbols in the alphabet, 1, 2 or 4 bytes per cell)
+#    mode: "read" - the tape can't be changed, "copy" - the changes are not written to the file, "write" - the changes
+#    are written to the file (or to the output file, created as the copy of the input file)
+@dataclass
+class TapeFile:
+    path: str
+    format: str = "codes"
+    mode: str = "copy"
+    output: str | None = None
+
+TAPE_FILE_FORMATS = ["bytes", "codes"]
+TAPE_FILE_MODES = ["read", "copy", "write"]
+
+# tape read from the stream (see StreamTape), the cells are read when the head moves past the already read cells
+#    source: None - the standard input, the binary file (format as in TapeFile), or the iterable of the symbols
+@dataclass
+class TapeStream:
+    source: BinaryIO | Iterable[str] | None = None
+    format: str = "bytes"
+
 @dataclass
 class TokenizerResult:
     alphabet: List[str]
-    tapes: List[List[str]]
+    tapes: List[List[str] | TapeFile | TapeStream]
     program_content: TokenizerProgram
+    blank: str | None = None
 
 @dataclass
 class TokenizerSection:
@@ -149,20 +171,52 @@ def __parse_tape_section_alphabet__(value: str, line_no: int, line: str) -> List
 @dataclass
 class TokenizerTape:
     index: int
-    content: List[str]
+    content: List[str] | TapeFile | TapeStream
+
+__TAPE_FILE_PATTERN__ = re.compile(r'^T\.(\d+)[ ]*=[ ]*(\w+)\([ ]*"([^"]+)"(?:[ ]*,[ ]*(\w+))?(?:[ ]*,[ ]*"([^"]+)")?[ ]*\)$')
+
+__TAPE_STREAM_PATTERN__ = re.compile(r'^T\.(\d+)[ ]*=[ ]*stdin\([ ]*(\w*)[ ]*\)$')
+
+def __parse_tape_file__(match: re.Match, line: SectionLine) -> TapeFile | None:
+    tape_file = TapeFile(path=match.group(3), format=match.group(2), mode=match.group(4) or "copy", output=match.group(5))
+    if tape_file.format not in TAPE_FILE_FORMATS:
+        print(f"Failed to parse [tape] section. Unknown tape file format '{tape_file.format}' at line '{line.no}: {line.value}'. Available formats: {', '.join(TAPE_FILE_FORMATS)}")
+        return None
+    if tape_file.mode not in TAPE_FILE_MODES:
+        print(f"Failed to parse [tape] section. Unknown tape file mode '{tape_file.mode}' at line '{line.no}: {line.value}'. Available modes: {', '.join(TAPE_FILE_MODES)}")
+        return None
+    if tape_file.output is not None and tape_file.mode != "write":
+        print(f"Failed to parse [tape] section. Output file can be defined only in the write mode at line '{line.no}: {line.value}'")
+        return None
+    if tape_file.mode == "write" and tape_file.format != "codes":
+        print(f"Failed to parse [tape] section. Only the tape files with the symbol codes can be written at line '{line.no}: {line.value}'")
+        return None
+    return tape_file
 
 def __parse_tapes_section__(result: TokenizerResult, section: TokenizerSection) -> bool:
     tape_pattern = r'^T\.(\d+)[ ]*=[ ]*\[(.+)\]$'
     alphabet_pattern = r'^alphabet[ ]*=[ ]*\[(.+)\]$'
+    blank_pattern = r'^blank[ ]*=[ ]*(\S+)$'
     tapes = []
     is_alphabet_defined = False
     for line in section.content:
         line_str = line.value.strip()
         match = re.search(tape_pattern, line_str)
         if match is None:
+            match = __TAPE_STREAM_PATTERN__.search(line_str)
+        if match is None:
+            match = __TAPE_FILE_PATTERN__.search(line_str)
+        if match is None:
+            match = re.search(blank_pattern, line_str)
+            if match is not None:
+                if result.blank is not None:
+                    print(f"Failed to parse [tape] section. Multiple blank symbol definitions at line '{line.no}: {line.value}'")
+                    return False
+                result.blank = match.group(1)
+                continue
             match = re.search(alphabet_pattern, line_str)
             if match is None:
-                print(f"Failed to parse [tape] section. Error at line '{line.no}: {line.value}'. Expected format: T.<n> = [<value1>, <value2>, ...] or alphabet = [<value1>, <value2>, ...]")
+                print(f"Failed to parse [tape] section. Error at line '{line.no}: {line.value}'. Expected format: T.<n> = [<value1>, <value2>, ...], T.<n> = <format>(\"<path>\"[, <mode>][, \"<output path>\"]), T.<n> = stdin([<format>]), alphabet = [<value1>, <value2>, ...] or blank = <value>")
                 return False
             if is_alphabet_defined:
                 print(f"Failed to parse [tape] section. Multiple alphabet definitions at line '{line.no}: {line.value}'")
@@ -182,7 +236,22 @@ def __parse_tapes_section__(result: TokenizerResult, section: TokenizerSection)
                 if tape.index == tape_id:
                     print(f"Failed to parse [tape] section. Multiple definitions of tape {tape_id} at line '{line.no}: {line.value}'.")
                     return False
-            tapes.append(TokenizerTape(index=tape_id, content=list(map(lambda val: val.strip(), match.group(2).split(",")))))
+            if match.re is __TAPE_STREAM_PATTERN__:
+                stream_format = match.group(2) or "bytes"
+                if stream_format not in TAPE_FILE_FORMATS:
+                    print(f"Failed to parse [tape] section. Unknown tape stream format '{stream_format}' at line '{line.no}: {line.value}'. Available formats: {', '.join(TAPE_FILE_FORMATS)}")
+                    return False
+                if any(isinstance(tape.content, TapeStream) for tape in tapes):
+                    print(f"Failed to parse [tape] section. Only one tape can be read from the standard input (line '{line.no}: {line.value}')")
+                    return False
+                tapes.append(TokenizerTape(index=tape_id, content=TapeStream(format=stream_format)))
+            elif match.re is __TAPE_FILE_PATTERN__:
+                tape_file = __parse_tape_file__(match, line)
+                if tape_file is None:
+                    return False
+                tapes.append(TokenizerTape(index=tape_id, content=tape_file))
+            else:
+                tapes.append(TokenizerTape(index=tape_id, content=list(map(lambda val: val.strip(), match.group(2).split(",")))))
 
     if not is_alphabet_defined:
         print(f"Failed to parse [tape] section. Alphabet was not defined.")
@@ -202,142 +271,86 @@ def __parse_tapes_section__(result: TokenizerResult, section: TokenizerSection)
     return True
 
 def __check_tapes__(result: TokenizerResult) -> bool:
+    if result.blank is not None and result.blank not in result.alphabet:
+        print(f"Failed to parse [tapes] section. Blank symbol '{result.blank}' is not defined in the alphabet.")
+        return False
     for tape_id, tape in enumerate(result.tapes):
+        # the values of the tape files and streams are checked when they are read
+        if isinstance(tape, (TapeFile, TapeStream)):
+            continue
         for character in tape:
             if not character in result.alphabet:
                 print(f"Failed to parse [tapes] section. Character '{character}' in tape T.{tape_id} is not defined in the alphabet.")
                 return False
     return True
 
+# keywords are recognized only as the whole words (separated by the whitespaces)
+__KEYWORD_TOKENS__ = {
+    "start": Token.START,
+    "end": Token.END,
+    "goto": Token.GOTO,
+    "if": Token.IF,
+    "then": Token.THEN,
+    "else": Token.ELSE,
+    "elif": Token.ELSE_IF,
+}
+
+# keywords recognized also inside the words (e.g. "mov_r]")
+__VALUE_KEYWORD_TOKENS__ = {
+    "mov_l": Token.MOV_L,
+    "mov_r": Token.MOV_R,
+    "stay": Token.STAY,
+}
+
+__RESTRICTED_TOKENS__ = ["=", "!", ",", "{", "}", "[", "]", ":", "\"", "&", "|", "(", ")"]
+__RESTRICTED_PATTERN__ = re.compile("[" + re.escape("".join(__RESTRICTED_TOKENS__)) + "]")
+
+__SYMBOL_TOKENS__ = {token.value: token for token in [
+    Token.EQUAL, Token.NOT_EQUAL, Token.AND, Token.OR, Token.ASSIGN, Token.SECTION_START, Token.SECTION_END,
+    Token.TAB_START, Token.TAB_END, Token.SEPARATOR, Token.GROUP_START, Token.GROUP_END,
+]}
+
+# the operators are matched from the left ("===" is "==" followed by "="), the text runs until the next
+#    whitespace, symbol or operator
+#    each match is the tuple: (preceding whitespaces, symbol, text)
+__PROGRAM_TOKEN_PATTERN__ = re.compile(r'(\s*)(?:(==|!=|&&|\|\||[:{}\[\](),])|((?:[^\s:{}\[\](),=!&|]+|(?!==|!=|&&|\|\|)[=!&|])+))')
+
 def __tokenize_program_section__(section: TokenizerSection) -> TokenizerProgram | None:
     tokens = []
     for line in section.content:
         if line.value.startswith("#"):
             continue
-        line_str = re.sub(r'\s+', ' ', line.value.lower())
+        line_str = line.value.lower()
         try:
-            for word in line_str.split(" "):
-                if word == "start":
-                    tokens.append(TokenValue(token=Token.START, value=None, line=line))
-                elif word == "end":
-                    tokens.append(TokenValue(token=Token.END, value=None, line=line))
-                elif word == "goto":
-                    tokens.append(TokenValue(token=Token.GOTO, value=None, line=line))
-                elif word == "if":
-                    tokens.append(TokenValue(token=Token.IF, value=None, line=line))
-                elif word == "then":
-                    tokens.append(TokenValue(token=Token.THEN, value=None, line=line))
-                elif word == "else":
-                    tokens.append(TokenValue(token=Token.ELSE, value=None, line=line))
-                elif word == "elif":
-                    tokens.append(TokenValue(token=Token.ELSE_IF, value=None, line=line))
-                elif word == "mov_l":
-                    tokens.append(TokenValue(token=Token.MOV_L, value=None, line=line))
-                elif word == "mov_r":
-                    tokens.append(TokenValue(token=Token.MOV_R, value=None, line=line))
-                elif word == "stay":
-                    tokens.append(TokenValue(token=Token.STAY, value=None, line=line))
-                elif word == "[":
-                    tokens.append(TokenValue(token=Token.TAB_START, value=None, line=line))
-                elif word == "]":
-                    tokens.append(TokenValue(token=Token.TAB_END, value=None, line=line))
-                elif word == "{":
-                    tokens.append(TokenValue(token=Token.SECTION_START, value=None, line=line))
-                elif word == "}":
-                    tokens.append(TokenValue(token=Token.SECTION_END, value=None, line=line))
-                elif word == "==":
-                    tokens.append(TokenValue(token=Token.EQUAL, value=None, line=line))
-                elif word == "!=":
-                    tokens.append(TokenValue(token=Token.NOT_EQUAL, value=None, line=line))
-                elif word == "&&":
-                    tokens.append(TokenValue(token=Token.AND, value=None, line=line))
-                elif word == "||":
-                    tokens.append(TokenValue(token=Token.OR, value=None, line=line))
+            matches = __PROGRAM_TOKEN_PATTERN__.findall(line_str)
+            last_index = len(matches) - 1
+            for index, (_, symbol, text) in enumerate(matches):
+                if symbol:
+                    tokens.append(TokenValue(__SYMBOL_TOKENS__[symbol], None, line))
+                    continue
+                keyword = __KEYWORD_TOKENS__.get(text)
+                if keyword is not None and (index == 0 or matches[index][0]) and (index == last_index or matches[index + 1][0]):
+                    tokens.append(TokenValue(keyword, None, line))
                 else:
-                    letters = []
-                    SINGLE_CHAR_TOKENS = [Token.ASSIGN.value, Token.SECTION_START.value, Token.SECTION_END.value, Token.TAB_START.value, Token.TAB_END.value, Token.SEPARATOR.value, Token.GROUP_START.value, Token.GROUP_END.value]
-                    for c in word:
-                        value = "".join(letters)
-                        if c == "=":
-                            if len(letters) == 0:
-                                letters.append(c)
-                            elif len(letters) > 0 and letters[-1] == "=":
-                                tokens.append(__parse_non_special_token__("".join(letters[:-1]), line=line))
-                                tokens.append(TokenValue(token=Token.EQUAL, value=None, line=line))
-                                letters = []
-                            elif len(letters) > 0 and letters[-1] == "!":
-                                tokens.append(__parse_non_special_token__("".join(letters[:-1]), line=line))
-                                tokens.append(TokenValue(token=Token.NOT_EQUAL, value=None, line=line))
-                                letters = []
-                            else:
-                                letters.append(c)
-                        elif c == "&":
-                            if len(letters) == 0:
-                                letters.append(c)
-                            elif len(letters) > 0 and letters[-1] == "&":
-                                tokens.append(__parse_non_special_token__("".join(letters[:-1]), line=line))
-                                tokens.append(TokenValue(token=Token.AND, value=None, line=line))
-                                letters = []
-                            else:
-                                letters.append(c)
-                        elif c == "|":
-                            if len(letters) == 0:
-                                letters.append(c)
-                            elif len(letters) > 0 and letters[-1] == "|":
-                                tokens.append(__parse_non_special_token__("".join(letters[:-1]), line=line))
-                                tokens.append(TokenValue(token=Token.OR, value=None, line=line))
-                                letters = []
-                            else:
-                                letters.append(c)
-                        elif c in SINGLE_CHAR_TOKENS:
-                            tokens.append(__parse_non_special_token__(value, line=line))
-                            letters = []
-                            if c == ":":
-                                tokens.append(TokenValue(token=Token.ASSIGN, value=None, line=line))
-                            elif c == "{":
-                                tokens.append(TokenValue(token=Token.SECTION_START, value=None, line=line))
-                            elif c == "}":
-                                tokens.append(TokenValue(token=Token.SECTION_END, value=None, line=line))
-                            elif c == "[":
-                                tokens.append(TokenValue(token=Token.TAB_START, value=None, line=line))
-                            elif c == "]":
-                                tokens.append(TokenValue(token=Token.TAB_END, value=None, line=line))
-                            elif c == "(":
-                                tokens.append(TokenValue(token=Token.GROUP_START, value=None, line=line))
-                            elif c == ")":
-                                tokens.append(TokenValue(token=Token.GROUP_END, value=None, line=line))
-                            elif c == ",":
-                                tokens.append(TokenValue(token=Token.SEPARATOR, value=None, line=line))
-                            else:
-                                raise TokenizerError("Compiler error. Missed the handler for the single char token '{c}'")
-                        else:
-                            letters.append(c)
-                    if len(letters) != 0:
-                        tokens.append(__parse_non_special_token__("".join(letters), line))
+                    tokens.append(__parse_non_special_token__(text, line))
         except TokenizerError as e:
            print(f"Failed to tokenize the program at line '{line.no}: {line.value}' {e}")
            return None
 
-    return TokenizerProgram(tokens=list(filter(lambda token: token is not None, tokens)))
-
-def __parse_non_special_token__(value: str, line: SectionLine) -> TokenValue | None:
-    if len(value) == 0:
-        return None
+    return TokenizerProgram(tokens=tokens)
 
+def __parse_non_special_token__(value: str, line: SectionLine) -> TokenValue:
     if __check_if_const_value__(value):
         return TokenValue(token=Token.CONST, value=value[1:-1], line=line)
 
-    SPECIAL_TOKENS = ["=", "!", ",", "{", "}", "[", "]", ":", "\"", "&", "|", "(", ")"]
-    for token in SPECIAL_TOKENS:
-        if token in value:
-            raise TokenizerError(f"Restricted token '{token}' found in the value.")
-
-    if value == "mov_l":
-        return TokenValue(token=Token.MOV_L, value=None, line=line)
-    elif value == "mov_r":
-        return TokenValue(token=Token.MOV_R, value=None, line=line)
-    elif value == "stay":
-        return TokenValue(token=Token.STAY, value=None, line=line)
+    if __RESTRICTED_PATTERN__.search(value) is not None:
+        for token in __RESTRICTED_TOKENS__:
+            if token in value:
+                raise TokenizerError(f"Restricted token '{token}' found in the value.")
+
+    keyword = __VALUE_KEYWORD_TOKENS__.get(value)
+    if keyword is not None:
+        return TokenValue(token=keyword, value=None, line=line)
     return TokenValue(token=Token.VAR, value=value, line=line)
 
 def __check_if_const_value__(value: str) -> bool:
@@ -345,6 +358,8 @@ def __check_if_const_value__(value: str) -> bool:
         return False
     if value[0] != "\"" or value[-1] != "\"":
         return False
+    if "\"" not in value[1:-1]:
+        return True
 
     prev_char = None
     for c in value[1:-1]:
@@ -1,15 +1,24 @@
 from dataclasses import dataclass
 from typing import List
-from src.compiler.tokenizer.tokenizer import tokenize
+from src.compiler.tokenizer.tokenizer import TapeFile, TapeStream, tokenize
 from src.compiler.parser.program_ast import parse_program, ProgramAST
+from src.compiler.symbol_table import SymbolTable
 
 @dataclass
 class Config:
     alphabet: List[str]
-    tapes: List[List[str]]
+    tapes: List[List[str] | TapeFile | TapeStream]
     program: ProgramAST
+    symbols: SymbolTable
+    blank: str | None = None
 
-def load_from_file(filepath: str) -> Config | None:
+def load_from_file(filepath: str, use_cache: bool = False) -> Config | None:
+    config = read_config_file(filepath)
+    if config is None:
+        return None
+    return load_from_string(config, use_cache)
+
+def read_config_file(filepath: str) -> str | None:
     file_content = None
 
     try:
@@ -28,9 +37,21 @@ def load_from_file(filepath: str) -> Config | None:
         print(f"Failed to read config file")
         return None
 
-    return load_from_string("".join(file_content))
+    return "".join(file_content)
+
+# use_cache - reuse the config compiled from the same source (see ConfigCache), disabled by default, so the library
+#    never writes to the cache directory unless asked to (the application enables it, see --no-cache)
+#    minimize - remove the unreachable states and merge the equivalent states (see ProgramAST.minimize)
+def load_from_string(config: str, use_cache: bool = False, minimize: bool = True) -> Config | None:
+    cache = None
+    if use_cache:
+        # imported here, the cache module depends on the Config class
+        from src.config.config_cache import get_config_cache
+        cache = get_config_cache()
+        cached_config = cache.load(config, minimize)
+        if cached_config is not None:
+            return cached_config
 
-def load_from_string(config: str) -> Config | None:
     tokenizer_result = tokenize(config)
     if tokenizer_result is None:
         return None
@@ -41,6 +62,14 @@ def load_from_string(config: str) -> Config | None:
 
     if not program.check_syntax():
         return None
+    if minimize:
+        program.minimize()
+
+    symbols = SymbolTable(tokenizer_result.alphabet)
+    program.encode(symbols)
 
-    return Config(alphabet=tokenizer_result.alphabet, tapes=tokenizer_result.tapes, program=program)
+    result = Config(alphabet=tokenizer_result.alphabet, tapes=tokenizer_result.tapes, program=program, symbols=symbols, blank=tokenizer_result.blank)
+    if cache is not None:
+        cache.store(config, result, minimize)
+    return result
 
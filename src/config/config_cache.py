@@ -0,0 +1,260 @@
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, List
+from src.compiler.tokenizer.tokenizer import SectionLine, TapeFile, TapeStream
+from src.compiler.symbol_table import SymbolTable
+from src.compiler.parser.program_ast import ProgramAST
+from src.compiler.parser.node.node import EncodedExecuteResult, Node, NodeExecuteResult
+from src.compiler.parser.node.state_node import StateNode
+from src.compiler.parser.node.if_node import IfCondition, IfConditionType, IfNode
+from src.compiler.parser.node.else_node import ElseNode
+from src.compiler.parser.node.then_node import ThenNode
+from src.compiler.parser.node.goto_node import GotoNode
+from src.compiler.optimizer.state_minimization import MinimizationReport
+from src.config.config import Config
+
+# must be changed with every change of the serialized program format (or of the compiler checks)
+CACHE_FORMAT_VERSION = 5
+CACHE_MAGIC = b"TMCC"
+CACHE_FILE_EXTENSION = ".tmc"
+MEMORY_CACHE_SIZE = 32
+
+__NODE_KINDS__ = [StateNode, IfNode, ElseNode, ThenNode, GotoNode]
+
+def get_default_cache_dir() -> str:
+    cache_dir = os.environ.get("TURING_MACHINE_CACHE_DIR")
+    if cache_dir is not None:
+        return cache_dir
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "turing_machine")
+
+# the key depends on the format version and the Python version (marshal format), so the stale entries are never read
+#    minimize - the minimized and the full programs are stored separately
+def get_source_hash(source: str, minimize: bool = True) -> str:
+    digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}:{'min' if minimize else 'full'}:".encode())
+    digest.update(source.encode())
+    return digest.hexdigest()
+
+# cache of the compiled (tokenized, parsed, checked) configs
+#    the configs are kept in the in-process LRU, and in the cache directory (one file per source hash), the file
+#    contains the program tree flattened into the marshal serialized tuples (see __serialize__)
+#    the returned configs are shallow copies (the tapes can be changed), the program is shared
+class ConfigCache:
+    def __init__(self, cache_dir: str | None = None, memory_size: int = MEMORY_CACHE_SIZE):
+        self.cache_dir = cache_dir if cache_dir is not None else get_default_cache_dir()
+        self.memory_size = memory_size
+        self.memory: OrderedDict[str, Config] = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def load(self, source: str, minimize: bool = True) -> Config | None:
+        key = get_source_hash(source, minimize)
+        config = self.memory.get(key)
+        if config is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return self.__copy_config__(config)
+
+        config = self.__read__(key)
+        if config is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self.__remember__(key, config)
+        return self.__copy_config__(config)
+
+    def store(self, source: str, config: Config, minimize: bool = True):
+        key = get_source_hash(source, minimize)
+        self.__remember__(key, self.__copy_config__(config))
+        try:
+            data = CACHE_MAGIC + marshal.dumps(__serialize__(key, config))
+            os.makedirs(self.cache_dir, exist_ok=True)
+            file, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=key, suffix=".tmp")
+            try:
+                with os.fdopen(file, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self.get_path(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except (OSError, ValueError):
+            # the cache is only an optimization, the config is compiled again in the next run
+            pass
+
+    def clear(self):
+        self.memory.clear()
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(CACHE_FILE_EXTENSION):
+                try:
+                    os.unlink(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_FILE_EXTENSION)
+
+    def __read__(self, key: str) -> Config | None:
+        try:
+            with open(self.get_path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            if not data.startswith(CACHE_MAGIC):
+                return None
+            return __deserialize__(key, marshal.loads(memoryview(data)[len(CACHE_MAGIC):]))
+        except Exception:
+            # corrupted or incompatible entry (it is replaced by the next store)
+            return None
+
+    def __remember__(self, key: str, config: Config):
+        if self.memory_size <= 0:
+            return
+        self.memory[key] = config
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def __copy_config__(self, config: Config) -> Config:
+        return replace(config, alphabet=list(config.alphabet), tapes=[replace(tape) if isinstance(tape, (TapeFile, TapeStream)) else list(tape) for tape in config.tapes])
+
+__default_cache__: ConfigCache | None = None
+
+def get_config_cache() -> ConfigCache:
+    global __default_cache__
+    if __default_cache__ is None:
+        __default_cache__ = ConfigCache()
+    return __default_cache__
+
+# the program tree is stored in the pre-order list of (kind, parent index, line numbers, node data) tuples,
+#    the conditions in the list of (type, lhs, rhs, rhs code, rhs tape, down index, next index) tuples, so both the serialization
+#    and the deserialization are iterative (deeply nested programs don't hit the recursion limits)
+def __serialize__(key: str, config: Config) -> tuple:
+    program = config.program
+    lines: Dict[int, str] = {}
+    nodes: List[tuple] = []
+    conditions: List[tuple] = []
+
+    stack = [(state, -1) for state in reversed(list(program.nodes.values()))]
+    while len(stack) > 0:
+        node, parent = stack.pop()
+        for line in node.lines.values():
+            lines[line.no] = line.value
+        kind = __NODE_KINDS__.index(type(node))
+        if isinstance(node, StateNode):
+            data = node.name
+        elif isinstance(node, IfNode):
+            data = (node.node_type.value, __serialize_condition__(node.condition, conditions))
+        elif isinstance(node, GotoNode):
+            result = node.execute_result
+            encoded = node.encoded_result
+            data = (node.next_state, node.tape_values, node.tape_movement,
+                    None if result is None else (result.tape_movement, result.tape_value, result.new_state),
+                    None if encoded is None else (encoded.tape_value, encoded.tape_source))
+        else:
+            data = None
+        index = len(nodes)
+        nodes.append((kind, parent, tuple(node.lines.keys()), data))
+        stack.extend((child, index) for child in reversed(node.children))
+
+    tapes = [__serialize_tape__(tape) for tape in config.tapes]
+    minimization = None if program.minimization is None else (program.minimization.unreachable, program.minimization.merged)
+    return (CACHE_FORMAT_VERSION, key, config.alphabet, tapes, config.blank,
+            program.tape_count, program.start_node, program.end_nodes, lines, nodes, conditions, minimization)
+
+# the tape files and streams are stored as the tuples (the tapes defined in the config are the lists)
+def __serialize_tape__(tape: List[str] | TapeFile | TapeStream) -> list | tuple:
+    if isinstance(tape, TapeFile):
+        return ("file", tape.path, tape.format, tape.mode, tape.output)
+    if isinstance(tape, TapeStream):
+        if tape.source is not None:
+            raise ValueError("Tape stream with the custom source can't be cached")
+        return ("stream", tape.format)
+    return tape
+
+def __deserialize_tape__(tape: list | tuple) -> List[str] | TapeFile | TapeStream:
+    if isinstance(tape, list):
+        return tape
+    if tape[0] == "file":
+        return TapeFile(*tape[1:])
+    return TapeStream(format=tape[1])
+
+def __serialize_condition__(condition: IfCondition | None, conditions: List[tuple]) -> int:
+    if condition is None:
+        return -1
+    first = len(conditions)
+    # the conditions shared by multiple parents are stored once
+    graph = condition.get_conditions()
+    indices = {id(current): first + index for index, current in enumerate(graph)}
+    for current in graph:
+        down = indices[id(current.down)] if current.down is not None else -1
+        next = indices[id(current.next)] if current.next is not None else -1
+        conditions.append((current.type.value, current.lhs, current.rhs, current.rhs_code, current.rhs_tape, down, next))
+    return first
+
+def __deserialize__(key: str, payload: tuple) -> Config | None:
+    if payload[0] != CACHE_FORMAT_VERSION:
+        return None
+    version, stored_key, alphabet, tapes, blank, tape_count, start_node, end_nodes, lines, nodes, conditions, minimization = payload
+    if stored_key != key:
+        return None
+
+    tapes = [__deserialize_tape__(tape) for tape in tapes]
+    section_lines = {no: SectionLine(no=no, value=value) for no, value in lines.items()}
+    condition_types = {condition_type.value: condition_type for condition_type in IfConditionType}
+    if_conditions = [IfCondition(condition_types[cond_type], lhs, rhs) for cond_type, lhs, rhs, _, _, _, _ in conditions]
+    for condition, (_, _, _, rhs_code, rhs_tape, down, next) in zip(if_conditions, conditions):
+        condition.rhs_code = rhs_code
+        condition.rhs_tape = rhs_tape
+        if down >= 0:
+            condition.down = if_conditions[down]
+        if next >= 0:
+            condition.next = if_conditions[next]
+
+    program = ProgramAST(tape_count, alphabet)
+    program.set_start_node(start_node)
+    program.set_end_nodes(end_nodes)
+    if minimization is not None:
+        program.minimization = MinimizationReport(unreachable=minimization[0], merged=minimization[1])
+    tree: List[Node] = []
+    for kind, parent, line_nos, data in nodes:
+        node_class = __NODE_KINDS__[kind]
+        first_line = section_lines[line_nos[0]]
+        if node_class is StateNode:
+            node = StateNode(data, first_line)
+        elif node_class is IfNode:
+            node_type, condition = data
+            node = IfNode(first_line)
+            if node_type != node.node_type.value:
+                node.change_to_elif()
+            node.condition = if_conditions[condition] if condition >= 0 else None
+        elif node_class is GotoNode:
+            next_state, tape_values, tape_movement, result, encoded = data
+            node = GotoNode(first_line)
+            node.next_state = next_state
+            node.tape_values = tape_values
+            node.tape_movement = tape_movement
+            if result is not None:
+                node.execute_result = NodeExecuteResult(tape_movement=result[0], tape_value=result[1], new_state=result[2])
+                if encoded is not None:
+                    node.encoded_result = EncodedExecuteResult(tape_movement=result[0], tape_value=encoded[0], tape_source=encoded[1], new_state=result[2])
+        else:
+            node = node_class(first_line)
+        node.lines = {no: section_lines[no] for no in line_nos}
+        tree.append(node)
+        if parent < 0:
+            program.add_node(data, node)
+        else:
+            tree[parent].children.append(node)
+
+    # the conditions and the GOTO results are stored already encoded
+    program.symbols = SymbolTable(alphabet)
+    return Config(alphabet=alphabet, tapes=tapes, program=program, symbols=program.symbols, blank=blank)
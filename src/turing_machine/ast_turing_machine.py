@@ -1,31 +1,225 @@
+import time
 from src.turing_machine.machine import TuringMachine
+from src.turing_machine.profiler import Profiler
+from src.turing_machine.trace import TraceRecorder
+from src.turing_machine.transition_cache import TransitionCache
+from src.turing_machine.sweep import SweepAccelerator
+from src.turing_machine.fusion import FusionAccelerator
+from src.compiler.optimizer.sweep_analysis import find_sweep_states
+from src.compiler.optimizer.goto_fusion import get_fused_transitions
+from src.compiler.optimizer.tape_access import get_tape_access
+from src.compiler.optimizer.decision_tree import get_decision_trees
 from src.config.config import Config
+from src.compiler.parser.node.node import EncodedExecuteResult
 from typing import List
 
-def parse_tape_value_result(result: List[str | int], tape_value: List[str]) -> List[str]:
-    return [val if type(val).__name__ == "str" else tape_value[val] for val in result]
+def parse_tape_value_result(result: EncodedExecuteResult, tape_value: List[int]) -> List[int]:
+    return [val if src is None else tape_value[src] for val, src in zip(result.tape_value, result.tape_source)]
 
 class ASTTuringMachine(TuringMachine):
-    def __init__(self, cfg: Config, is_debug_mode: bool = False):
+    # cache_size = None - unbounded transition cache, cache_size = 0 - transition cache disabled
+    # max_tape_size - maximum number of cells of the growable tapes (used only if the blank symbol is defined)
+    # accelerate_sweeps - skip the steps of the states that only move the head over the tape (see SweepAccelerator),
+    #    and apply the chains of the GOTO statements known at compile time as one step (see FusionAccelerator)
+    def __init__(self, cfg: Config, is_debug_mode: bool = False, cache_size: int | None = None, max_tape_size: int | None = None, accelerate_sweeps: bool = True):
         self.program = cfg.program
         self.is_debug_mode = is_debug_mode
+        # in debug mode every step has to walk the state tree (to print the executed nodes)
+        self.transition_cache = None
+        if not is_debug_mode and cache_size != 0:
+            self.transition_cache = TransitionCache(cache_size)
         initial_state = cfg.program.start_node
         final_states = cfg.program.end_nodes
         if initial_state is None or final_states is None:
             raise Exception("Initial state or final states are undefined in the config file")
-        super().__init__(cfg.tapes, initial_state, final_states)
+        if cfg.program.symbols is None:
+            raise Exception("Program must be encoded with the alphabet symbols before running")
+        super().__init__(cfg.tapes, initial_state, final_states, cfg.symbols, cfg.blank, max_tape_size)
+        # only the tapes read by the state are read in each step, and only the tapes changed by the GOTO statement are written and moved
+        self.tape_access = get_tape_access(self.program)
+        self.read_tapes = self.tape_access.read_tapes
+        # the states are executed with their decision trees (in debug mode the state tree is walked to print the executed nodes)
+        self.decision_trees = None
+        if not is_debug_mode:
+            self.decision_trees = get_decision_trees(self.program)
+        self.sweep = None
+        if accelerate_sweeps and not is_debug_mode:
+            sweep_states = find_sweep_states(self.program)
+            if len(sweep_states) > 0:
+                self.sweep = SweepAccelerator(sweep_states, cfg.symbols, self.run_state)
+        self.fusion = None
+        if accelerate_sweeps and not is_debug_mode:
+            fused_transitions = get_fused_transitions(self.program)
+            if len(fused_transitions) > 0:
+                self.fusion = FusionAccelerator(fused_transitions, self.read_tapes, self.__execute_result__, cache_size)
 
-    def run_state(self, state: str, tape_values: List[str]) -> tuple[str, List[str], List[int]]:
+    # executes exactly one step (the sweeps and the fused transitions are applied only by run_auto)
+    def step(self):
+        _, self.state, writes, moves = self.__get_transition__(self.state)
+        self.steps += 1
+        self.__apply__(writes, moves)
+        return self.state
+
+    # the state is changed before the tapes are moved (the same way as in TuringMachine.step)
+    def __apply__(self, writes: tuple, moves: tuple):
+        tapes = self.tapes
+        for tape_id, value in writes:
+            tapes[tape_id].set_value(value)
+        for tape_id, move in moves:
+            if move == 1:
+                tapes[tape_id].move_right()
+            else:
+                tapes[tape_id].move_left()
+
+    # the sweeps are skipped and the fused transitions are applied, the skipped steps never exceed max_steps
+    #    (with the cycle detection every step is observed by the detector, so the machine is run step by step)
+    def run_auto(self, max_steps: int | None = None, detect_cycles: bool = False) -> bool:
+        if detect_cycles or (self.sweep is None and self.fusion is None):
+            return super().run_auto(max_steps, detect_cycles)
+        while self.state not in self.final_states:
+            if max_steps is not None and self.steps >= max_steps:
+                return False
+            self.__accelerated_step__(max_steps)
+        return True
+
+    def __accelerated_step__(self, max_steps: int | None):
+        if self.sweep is not None and self.state in self.sweep.sweep_states:
+            self.__sweep__(max_steps)
+        if self.fusion is not None and self.state in self.fusion.fused_transitions:
+            budget = None if max_steps is None else max_steps - self.steps
+            fused = self.fusion.apply(self.state, self.tapes, budget)
+            if fused is not None:
+                self.state = fused.new_state
+                self.steps += fused.steps
+                return
+        self.step()
+
+    def __sweep__(self, max_steps: int | None):
+        sweep = self.sweep.sweep_states[self.state]
+        tape = self.tapes[sweep.tape]
+        budget = None if max_steps is None else max_steps - self.steps - 1
+        skipped = self.sweep.skip(self.state, [tape.cells for tape in self.tapes], [tape.head for tape in self.tapes], budget)
+        tape.head += sweep.move * skipped
+        self.steps += skipped
+
+    def run_state(self, state: str, tape_values: List[int]) -> tuple[str, List[int], List[int]]:
+        _, new_state, writes, moves = self.__get_transition__(state, tape_values)
+        new_values = list(tape_values)
+        for tape_id, value in writes:
+            new_values[tape_id] = value
+        movement = [0] * len(tape_values)
+        for tape_id, move in moves:
+            movement[tape_id] = move
+        return (new_state, new_values, movement)
+
+    # returns the transition of the state: (result of the executed GOTO statement, new state, (tape, value) writes, (tape, move) moves)
+    #    the transitions are cached by the values of the tapes read by the state (tape_values - values of all the tapes,
+    #    None - the values under the heads)
+    def __get_transition__(self, state: str, tape_values: List[int] | None = None) -> tuple:
+        read_tapes = self.read_tapes.get(state, ())
+        if tape_values is None:
+            tapes = self.tapes
+            key = (state, tuple([tapes[tape_id].cells[tapes[tape_id].head] for tape_id in read_tapes]))
+        else:
+            key = (state, tuple([tape_values[tape_id] for tape_id in read_tapes]))
+        transition = None if self.transition_cache is None else self.transition_cache.get(key)
+        if transition is None:
+            if tape_values is None:
+                # the values of the other tapes are never read by the state
+                tape_values = [None] * len(self.tapes)
+                for tape_id, value in zip(read_tapes, key[1]):
+                    tape_values[tape_id] = value
+            transition = self.__resolve_transition__(state, tape_values, read_tapes)
+            if self.transition_cache is not None:
+                self.transition_cache.put(key, transition)
+        return transition
+
+    # the values of the read tapes are the part of the cache key, so their unchanged values are not written
+    def __resolve_transition__(self, state: str, tape_values: List[int], read_tapes: tuple) -> tuple:
+        result = self.__execute_result__(state, tape_values)
+        plan = self.tape_access.plans[id(result)]
+        writes = []
+        for tape_id, value, source in plan.writes:
+            if source is not None:
+                value = tape_values[source]
+            if tape_id not in read_tapes or value != tape_values[tape_id]:
+                writes.append((tape_id, value))
+        return (result, result.new_state, tuple(writes), plan.moves)
+
+    # returns the result of the executed GOTO statement
+    def __execute_result__(self, state: str, tape_values: List[int]) -> EncodedExecuteResult:
         current_state = self.program.get_state(state)
         if current_state is None:
             raise Exception(f"State {state} is undefined")
         if self.is_debug_mode:
             print("--------------------------------------------------------------------------------")
-        result = current_state.execute(tape_values, self.is_debug_mode)
+        tree = None if self.decision_trees is None else self.decision_trees.get(state)
+        if tree is not None:
+            result = tree.execute(tape_values)
+        else:
+            result = current_state.execute(tape_values, self.is_debug_mode)
         if self.is_debug_mode:
             print("--------------------------------------------------------------------------------")
         if result is None:
             raise Exception(f"Failed when running state {state}")
+        return result
 
-        return (result.new_state, parse_tape_value_result(result.tape_value, tape_values), result.tape_movement)
+    # the steps are executed one by one with the state trees (or the decision trees), in all of the engines and without
+    #    skipping the sweeps, each of the steps adds its time to the executed GOTO statement (see Profiler)
+    def run_profiled(self, profiler: Profiler, max_steps: int | None = None) -> bool:
+        if profiler.program is not self.program:
+            raise Exception("Profiler was created for the different program")
+        counts = profiler.counts
+        times = profiler.times
+        start_steps = self.steps
+        clock = time.perf_counter_ns
+        start = last = clock()
+        try:
+            while self.state not in self.final_states:
+                if max_steps is not None and self.steps >= max_steps:
+                    return False
+                result, self.state, writes, moves = self.__get_transition__(self.state)
+                self.steps += 1
+                self.__apply__(writes, moves)
+                now = clock()
+                counts[id(result)] += 1
+                times[id(result)] += now - last
+                last = now
+        finally:
+            profiler.steps += self.steps - start_steps
+            profiler.elapsed_ns += time.perf_counter_ns() - start
+        return True
 
+    # the step records are precomputed for each of the GOTO statements, so the recorded step only appends its record to
+    #    the buffer of the recorder; in the sampled trace the changed cells are collected until the next record
+    def run_traced(self, recorder: TraceRecorder, max_steps: int | None = None) -> bool:
+        recorder.start(self)
+        tapes = self.tapes
+        is_sampled = recorder.sample_interval > 1
+        records = recorder.step_records
+        buffer = recorder.buffer
+        pending = recorder.pending
+        try:
+            while self.state not in self.final_states:
+                if max_steps is not None and self.steps >= max_steps:
+                    return False
+                result, self.state, writes, moves = self.__get_transition__(self.state)
+                self.steps += 1
+                if is_sampled:
+                    for tape_id, value in writes:
+                        if value != tapes[tape_id].get_value():
+                            pending[(tape_id, tapes[tape_id].get_position())] = value
+                self.__apply__(writes, moves)
+                if is_sampled:
+                    recorder.pending_steps += 1
+                    if recorder.pending_steps >= recorder.sample_interval:
+                        recorder.record(self)
+                else:
+                    buffer += records[id(result)]
+                    recorder.records += 1
+                    if recorder.records >= recorder.keyframe_interval:
+                        recorder.step = self.steps
+                        recorder.start_chunk(self)
+        finally:
+            recorder.stop(self)
+        return True
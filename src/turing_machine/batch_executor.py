@@ -0,0 +1,290 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Hashable, List
+from src.compiler.parser.program_ast import ProgramAST
+from src.turing_machine.ast_turing_machine import parse_tape_value_result
+from src.turing_machine.cycle_detection import Cycle
+from src.turing_machine.governor import BudgetLimit, ResourceBudget
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+@dataclass
+class BatchRunResult:
+    state: str
+    steps: int
+    tapes: List[List[str]]
+    positions: List[int]
+    finished: bool
+    error: str | None = None
+    cycle: Cycle | None = None
+    # limit of the resource budget that stopped the machine (see BudgetLimit)
+    exhausted: str | None = None
+
+# runs the same program over many tape sets in the lockstep
+#    all the tapes are stored in the single (machines x tapes x cells) NumPy array, every iteration advances
+#    all the running machines by one step, the transitions are resolved once for each unique
+#    (state, tape values) pair and then gathered with the vectorized lookup (the dense table indexed by the packed
+#    (state, tape values) keys, if the number of the keys is at most MAX_LOOKUP_TABLE_SIZE)
+#    the failed machines (undefined state, failed transition, tape size limit) are stopped, the others keep running
+#    max_tape_size - maximum number of cells of each growable tape (the cells are counted as allocated by GrowableTape)
+class BatchExecutor:
+    MIN_GROW_SIZE = 64
+    INITIAL_TABLE_SIZE = 64
+    MAX_LOOKUP_TABLE_SIZE = 1 << 22
+
+    def __init__(self, program: ProgramAST, blank: str | None = None, max_tape_size: int | None = None):
+        if np is None:
+            raise Exception("Batch executor requires the NumPy package (pip install numpy)")
+        if program.symbols is None:
+            raise Exception("Program must be encoded with the alphabet symbols before running")
+        if program.start_node is None or len(program.end_nodes) == 0:
+            raise Exception("Initial state or final states are undefined in the program")
+        self.program = program
+        self.symbols = program.symbols
+        self.tape_count = program.tape_count
+        self.blank = None if blank is None else self.symbols.encode(blank)
+        self.max_tape_size = max_tape_size
+        self.dtype = {'B': np.uint8, 'H': np.uint16, 'I': np.uint32}[self.symbols.typecode]
+        self.state_names = list(program.nodes.keys())
+        self.state_ids = {name: state_id for state_id, name in enumerate(self.state_names)}
+        self.start_id = self.state_ids[program.start_node]
+        self.final_ids = np.array([self.state_ids[name] for name in program.end_nodes], dtype=np.int64)
+
+        # (state, tape values) can be packed into a single int64 key, if the number of combinations is small enough
+        base = max(len(self.symbols), 1)
+        self.key_powers = None
+        if len(self.state_names) * base ** self.tape_count < 2 ** 62:
+            self.key_powers = np.array([base ** i for i in range(self.tape_count)], dtype=np.int64)
+            self.state_key_mult = base ** self.tape_count
+        # transition index of each packed key (-1 - the transition is not resolved yet)
+        self.lookup_table = None
+        if self.key_powers is not None and len(self.state_names) * self.state_key_mult <= BatchExecutor.MAX_LOOKUP_TABLE_SIZE:
+            self.lookup_table = np.full(len(self.state_names) * self.state_key_mult, -1, dtype=np.int64)
+
+        self.transition_index: Dict[Hashable, int] = {}
+        self.table_size = 0
+        self.table_states = np.zeros(BatchExecutor.INITIAL_TABLE_SIZE, dtype=np.int64)
+        self.table_values = np.zeros((BatchExecutor.INITIAL_TABLE_SIZE, self.tape_count), dtype=self.dtype)
+        self.table_moves = np.zeros((BatchExecutor.INITIAL_TABLE_SIZE, self.tape_count), dtype=np.int64)
+        # errors of the failed transitions (the transitions to the state -1)
+        self.table_errors: Dict[int, str] = {}
+
+    # budget - max_steps and max_tape_cells limit all the machines (the machines stopped by the budget have the exhausted
+    #    limit set), the timeout is checked every check_interval steps
+    def run(self, tape_sets: List[List[List[str]]], max_steps: int | None = None, budget: ResourceBudget | None = None) -> List[BatchRunResult]:
+        machine_count = len(tape_sets)
+        if machine_count == 0:
+            return []
+        tape_ids = np.arange(self.tape_count)
+        max_tape_size = self.max_tape_size
+        deadline = None
+        if budget is not None:
+            if budget.check_interval <= 0:
+                raise Exception(f"Budget check interval must be greater than 0 (got {budget.check_interval})")
+            if budget.max_steps is not None:
+                max_steps = budget.max_steps if max_steps is None else min(max_steps, budget.max_steps)
+            if budget.max_tape_cells is not None:
+                max_tape_size = budget.max_tape_cells if max_tape_size is None else min(max_tape_size, budget.max_tape_cells)
+            if budget.timeout is not None:
+                deadline = time.monotonic() + budget.timeout
+        if self.blank is None:
+            max_tape_size = None
+
+        for index, tapes in enumerate(tape_sets):
+            if len(tapes) != self.tape_count:
+                raise Exception(f"Tape set {index} defines {len(tapes)} tapes, expected {self.tape_count}")
+        encoded = [[self.symbols.encode_tape(tape) for tape in tapes] for tapes in tape_sets]
+        lengths = np.array([[len(tape) for tape in tapes] for tapes in encoded], dtype=np.int64).reshape(machine_count, self.tape_count)
+        if (lengths == 0).any():
+            raise Exception("Tapes must contain at least one value")
+
+        # ragged tapes are padded with the blank symbol (or with any value if the tapes are not growable)
+        width = int(lengths.max())
+        cells = np.full((machine_count, self.tape_count, width), self.blank if self.blank is not None else 0, dtype=self.dtype)
+        for index, tapes in enumerate(encoded):
+            for tape_id, tape in enumerate(tapes):
+                cells[index, tape_id, :len(tape)] = np.frombuffer(tape, dtype=self.dtype)
+
+        heads = np.zeros((machine_count, self.tape_count), dtype=np.int64)
+        origin = 0
+        states = np.full(machine_count, self.start_id, dtype=np.int64)
+        steps = np.zeros(machine_count, dtype=np.int64)
+        errors: List[str | None] = [None] * machine_count
+        exhausted: List[str | None] = [None] * machine_count
+        running = ~np.isin(states, self.final_ids)
+        if max_tape_size is not None:
+            # positions of the first and the last allocated cell of each tape
+            low = np.zeros((machine_count, self.tape_count), dtype=np.int64)
+            high = lengths - 1
+            for index in np.flatnonzero((lengths > max_tape_size).any(axis=1)):
+                size = int(lengths[index].max())
+                errors[index] = f"Tape size ({size} cells) exceeds the maximum tape size ({max_tape_size} cells)"
+                running[index] = False
+
+        step_no = 0
+        while max_steps is None or step_no < max_steps:
+            if deadline is not None and step_no % budget.check_interval == 0 and time.monotonic() >= deadline:
+                for index in np.flatnonzero(running):
+                    exhausted[index] = BudgetLimit.DEADLINE.value
+                break
+            rows = np.flatnonzero(running)
+            if rows.size == 0:
+                break
+            row_heads = heads[rows]
+            values = cells[rows[:, None], tape_ids, row_heads]
+
+            transitions = self.__get_transitions__(states[rows], values)
+            new_states = self.table_states[transitions]
+            failed = new_states < 0
+            if failed.any():
+                # the failed machines keep their configuration (as the machine that raised the exception in the step)
+                for row_index in np.flatnonzero(failed):
+                    errors[rows[row_index]] = self.table_errors[int(transitions[row_index])]
+                running[rows[failed]] = False
+                rows = rows[~failed]
+                row_heads = row_heads[~failed]
+                transitions = transitions[~failed]
+                new_states = new_states[~failed]
+            cells[rows[:, None], tape_ids, row_heads] = self.table_values[transitions]
+            new_heads = row_heads + self.table_moves[transitions]
+            states[rows] = new_states
+            steps[rows] += 1
+            still_running = ~np.isin(new_states, self.final_ids)
+
+            if self.blank is None:
+                out_of_bounds = (new_heads < 0) | (new_heads >= lengths[rows])
+                for row_index in np.flatnonzero(out_of_bounds.any(axis=1)):
+                    # the tapes are moved in order, the first tape moved out of bounds stops the machine
+                    failed_tape = int(np.argmax(out_of_bounds[row_index]))
+                    if new_heads[row_index, failed_tape] < 0:
+                        errors[rows[row_index]] = "Tape head moved out of bounds (less than 0)"
+                    else:
+                        errors[rows[row_index]] = "Tape head moved out of bounds (greater than tape length)"
+                    new_heads[row_index, failed_tape:] = row_heads[row_index, failed_tape:]
+                    still_running[row_index] = False
+            else:
+                if max_tape_size is not None:
+                    self.__allocate__(rows, row_heads, new_heads - origin, new_heads, low, high, max_tape_size, still_running, exhausted)
+                grow_size = max(cells.shape[2], BatchExecutor.MIN_GROW_SIZE)
+                if (new_heads < 0).any():
+                    chunk = np.full((machine_count, self.tape_count, grow_size), self.blank, dtype=self.dtype)
+                    cells = np.concatenate((chunk, cells), axis=2)
+                    heads += grow_size
+                    new_heads += grow_size
+                    origin += grow_size
+                if (new_heads >= cells.shape[2]).any():
+                    chunk = np.full((machine_count, self.tape_count, grow_size), self.blank, dtype=self.dtype)
+                    cells = np.concatenate((cells, chunk), axis=2)
+
+            heads[rows] = new_heads
+            running[rows] = still_running
+            step_no += 1
+        if budget is not None and budget.max_steps is not None and step_no >= budget.max_steps:
+            for index in np.flatnonzero(running):
+                exhausted[index] = BudgetLimit.STEPS.value
+
+        results = []
+        for index in range(machine_count):
+            state = int(states[index])
+            tapes = []
+            for tape_id in range(self.tape_count):
+                row = cells[index, tape_id]
+                if self.blank is None:
+                    row = row[:lengths[index, tape_id]]
+                else:
+                    non_blank = np.flatnonzero(row != self.blank)
+                    row = row[non_blank[0]:non_blank[-1] + 1] if non_blank.size > 0 else row[:0]
+                tapes.append(self.symbols.decode_tape(row.tolist()))
+            results.append(BatchRunResult(
+                state=self.state_names[state],
+                steps=int(steps[index]),
+                tapes=tapes,
+                positions=(heads[index] - origin).tolist(),
+                finished=errors[index] is None and exhausted[index] is None and bool(np.isin(state, self.final_ids)),
+                error=errors[index],
+                exhausted=exhausted[index],
+            ))
+        return results
+
+    # the allocated cells of the machines grow as the cells of GrowableTape (doubling the tape size, at most max_tape_size
+    #    cells), the tapes are moved in order, so the first tape exceeding the limit stops the machine (its head and
+    #    the heads of the next tapes are not moved)
+    def __allocate__(self, rows, row_heads, positions, new_heads, low, high, max_tape_size: int, still_running, exhausted: List[str | None]):
+        outside = (positions < low[rows]) | (positions > high[rows])
+        for row_index in np.flatnonzero(outside.any(axis=1)):
+            machine = rows[row_index]
+            for tape_id in np.flatnonzero(outside[row_index]):
+                size = int(high[machine, tape_id] - low[machine, tape_id]) + 1
+                grow_size = min(max(size, BatchExecutor.MIN_GROW_SIZE), max_tape_size - size)
+                if grow_size <= 0:
+                    exhausted[machine] = BudgetLimit.TAPE_CELLS.value
+                    new_heads[row_index, tape_id:] = row_heads[row_index, tape_id:]
+                    still_running[row_index] = False
+                    break
+                if positions[row_index, tape_id] < low[machine, tape_id]:
+                    low[machine, tape_id] -= grow_size
+                else:
+                    high[machine, tape_id] += grow_size
+
+    # returns the index in the transition tables for each of the (state, tape values) rows
+    def __get_transitions__(self, states, values):
+        if self.lookup_table is not None:
+            keys = states * self.state_key_mult + values.astype(np.int64) @ self.key_powers
+            indexes = self.lookup_table[keys]
+            missing = indexes < 0
+            if missing.any():
+                # only the keys seen for the first time are resolved in Python
+                unique_keys, first_rows = np.unique(keys[missing], return_index=True)
+                missing_rows = np.flatnonzero(missing)[first_rows]
+                for key, row in zip(unique_keys.tolist(), missing_rows.tolist()):
+                    self.lookup_table[key] = self.__add_transition__(int(states[row]), values[row].tolist())
+                indexes = self.lookup_table[keys]
+            return indexes
+        if self.key_powers is not None:
+            keys = states * self.state_key_mult + values.astype(np.int64) @ self.key_powers
+            unique_keys, first_rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            unique_keys = unique_keys.tolist()
+        else:
+            rows = np.column_stack((states, values.astype(np.int64)))
+            unique_rows, first_rows, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+            unique_keys = [tuple(row) for row in unique_rows.tolist()]
+
+        indexes = np.empty(len(unique_keys), dtype=np.int64)
+        for i, key in enumerate(unique_keys):
+            index = self.transition_index.get(key)
+            if index is None:
+                row = first_rows[i]
+                index = self.__add_transition__(int(states[row]), values[row].tolist())
+                self.transition_index[key] = index
+            indexes[i] = index
+        return indexes[inverse.reshape(-1)]
+
+    # the failed transition is stored as the transition to the state -1 (with its error), so only the machines
+    #    that reach it are stopped
+    def __add_transition__(self, state_id: int, tape_values: List[int]) -> int:
+        state_name = self.state_names[state_id]
+        state = self.program.get_state(state_name)
+        result = state.execute(tape_values) if state is not None else None
+        error = None
+        if result is None:
+            error = f"Failed when running state {state_name}"
+        elif self.state_ids.get(result.new_state) is None:
+            error = f"State {result.new_state} is undefined"
+
+        if self.table_size == len(self.table_states):
+            self.table_states = np.concatenate((self.table_states, np.zeros_like(self.table_states)))
+            self.table_values = np.concatenate((self.table_values, np.zeros_like(self.table_values)))
+            self.table_moves = np.concatenate((self.table_moves, np.zeros_like(self.table_moves)))
+        index = self.table_size
+        self.table_size += 1
+        if error is not None:
+            self.table_states[index] = -1
+            self.table_errors[index] = error
+            return index
+        self.table_states[index] = self.state_ids[result.new_state]
+        self.table_values[index] = parse_tape_value_result(result, tape_values)
+        self.table_moves[index] = result.tape_movement
+        return index
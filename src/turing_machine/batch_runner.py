@@ -0,0 +1,125 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, replace
+from typing import Iterable, Iterator, List, TextIO, Tuple
+from src.config.config import Config, load_from_string
+from src.turing_machine.engines import create_machine
+from src.turing_machine.batch_executor import BatchRunResult
+from src.turing_machine.governor import ResourceBudget
+
+# config compiled once per worker process (set by the pool initializer)
+__worker_config__: Config | None = None
+__worker_options__: dict = {}
+
+def get_available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return max(os.cpu_count() or 1, 1)
+
+# budget - limits of each run (the 'max_steps' value of the input overrides the budget max_steps)
+def run_input(config: Config, line: str, cache_size: int | None = None, max_tape_size: int | None = None, engine: str = "interpreter",
+              detect_cycles: bool = False, budget: ResourceBudget | None = None) -> BatchRunResult:
+    try:
+        batch_input = json.loads(line)
+        if not isinstance(batch_input, dict):
+            raise Exception("Expected JSON object with the 'tapes' list")
+        tapes = batch_input.get("tapes")
+        if not isinstance(tapes, list) or not all(isinstance(tape, list) for tape in tapes):
+            raise Exception("Expected 'tapes' to be a list of tapes (list of values)")
+        if len(tapes) != config.program.tape_count:
+            raise Exception(f"Expected {config.program.tape_count} tapes, found {len(tapes)}")
+        max_steps = batch_input.get("max_steps")
+        if max_steps is not None and (not isinstance(max_steps, int) or max_steps < 0):
+            raise Exception("Expected 'max_steps' to be a non negative integer")
+    except Exception as e:
+        return BatchRunResult(state="", steps=0, tapes=[], positions=[], finished=False, error=f"Invalid input: {e}")
+
+    machine = None
+    try:
+        machine = create_machine(replace(config, tapes=[[str(value) for value in tape] for tape in tapes]), engine, cache_size=cache_size, max_tape_size=max_tape_size)
+        if budget is None:
+            budget = ResourceBudget()
+        if max_steps is not None:
+            budget = replace(budget, max_steps=max_steps)
+        result = machine.run_governed(budget, detect_cycles)
+        return BatchRunResult(state=result.state, steps=result.steps, tapes=result.tapes, positions=result.positions, finished=result.finished,
+                              cycle=result.cycle, exhausted=None if result.exhausted is None else result.exhausted.value)
+    except Exception as e:
+        if machine is None:
+            return BatchRunResult(state="", steps=0, tapes=[], positions=[], finished=False, error=f"{e}")
+        return BatchRunResult(state=machine.state, steps=machine.steps, tapes=machine.get_tapes_content(), positions=machine.get_tape_positions(), finished=False, error=f"{e}")
+
+def __init_worker__(config_source: str, use_cache: bool, options: dict):
+    global __worker_config__, __worker_options__
+    __worker_config__ = load_from_string(config_source, use_cache)
+    __worker_options__ = options
+
+def __run_chunk__(chunk: List[Tuple[int, str]]) -> List[str]:
+    if __worker_config__ is None:
+        raise Exception("Failed to compile the config in the batch worker")
+    results = []
+    for line_no, line in chunk:
+        result = asdict(run_input(__worker_config__, line, **__worker_options__))
+        results.append(json.dumps({"line": line_no, **result}))
+    return results
+
+def __read_chunks__(lines: Iterable[str], chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+    chunk = []
+    for line_no, line in enumerate(lines):
+        if line.strip() == "":
+            continue
+        chunk.append((line_no + 1, line))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+# runs the program (compiled once in each of the worker processes) for each of the inputs (JSONL lines: {"tapes": [...], "max_steps": N})
+#    results are written as the JSONL lines, in the input order (ordered = True) or in the completion order,
+#    at most (workers * 2) chunks are processed at the same time, so the input is streamed
+def run_batch(config_source: str, lines: Iterable[str], output: TextIO, ordered: bool = True, workers: int | None = None,
+              chunk_size: int = 64, cache_size: int | None = None, max_tape_size: int | None = None, engine: str = "interpreter", detect_cycles: bool = False,
+              budget: ResourceBudget | None = None, use_cache: bool = False) -> int:
+    if chunk_size <= 0:
+        raise Exception(f"Chunk size must be greater than 0 (got {chunk_size})")
+    if workers is None:
+        workers = get_available_cores()
+    options = {"cache_size": cache_size, "max_tape_size": max_tape_size, "engine": engine, "detect_cycles": detect_cycles, "budget": budget}
+    max_in_flight = workers * 2
+    results_count = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=__init_worker__, initargs=(config_source, use_cache, options)) as executor:
+        in_flight: deque[Future] = deque()
+
+        def write_results(future: Future) -> int:
+            results = future.result()
+            for result in results:
+                output.write(result)
+                output.write("\n")
+            return len(results)
+
+        def flush(count: int) -> int:
+            written = 0
+            if ordered:
+                while len(in_flight) > count:
+                    written += write_results(in_flight.popleft())
+                while len(in_flight) > 0 and in_flight[0].done():
+                    written += write_results(in_flight.popleft())
+            else:
+                while len(in_flight) > count:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.remove(future)
+                        written += write_results(future)
+            return written
+
+        for chunk in __read_chunks__(lines, chunk_size):
+            in_flight.append(executor.submit(__run_chunk__, chunk))
+            results_count += flush(max_in_flight - 1)
+        results_count += flush(0)
+
+    output.flush()
+    return results_count
@@ -0,0 +1,579 @@
+import time
+from typing import Callable, Dict, List
+from weakref import WeakKeyDictionary
+from src.compiler.parser.program_ast import ProgramAST
+from src.compiler.parser.node.node import EncodedExecuteResult, Node, NodeType
+from src.compiler.optimizer.decision_tree import DecisionNode, Dispatch, TapeComparison, get_decision_trees
+from src.compiler.optimizer.goto_fusion import FusedTransition, get_fused_transitions
+from src.compiler.parser.node.if_node import IfCondition, IfConditionType, IfNode
+from src.compiler.parser.node.goto_node import GotoNode
+from src.config.config import Config
+from src.turing_machine.ast_turing_machine import ASTTuringMachine, parse_tape_value_result
+from src.turing_machine.profiler import Profiler
+from src.turing_machine.trace import TraceRecorder
+
+class CodegenProgram:
+    def __init__(self, source: str, state_names: List[str], state_functions: List[Callable], transitions: List[EncodedExecuteResult | FusedTransition] | None = None):
+        self.source = source
+        self.state_names = state_names
+        self.state_ids = {name: state_id for state_id, name in enumerate(state_names)}
+        self.state_functions = state_functions
+        # results of the GOTO statements, the profiled program functions return the index of the executed GOTO statement
+        #    (the fused program functions return the index of the executed GOTO statement or of the applied fused transition)
+        self.transitions = transitions
+        # number of the steps of each of the transitions
+        self.transition_steps = None if transitions is None else [transition.steps if isinstance(transition, FusedTransition) else 1 for transition in transitions]
+
+# generated programs are shared by all the machines running the same ProgramAST
+__compiled_programs__: WeakKeyDictionary = WeakKeyDictionary()
+__profiled_programs__: WeakKeyDictionary = WeakKeyDictionary()
+__fused_programs__: WeakKeyDictionary = WeakKeyDictionary()
+
+def compile_program(program: ProgramAST) -> CodegenProgram:
+    compiled = __compiled_programs__.get(program)
+    if compiled is None:
+        compiled = __compile_program__(program)
+        __compiled_programs__[program] = compiled
+    return compiled
+
+# the program used by the profiled runs (see CodegenTuringMachine.run_profiled)
+def compile_profiled_program(program: ProgramAST) -> CodegenProgram:
+    compiled = __profiled_programs__.get(program)
+    if compiled is None:
+        compiled = __compile_program__(program, profiled=True)
+        __profiled_programs__[program] = compiled
+    return compiled
+
+# the program applying the fused transitions (see find_fused_transitions), used by CodegenTuringMachine.run_auto
+def compile_fused_program(program: ProgramAST) -> CodegenProgram:
+    compiled = __fused_programs__.get(program)
+    if compiled is None:
+        compiled = __compile_program__(program, profiled=True, fused=True)
+        __fused_programs__[program] = compiled
+    return compiled
+
+def __compile_program__(program: ProgramAST, profiled: bool = False, fused: bool = False) -> CodegenProgram:
+    if program.symbols is None:
+        raise Exception("Program must be encoded with the alphabet symbols before generating the code")
+    state_names = list(program.nodes.keys())
+    transitions = None
+    transition_ids = None
+    fused_ids = None
+    if profiled:
+        transitions = [node.encoded_result for state in program.nodes.values() for node in state.get_nodes() if isinstance(node, GotoNode) and node.encoded_result is not None]
+        transition_ids = {id(result): transition_id for transition_id, result in enumerate(transitions)}
+    if fused:
+        # the fused transitions follow the GOTO statements in the transitions (by the id of the encoded result of their first GOTO statement)
+        fused_ids = {}
+        for state_fused in get_fused_transitions(program).values():
+            for result_id, fused_transition in state_fused.items():
+                fused_ids[result_id] = (fused_transition, len(transitions))
+                transitions.append(fused_transition)
+    source = generate_program_source(program, state_names, transition_ids, fused_ids)
+    state_ids = {name: state_id for state_id, name in enumerate(state_names)}
+    states = [program.nodes[name] for name in state_names]
+    namespace: Dict = {"interpret": lambda state_id, c, h, edge: __interpret_state__(states[state_id], state_ids, c, h, edge, transition_ids)}
+    exec(compile(source, "<turing-machine-codegen>", "exec"), namespace)
+    state_functions = namespace["STATE_FUNCTIONS"]
+    return CodegenProgram(source, state_names, state_functions, transitions)
+
+# each state is generated as the function: state_<id>(c, h, edge) -> next state id
+#    c - list of the tapes cells, h - list of the tape heads, edge(tape_id, move, next_state) - called when the head
+#    reaches the end of the allocated cells (it grows the tape, or raises the out of bounds error)
+#    the states are generated from their decision trees (see src/compiler/optimizer/decision_tree.py) if possible,
+#    otherwise from the state trees
+#    transition_ids - the functions return the index of the executed GOTO statement (keyed by the id of its encoded result)
+#    instead of the next state id
+#    fused_ids - the fused transitions (and their indexes) of the GOTO statements, applied if the visited cells are allocated
+def generate_program_source(program: ProgramAST, state_names: List[str], transition_ids: Dict[int, int] | None = None,
+                            fused_ids: Dict[int, tuple[FusedTransition, int]] | None = None) -> str:
+    state_ids = {name: state_id for state_id, name in enumerate(state_names)}
+    decision_trees = get_decision_trees(program)
+    lines = []
+    for state_id, name in enumerate(state_names):
+        state = program.nodes[name]
+        lines.append(f"# state: {name}")
+        tree = decision_trees.get(name)
+        if tree is not None and __get_decision_depth__(tree.root) <= MAX_GENERATED_DEPTH:
+            __generate_decision_tree__(f"state_{state_id}", tree.root, name, state_ids, lines, transition_ids, fused_ids)
+            continue
+        lines.append(f"def state_{state_id}(c, h, edge):")
+        if not __can_generate_state__(state):
+            lines.append(f"    return interpret({state_id}, c, h, edge)")
+            lines.append("")
+            continue
+        tapes = sorted(__get_state_tapes__(state))
+        for tape_id in tapes:
+            lines.append(f"    c{tape_id} = c[{tape_id}]")
+            lines.append(f"    h{tape_id} = h[{tape_id}]")
+            lines.append(f"    v{tape_id} = c{tape_id}[h{tape_id}]")
+        if not __generate_block__(state, state_ids, lines, 1, transition_ids, fused_ids):
+            lines.append(f"    raise Exception({repr(f'Failed when running state {name}')})")
+        lines.append("")
+    lines.append(f"STATE_FUNCTIONS = [{', '.join(f'state_{state_id}' for state_id in range(len(state_names)))}]")
+    lines.append("")
+    return "\n".join(lines)
+
+# the states nested deeper than MAX_GENERATED_DEPTH levels, or with the conditions larger than MAX_GENERATED_CONDITION
+#    comparisons (counted as in the generated expression, where the shared conditions are repeated) are not generated,
+#    the Python compiler limits the indentation and the nesting of the parentheses (such states are interpreted)
+MAX_GENERATED_DEPTH = 64
+MAX_GENERATED_CONDITION = 64
+
+def __can_generate_state__(state: Node) -> bool:
+    stack = [(state, 0)]
+    while len(stack) > 0:
+        node, depth = stack.pop()
+        if depth > MAX_GENERATED_DEPTH:
+            return False
+        if isinstance(node, IfNode) and node.condition is not None:
+            if __get_condition_size__(node.condition) > MAX_GENERATED_CONDITION:
+                return False
+        stack.extend((child, depth + 1) for child in node.children)
+    return True
+
+def __get_condition_size__(condition: IfCondition) -> int:
+    # the conditions are sized after their down and next conditions (reversed topological order)
+    sizes = {}
+    for current in reversed(condition.get_conditions()):
+        size = 1
+        for following in (current.down, current.next):
+            if following is not None:
+                size += sizes[id(following)]
+        sizes[id(current)] = min(size, MAX_GENERATED_CONDITION + 1)
+    return sizes[id(condition)]
+
+def __get_state_tapes__(state: Node) -> set:
+    tapes = set()
+    for node in state.get_nodes():
+        if isinstance(node, IfNode) and node.condition is not None:
+            for condition in node.condition.get_conditions():
+                tapes.add(condition.lhs)
+                if condition.rhs_tape is not None:
+                    tapes.add(condition.rhs_tape)
+        if isinstance(node, GotoNode) and node.encoded_result is not None:
+            tapes.update(__get_result_tapes__(node.encoded_result))
+    return tapes
+
+def __get_result_tapes__(result: EncodedExecuteResult) -> set:
+    tapes = set()
+    for tape_id, (source, move) in enumerate(zip(result.tape_source, result.tape_movement)):
+        if source != tape_id or move != 0:
+            tapes.add(tape_id)
+        if source is not None and source != tape_id:
+            tapes.add(source)
+    return tapes
+
+# dispatches with more branches are generated as the dict of the functions of the branches, the smaller ones as the if statements
+MAX_INLINE_BRANCHES = 3
+
+def __get_decision_depth__(root: DecisionNode) -> int:
+    max_depth = 0
+    stack = [(root, 0)]
+    while len(stack) > 0:
+        node, depth = stack.pop()
+        max_depth = max(max_depth, depth)
+        if isinstance(node, TapeComparison):
+            stack.extend([(node.equal, depth + 1), (node.not_equal, depth + 1)])
+        elif isinstance(node, Dispatch):
+            # the branches of the dict dispatch are generated as the separate functions
+            depth = depth + 1 if len(node.branches) <= MAX_INLINE_BRANCHES else 0
+            stack.extend((branch, depth) for branch in node.branches.values())
+            stack.append((node.default, depth))
+    return max_depth
+
+# mirrors DecisionTree.execute, the nodes are generated in pre-order from the explicit stack of the nodes and the lines
+#    of the if statements (the functions of the dict dispatches are generated after the function)
+def __generate_decision_tree__(function_name: str, root: DecisionNode, state_name: str, state_ids: Dict[str, int], lines: List[str], transition_ids: Dict[int, int] | None = None,
+                               fused_ids: Dict[int, tuple] | None = None):
+    tables = []
+    functions = [(function_name, root)]
+    while len(functions) > 0:
+        name, function_root = functions.pop(0)
+        lines.append(f"def {name}(c, h, edge):")
+        for tape_id in sorted(__get_decision_tapes__(function_root)):
+            lines.append(f"    c{tape_id} = c[{tape_id}]")
+            lines.append(f"    h{tape_id} = h[{tape_id}]")
+            lines.append(f"    v{tape_id} = c{tape_id}[h{tape_id}]")
+        stack = [(function_root, 1)]
+        while len(stack) > 0:
+            item = stack.pop()
+            if isinstance(item, str):
+                lines.append(item)
+                continue
+            node, indent = item
+            prefix = "    " * indent
+            if isinstance(node, TapeComparison):
+                stack.extend(reversed([f"{prefix}if v{node.lhs} == v{node.rhs}:", (node.equal, indent + 1), f"{prefix}else:", (node.not_equal, indent + 1)]))
+            elif isinstance(node, Dispatch) and len(node.branches) <= MAX_INLINE_BRANCHES:
+                items = []
+                for value, branch in node.branches.items():
+                    items += [f"{prefix}{'elif' if len(items) > 0 else 'if'} v{node.tape} == {value}:", (branch, indent + 1)]
+                if len(items) > 0:
+                    items += [f"{prefix}else:", (node.default, indent + 1)]
+                else:
+                    items.append((node.default, indent))
+                stack.extend(reversed(items))
+            elif isinstance(node, Dispatch):
+                # the branches leading to the same GOTO statement share the function
+                branch_functions = {}
+                for branch in list(node.branches.values()) + [node.default]:
+                    if id(branch) not in branch_functions:
+                        branch_functions[id(branch)] = f"{function_name}_{len(tables)}_{len(branch_functions)}"
+                        functions.append((branch_functions[id(branch)], branch))
+                table = f"{function_name}_table_{len(tables)}"
+                tables.append(f"{table} = {{{', '.join(f'{value}: {branch_functions[id(branch)]}' for value, branch in node.branches.items())}}}")
+                lines.append(f"{prefix}return {table}.get(v{node.tape}, {branch_functions[id(node.default)]})(c, h, edge)")
+            elif node is None:
+                lines.append(f"{prefix}raise Exception({repr(f'Failed when running state {state_name}')})")
+            else:
+                __generate_goto__(node, state_ids, lines, indent, transition_ids, fused_ids)
+        lines.append("")
+    lines.extend(tables)
+    lines.append("")
+
+# tapes read by the function generated for the decision tree (without the branches of the dict dispatches)
+def __get_decision_tapes__(root: DecisionNode) -> set:
+    tapes = set()
+    stack = [root]
+    while len(stack) > 0:
+        node = stack.pop()
+        if isinstance(node, TapeComparison):
+            tapes.update([node.lhs, node.rhs])
+            stack.extend([node.equal, node.not_equal])
+        elif isinstance(node, Dispatch):
+            tapes.add(node.tape)
+            if len(node.branches) <= MAX_INLINE_BRANCHES:
+                stack.extend(node.branches.values())
+                stack.append(node.default)
+        elif node is not None:
+            tapes.update(__get_result_tapes__(node))
+    return tapes
+
+# mirrors Node.execute: the children are executed in order, until one of them returns the GOTO result
+#    returns True if the generated block always ends with the return statement
+def __generate_block__(node: Node, state_ids: Dict[str, int], lines: List[str], indent: int, transition_ids: Dict[int, int] | None = None,
+                       fused_ids: Dict[int, tuple] | None = None) -> bool:
+    prefix = "    " * indent
+    for child in node.children:
+        if child.node_type == NodeType.GOTO:
+            if child.encoded_result is None:
+                raise Exception(f"GOTO statement must be encoded before generating the code:\n{child}")
+            __generate_goto__(child.encoded_result, state_ids, lines, indent, transition_ids, fused_ids)
+            return True
+        if child.node_type == NodeType.IF or child.node_type == NodeType.ELIF:
+            if child.condition is None:
+                raise Exception(f"No condition defined for the IF statement:\n{child}")
+            lines.append(f"{prefix}if {__generate_condition__(child.condition)}:")
+            block_start = len(lines)
+            # IF statement executes only its first child (THEN statement)
+            if len(child.children) > 0:
+                __generate_block__(child.children[0], state_ids, lines, indent + 1, transition_ids, fused_ids)
+            if len(lines) == block_start:
+                lines.append(f"{prefix}    pass")
+        elif __generate_block__(child, state_ids, lines, indent, transition_ids, fused_ids):
+            return True
+    return False
+
+# mirrors IfCondition.check_condition: if the comparison fails the sibling (next) condition is checked,
+#    otherwise the child (down) condition decides the result
+#    the expressions are generated after the expressions of their down and next conditions (the size is limited
+#    by MAX_GENERATED_CONDITION, see __can_generate_state__)
+def __generate_condition__(condition: IfCondition) -> str:
+    expressions = {}
+    for current in reversed(condition.get_conditions()):
+        op = "==" if current.type == IfConditionType.EQUAL else "!="
+        rhs = f"v{current.rhs_tape}" if current.rhs_tape is not None else f"{current.rhs_code}"
+        comparison = f"v{current.lhs} {op} {rhs}"
+        if current.down is None and current.next is None:
+            expressions[id(current)] = comparison
+            continue
+        down = expressions[id(current.down)] if current.down is not None else "True"
+        next = expressions[id(current.next)] if current.next is not None else "False"
+        expressions[id(current)] = f"({down} if {comparison} else {next})"
+    return expressions[id(condition)]
+
+def __generate_goto__(result: EncodedExecuteResult, state_ids: Dict[str, int], lines: List[str], indent: int, transition_ids: Dict[int, int] | None = None,
+                      fused_ids: Dict[int, tuple] | None = None):
+    prefix = "    " * indent
+    next_state = state_ids.get(result.new_state)
+    if next_state is None:
+        raise Exception(f"State {result.new_state} is undefined")
+    if fused_ids is not None and id(result) in fused_ids:
+        fused_transition, transition_id = fused_ids[id(result)]
+        # the GOTO statement is executed alone, if the fused transition visits the cells which are not allocated
+        if not __generate_fused__(fused_transition, transition_id, lines, indent):
+            return
+    # all the values are read before the writes, so the tape sources see the values from before the step
+    #    the same values are not written (see MappedTape.set_value), so the read-only mapped tapes can be run
+    for tape_id, (value, source) in enumerate(zip(result.tape_value, result.tape_source)):
+        if source is None or source != tape_id:
+            value = value if source is None else f"v{source}"
+            lines.append(f"{prefix}if c{tape_id}[h{tape_id}] != {value}:")
+            lines.append(f"{prefix}    c{tape_id}[h{tape_id}] = {value}")
+    for tape_id, move in enumerate(result.tape_movement):
+        if move == 1:
+            lines.append(f"{prefix}if h{tape_id} + 1 < len(c{tape_id}):")
+            lines.append(f"{prefix}    h[{tape_id}] = h{tape_id} + 1")
+            lines.append(f"{prefix}else:")
+            lines.append(f"{prefix}    edge({tape_id}, 1, {next_state})")
+        elif move == -1:
+            lines.append(f"{prefix}if h{tape_id} > 0:")
+            lines.append(f"{prefix}    h[{tape_id}] = h{tape_id} - 1")
+            lines.append(f"{prefix}else:")
+            lines.append(f"{prefix}    edge({tape_id}, -1, {next_state})")
+    lines.append(f"{prefix}return {next_state if transition_ids is None else transition_ids[id(result)]}")
+
+# mirrors FusionAccelerator.apply: the cells are read (into r<index>) before the writes, the cells of the tape t are f<t>,
+#    its head is g<t>; returns False if the fused transition is always applied (the following code is not reachable)
+def __generate_fused__(fused: FusedTransition, transition_id: int, lines: List[str], indent: int) -> bool:
+    prefix = "    " * indent
+    tapes = sorted({tape_id for tape_id, _ in fused.reads} | {tape_id for tape_id, _, _, _ in fused.writes} |
+                   {tape_id for tape_id, move in enumerate(fused.moves) if move != 0} | {tape_id for tape_id, (low, high) in enumerate(fused.bounds) if low < 0 or high > 0})
+    for tape_id in tapes:
+        lines.append(f"{prefix}f{tape_id} = c[{tape_id}]")
+        lines.append(f"{prefix}g{tape_id} = h[{tape_id}]")
+    checks = []
+    for tape_id, (low, high) in enumerate(fused.bounds):
+        if low < 0:
+            checks.append(f"g{tape_id} >= {-low}")
+        if high > 0:
+            checks.append(f"g{tape_id} + {high} < len(f{tape_id})")
+    if len(checks) > 0:
+        lines.append(f"{prefix}if {' and '.join(checks)}:")
+        prefix += "    "
+    for read_id, (tape_id, offset) in enumerate(fused.reads):
+        lines.append(f"{prefix}r{read_id} = f{tape_id}[{__get_cell_index__(tape_id, offset)}]")
+    for tape_id, offset, code, read_id in fused.writes:
+        cell = f"f{tape_id}[{__get_cell_index__(tape_id, offset)}]"
+        value = code if read_id is None else f"r{read_id}"
+        lines.append(f"{prefix}if {cell} != {value}:")
+        lines.append(f"{prefix}    {cell} = {value}")
+    for tape_id, move in enumerate(fused.moves):
+        if move != 0:
+            lines.append(f"{prefix}h[{tape_id}] = {__get_cell_index__(tape_id, move)}")
+    lines.append(f"{prefix}return {transition_id}")
+    return len(checks) > 0
+
+def __get_cell_index__(tape_id: int, offset: int) -> str:
+    if offset == 0:
+        return f"g{tape_id}"
+    return f"g{tape_id} {'+' if offset > 0 else '-'} {abs(offset)}"
+
+# runs the state with the interpreter (Node.execute) on the cells of the generated code
+def __interpret_state__(state: Node, state_ids: Dict[str, int], c: List, h: List[int], edge: Callable, transition_ids: Dict[int, int] | None = None) -> int:
+    values = [cells[head] for cells, head in zip(c, h)]
+    result = state.execute(values)
+    if result is None:
+        raise Exception(f"Failed when running state {state.name}")
+    next_state = state_ids[result.new_state]
+    for tape_id, value in enumerate(parse_tape_value_result(result, values)):
+        if value != values[tape_id]:
+            c[tape_id][h[tape_id]] = value
+    for tape_id, move in enumerate(result.tape_movement):
+        if move == 1:
+            if h[tape_id] + 1 < len(c[tape_id]):
+                h[tape_id] += 1
+            else:
+                edge(tape_id, 1, next_state)
+        elif move == -1:
+            if h[tape_id] > 0:
+                h[tape_id] -= 1
+            else:
+                edge(tape_id, -1, next_state)
+    return next_state if transition_ids is None else transition_ids[id(result)]
+
+# runs the program compiled into the Python functions (see generate_program_source)
+#    debug and tick modes, the cycle detection and the single step() calls use the interpreter
+class CodegenTuringMachine(ASTTuringMachine):
+    def __init__(self, cfg: Config, is_debug_mode: bool = False, cache_size: int | None = None, max_tape_size: int | None = None, accelerate_sweeps: bool = True):
+        super().__init__(cfg, is_debug_mode, cache_size, max_tape_size, accelerate_sweeps)
+        self.compiled = compile_program(cfg.program)
+        self.is_final = [name in self.final_states for name in self.compiled.state_names]
+        self.sweep_states = [None] * len(self.compiled.state_names)
+        if self.sweep is not None:
+            for name, sweep in self.sweep.sweep_states.items():
+                self.sweep_states[self.compiled.state_ids[name]] = sweep
+        self.pending_state = None
+        # the fused program is used only if some of the GOTO statements are fused
+        self.fused = None
+        if self.fusion is not None:
+            self.fused = compile_fused_program(cfg.program)
+            self.fused_targets = [self.fused.state_ids[transition.new_state] for transition in self.fused.transitions]
+            self.max_fused_steps = max(self.fused.transition_steps)
+
+    def run_auto(self, max_steps: int | None = None, detect_cycles: bool = False) -> bool:
+        if detect_cycles:
+            # the detector observes every step, so the machine is run step by step
+            return super().run_auto(max_steps, detect_cycles)
+        cells = [tape.cells for tape in self.tapes]
+        heads = [tape.head for tape in self.tapes]
+        edge = self.__get_edge__(cells, heads)
+        functions = self.compiled.state_functions
+        is_final = self.is_final
+        state = self.compiled.state_ids[self.state]
+        steps = self.steps
+
+        try:
+            sweep_states = self.sweep_states
+            state_names = self.compiled.state_names
+            if self.fused is not None:
+                # the fused program runs while its transitions fit into max_steps, the last steps are executed one by one
+                fused_functions = self.fused.state_functions
+                targets = self.fused_targets
+                transition_steps = self.fused.transition_steps
+                limit = None if max_steps is None else max_steps - self.max_fused_steps
+                previous_state = None
+                while not is_final[state] and (limit is None or steps <= limit):
+                    sweep = sweep_states[state]
+                    if sweep is not None and state != previous_state:
+                        budget = None if limit is None else limit - steps
+                        skipped = self.sweep.skip(state_names[state], cells, heads, budget)
+                        heads[sweep.tape] += sweep.move * skipped
+                        steps += skipped
+                    previous_state = state
+                    transition = fused_functions[state](cells, heads, edge)
+                    state = targets[transition]
+                    steps += transition_steps[transition]
+            if max_steps is None and self.sweep is None:
+                while not is_final[state]:
+                    state = functions[state](cells, heads, edge)
+                    steps += 1
+            else:
+                previous_state = None
+                while not is_final[state] and (max_steps is None or steps < max_steps):
+                    sweep = sweep_states[state]
+                    # the sweep is skipped when the state is entered, the following self-loop steps end at the terminating cell
+                    if sweep is not None and state != previous_state:
+                        budget = None if max_steps is None else max_steps - steps - 1
+                        skipped = self.sweep.skip(state_names[state], cells, heads, budget)
+                        heads[sweep.tape] += sweep.move * skipped
+                        steps += skipped
+                    previous_state = state
+                    state = functions[state](cells, heads, edge)
+                    steps += 1
+        except Exception:
+            if self.pending_state is not None:
+                state = self.pending_state
+                steps += 1
+            raise
+        finally:
+            self.__store__(cells, heads, state, steps)
+        return is_final[state]
+
+    # runs the profiled program (its functions return the index of the executed GOTO statement), the sweeps are not skipped
+    def run_profiled(self, profiler: Profiler, max_steps: int | None = None) -> bool:
+        if profiler.program is not self.program:
+            raise Exception("Profiler was created for the different program")
+        compiled = compile_profiled_program(self.program)
+        cells = [tape.cells for tape in self.tapes]
+        heads = [tape.head for tape in self.tapes]
+        edge = self.__get_edge__(cells, heads)
+        functions = compiled.state_functions
+        is_final = self.is_final
+        targets = [compiled.state_ids[result.new_state] for result in compiled.transitions]
+        counts = [0] * len(targets)
+        times = [0] * len(targets)
+        state = compiled.state_ids[self.state]
+        clock = time.perf_counter_ns
+        start = last = clock()
+
+        # the steps are counted by the transition counters (-1 remaining steps - no limit)
+        failed_steps = 0
+        try:
+            remaining = -1 if max_steps is None else max(max_steps - self.steps, 0)
+            while not is_final[state] and remaining != 0:
+                transition = functions[state](cells, heads, edge)
+                state = targets[transition]
+                counts[transition] += 1
+                now = clock()
+                times[transition] += now - last
+                last = now
+                remaining -= 1
+        except Exception:
+            if self.pending_state is not None:
+                state = self.pending_state
+                failed_steps = 1
+            raise
+        finally:
+            steps = sum(counts) + failed_steps
+            profiler.steps += steps
+            profiler.elapsed_ns += clock() - start
+            for result, count, duration in zip(compiled.transitions, counts, times):
+                if count > 0:
+                    profiler.counts[id(result)] += count
+                    profiler.times[id(result)] += duration
+            self.__store__(cells, heads, state, self.steps + steps)
+        return is_final[state]
+
+    # runs the profiled program, the step records are appended by the index of the executed GOTO statement, in the sampled
+    #    trace the cells written by the GOTO statement are read after the step (at the head positions from before the move)
+    def run_traced(self, recorder: TraceRecorder, max_steps: int | None = None) -> bool:
+        recorder.start(self)
+        compiled = compile_profiled_program(self.program)
+        cells = [tape.cells for tape in self.tapes]
+        heads = [tape.head for tape in self.tapes]
+        edge = self.__get_edge__(cells, heads)
+        functions = compiled.state_functions
+        is_final = self.is_final
+        targets = [compiled.state_ids[result.new_state] for result in compiled.transitions]
+        is_sampled = recorder.sample_interval > 1
+        records = [recorder.step_records[id(result)] for result in compiled.transitions]
+        writes = [[(tape_id, move) for tape_id, (source, move) in enumerate(zip(result.tape_source, result.tape_movement)) if source != tape_id] for result in compiled.transitions]
+        buffer = recorder.buffer
+        pending = recorder.pending
+        state = compiled.state_ids[self.state]
+        steps = self.steps
+
+        try:
+            while not is_final[state] and (max_steps is None or steps < max_steps):
+                transition = functions[state](cells, heads, edge)
+                state = targets[transition]
+                steps += 1
+                if is_sampled:
+                    for tape_id, move in writes[transition]:
+                        index = heads[tape_id] - move
+                        pending[(tape_id, index - self.tapes[tape_id].origin)] = cells[tape_id][index]
+                    recorder.pending_steps += 1
+                    if recorder.pending_steps >= recorder.sample_interval:
+                        self.__store__(cells, heads, state, steps)
+                        recorder.record(self)
+                else:
+                    buffer += records[transition]
+                    recorder.records += 1
+                    if recorder.records >= recorder.keyframe_interval:
+                        self.__store__(cells, heads, state, steps)
+                        recorder.step = steps
+                        recorder.start_chunk(self)
+        except Exception:
+            if self.pending_state is not None:
+                state = self.pending_state
+                steps += 1
+            raise
+        finally:
+            self.__store__(cells, heads, state, steps)
+            recorder.stop(self)
+        return is_final[state]
+
+    def __get_edge__(self, cells: List, heads: List[int]) -> Callable:
+        def edge(tape_id: int, move: int, next_state: int):
+            # the state is changed before the tapes are moved (the same way as in TuringMachine.step)
+            self.pending_state = next_state
+            tape = self.tapes[tape_id]
+            tape.head = heads[tape_id]
+            if move == 1:
+                tape.move_right()
+            else:
+                tape.move_left()
+            cells[tape_id] = tape.cells
+            heads[tape_id] = tape.head
+            self.pending_state = None
+        return edge
+
+    def __store__(self, cells: List, heads: List[int], state: int, steps: int):
+        self.pending_state = None
+        for tape, tape_cells, head in zip(self.tapes, cells, heads):
+            tape.cells = tape_cells
+            tape.head = head
+        self.state = self.compiled.state_names[state]
+        self.steps = steps
@@ -0,0 +1,153 @@
+import copy
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+MASK_64 = (1 << 64) - 1
+
+@dataclass
+class Cycle:
+    # number of steps after which the configuration repeats
+    length: int
+    # step at which the machine entered the cycle (the first configuration of the cycle)
+    start_step: int
+    # step at which the cycle was detected
+    detected_step: int
+
+    def __str__(self):
+        return f"Machine entered a cycle of length {self.length} at step {self.start_step} (detected at step {self.detected_step})"
+
+def __mix__(value: int) -> int:
+    # splitmix64 finalizer, spreads the (tape, position, symbol) key into the random looking 64 bit value
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+# Zobrist style hash of the machine configuration (state, head positions and tape contents)
+#    the configuration hash is the XOR of the keys of its parts, so a write or a move updates it in O(1);
+#    the keys of the cells are derived from the (tape, position, symbol) with the mixing function, so the tapes
+#    can grow without the precomputed tables, the blank cells of the growable tapes don't change the hash
+class ConfigurationHash:
+    def __init__(self, machine, seed: int = 0):
+        self.salt = random.Random(seed).getrandbits(64)
+        self.state_keys: Dict[str, int] = {}
+        self.blanks = [getattr(tape, "blank", None) for tape in machine.tapes]
+        self.cells_hash = 0
+        # only the cells between the first and the last non-blank cell are hashed (the keys of the blank cells are 0)
+        for tape_id, tape in enumerate(machine.tapes):
+            begin, end = tape._get_content_range()
+            for index, code in enumerate(tape.cells[begin:end], begin):
+                self.cells_hash ^= self.cell_key(tape_id, index - tape.origin, code)
+
+    def state_key(self, state: str) -> int:
+        key = self.state_keys.get(state)
+        if key is None:
+            key = random.Random(f"{self.salt}:{state}").getrandbits(64)
+            self.state_keys[state] = key
+        return key
+
+    def cell_key(self, tape_id: int, position: int, code: int) -> int:
+        if code == self.blanks[tape_id]:
+            return 0
+        return __mix__(self.salt ^ (((position & 0xFFFFFFFFFF) << 20 | tape_id << 4) * 0x10001 + code + 1))
+
+    def head_key(self, tape_id: int, position: int) -> int:
+        return __mix__(self.salt ^ ((position & 0xFFFFFFFFFF) << 20 | tape_id << 4 | 0xF))
+
+    def update_cell(self, tape_id: int, position: int, old_code: int, new_code: int):
+        if old_code != new_code:
+            self.cells_hash ^= self.cell_key(tape_id, position, old_code) ^ self.cell_key(tape_id, position, new_code)
+
+    def get_hash(self, state: str, positions: List[int]) -> int:
+        value = self.cells_hash ^ self.state_key(state)
+        for tape_id, position in enumerate(positions):
+            value ^= self.head_key(tape_id, position)
+        return value
+
+# (state, head positions, (position of the first cell, packed cells) of each tape), the blank cells at the
+#    beginning and at the end of the growable tapes are trimmed
+def get_configuration(machine) -> tuple:
+    tapes = []
+    for tape in machine.tapes:
+        begin, end = tape._get_content_range()
+        tapes.append((begin - tape.origin, memoryview(tape.cells)[begin:end].tobytes()))
+    return (machine.state, tuple(machine.get_tape_positions()), tuple(tapes))
+
+# Brent's cycle detection over the configuration hashes, the machine is deterministic, so the repeated
+#    configuration means that the machine never stops
+#    only one configuration (tortoise) is stored, it is replaced at the power of two distances, the hash
+#    match is confirmed with the full comparison of the configurations (so the hash collision is never reported)
+#    the tapes read from the stream are not supported: the configuration doesn't contain the cells not read yet, and
+#    the machine copies replaying the cycle (see __find_cycle_start__) would read the stream shared with the machine
+class CycleDetector:
+    def __init__(self, machine, seed: int = 0):
+        if any(tape.get_stream_position() is not None for tape in machine.tapes):
+            raise Exception("Cycles can't be detected when a tape is read from the stream")
+        self.machine = machine
+        self.hash = ConfigurationHash(machine, seed)
+        self.start_configuration = get_configuration(machine)
+        self.start_step = machine.steps
+        self.power = 1
+        self.distance = 0
+        self.collisions = 0
+        self.__set_tortoise__()
+
+    def __set_tortoise__(self):
+        machine = self.machine
+        self.tortoise_hash = self.hash.get_hash(machine.state, machine.get_tape_positions())
+        self.tortoise_configuration = get_configuration(machine)
+        self.tortoise_step = machine.steps
+
+    # called after each step (positions and values - head positions and the read values from before the step)
+    def observe(self, positions: List[int], values: List[int]) -> Cycle | None:
+        machine = self.machine
+        for tape_id, (tape, position, value) in enumerate(zip(machine.tapes, positions, values)):
+            self.hash.update_cell(tape_id, position, value, tape.cells[tape.origin + position])
+        self.distance += 1
+
+        if self.hash.get_hash(machine.state, machine.get_tape_positions()) == self.tortoise_hash:
+            if get_configuration(machine) == self.tortoise_configuration:
+                return Cycle(self.distance, self.__find_cycle_start__(self.distance), machine.steps)
+            self.collisions += 1
+        if self.distance == self.power:
+            self.__set_tortoise__()
+            self.power *= 2
+            self.distance = 0
+        return None
+
+    # second phase of Brent's algorithm: two copies of the machine (started from the first observed configuration,
+    #    one of them ahead by the cycle length) are run until they reach the same configuration
+    def __find_cycle_start__(self, length: int) -> int:
+        first = self.__restore_start__()
+        second = self.__restore_start__()
+        for _ in range(length):
+            second.step()
+        offset = 0
+        while get_configuration(first) != get_configuration(second):
+            first.step()
+            second.step()
+            offset += 1
+        return self.start_step + offset
+
+    def __restore_start__(self):
+        machine = copy.copy(self.machine)
+        machine.tapes = []
+        for tape in self.machine.tapes:
+            machine.tapes.append(tape.clone())
+        state, positions, tapes = self.start_configuration
+        machine.state = state
+        for tape, position, (begin, cells) in zip(machine.tapes, positions, tapes):
+            tape.cells = tape.symbols.cells_from_bytes(cells)
+            tape.origin = -begin
+            if tape.origin < 0 or tape.origin + position >= len(tape.cells) or tape.origin + position < 0:
+                # blank cells trimmed from the stored configuration are added back
+                left = max(-tape.origin, -(tape.origin + position), 0)
+                right = max(tape.origin + position + 1 - len(tape.cells), 0)
+                padded = tape.symbols.fill_cells(tape.blank, left)
+                padded.extend(tape.cells)
+                padded.extend(tape.symbols.fill_cells(tape.blank, right))
+                tape.cells = padded
+                tape.origin += left
+            tape.head = tape.origin + position
+        return machine
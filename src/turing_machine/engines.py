@@ -0,0 +1,14 @@
+from src.config.config import Config
+from src.turing_machine.ast_turing_machine import ASTTuringMachine
+from src.turing_machine.codegen_turing_machine import CodegenTuringMachine
+
+ENGINES = {
+    "interpreter": ASTTuringMachine,
+    "codegen": CodegenTuringMachine,
+}
+
+def create_machine(cfg: Config, engine: str = "interpreter", is_debug_mode: bool = False, cache_size: int | None = None, max_tape_size: int | None = None, accelerate_sweeps: bool = True) -> ASTTuringMachine:
+    machine_type = ENGINES.get(engine)
+    if machine_type is None:
+        raise Exception(f"Unknown engine '{engine}'. Available engines: {', '.join(ENGINES.keys())}")
+    return machine_type(cfg, is_debug_mode, cache_size, max_tape_size, accelerate_sweeps)
@@ -0,0 +1,52 @@
+from typing import Callable, Dict, List, Tuple
+from src.compiler.optimizer.goto_fusion import FusedTransition
+from src.compiler.parser.node.node import EncodedExecuteResult
+from src.turing_machine.transition_cache import TransitionCache
+
+# applies the fused transitions (see find_fused_transitions) as one step, the fused steps are still counted
+#    the transition is applied only if all the cells visited by the heads are allocated, otherwise the steps are executed
+#    one by one (so the tapes grow, or the out of bounds error is reported at the same step)
+#    the fused transition of the state is found by the executed GOTO statement, and memoized by the values of the tapes
+#    read by the state (see get_tape_access)
+class FusionAccelerator:
+    def __init__(self, fused_transitions: Dict[str, Dict[int, FusedTransition]], read_tapes: Dict[str, Tuple[int, ...]],
+                 execute: Callable[[str, List[int]], EncodedExecuteResult], cache_size: int | None = None):
+        self.fused_transitions = fused_transitions
+        self.read_tapes = read_tapes
+        self.execute = execute
+        self.cache = None if cache_size == 0 else TransitionCache(cache_size)
+        self.fused_steps = 0
+
+    # returns the applied transition (None if the step has to be executed by the machine)
+    #    budget - maximum number of the steps of the applied transition
+    def apply(self, state: str, tapes: List, budget: int | None = None) -> FusedTransition | None:
+        read_tapes = self.read_tapes[state]
+        key = (state, tuple([tapes[tape_id].cells[tapes[tape_id].head] for tape_id in read_tapes]))
+        fused = None if self.cache is None else self.cache.get(key)
+        if fused is None:
+            # the values of the other tapes are never read by the state
+            values = [None] * len(tapes)
+            for tape_id, value in zip(read_tapes, key[1]):
+                values[tape_id] = value
+            # False - the executed GOTO statement is not fused
+            result = self.execute(state, values)
+            fused = self.fused_transitions[state].get(id(result), False)
+            if self.cache is not None:
+                self.cache.put(key, fused)
+        if fused is False or (budget is not None and fused.steps > budget):
+            return None
+        for tape, (low, high) in zip(tapes, fused.bounds):
+            if tape.head + low < 0 or tape.head + high >= len(tape.cells):
+                return None
+
+        read = [tapes[tape_id].cells[tapes[tape_id].head + offset] for tape_id, offset in fused.reads]
+        for tape_id, offset, code, read_id in fused.writes:
+            tape = tapes[tape_id]
+            value = code if read_id is None else read[read_id]
+            # the same values are not written (see MappedTape.set_value)
+            if tape.cells[tape.head + offset] != value:
+                tape.cells[tape.head + offset] = value
+        for tape, move in zip(tapes, fused.moves):
+            tape.head += move
+        self.fused_steps += fused.steps
+        return fused
@@ -0,0 +1,57 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, List
+from src.turing_machine.cycle_detection import Cycle
+
+class BudgetLimit(Enum):
+    STEPS = "steps"
+    DEADLINE = "deadline"
+    TAPE_CELLS = "tape_cells"
+
+# limits of a single run (None - unlimited)
+#    timeout - wall-clock time of the run in seconds, max_tape_cells - maximum number of cells of each growable tape
+#    the steps and the time are checked every check_interval steps, the tape cells when the tape grows
+@dataclass
+class ResourceBudget:
+    max_steps: int | None = None
+    timeout: float | None = None
+    max_tape_cells: int | None = None
+    check_interval: int = 4096
+
+#    the tapes are decoded only when the tapes property is read (the content of the machine tapes at that time), so the result
+#    of the run on the large (e.g. mapped) tapes is never materialized in the Python objects
+@dataclass
+class RunResult:
+    finished: bool
+    state: str
+    steps: int
+    positions: List[int]
+    read_tapes: Callable[[], List[List[str]]] = field(repr=False, compare=False)
+    # limit that stopped the machine (if the budget was exhausted)
+    exhausted: BudgetLimit | None = None
+    cycle: Cycle | None = None
+
+    @property
+    def tapes(self) -> List[List[str]]:
+        return self.read_tapes()
+
+    def __str__(self):
+        if self.finished:
+            return f"Machine finished in state {self.state} after {self.steps} steps"
+        if self.cycle is not None:
+            return f"{self.cycle}"
+        if self.exhausted is not None:
+            return f"Budget exhausted ({self.exhausted.value}) after {self.steps} steps in state {self.state}"
+        return f"Machine stopped in state {self.state} after {self.steps} steps"
+
+# machine configuration after each batch of the steps of the asynchronous run (see TuringMachine.progress)
+#    finished - the machine reached the final state, done - the run ended (the machine finished, max_steps steps were
+#    executed, or the cycle was found), elapsed - seconds since the start of the run
+@dataclass
+class ProgressEvent:
+    steps: int
+    state: str
+    finished: bool
+    done: bool
+    elapsed: float
+    cycle: Cycle | None = None
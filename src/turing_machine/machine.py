@@ -1,15 +1,34 @@
+import asyncio
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from array import array
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, List
+from src.compiler.symbol_table import SymbolTable
+from src.compiler.tokenizer.tokenizer import TapeFile, TapeStream
+from src.turing_machine.cycle_detection import Cycle, CycleDetector
+from src.turing_machine.governor import BudgetLimit, ProgressEvent, ResourceBudget, RunResult
+from src.turing_machine.profiler import Profiler
+from src.turing_machine.snapshot import Checkpointer, read_snapshot, write_snapshot
+from src.turing_machine.status_renderer import RED_BOLD, RESET, StatusRenderer
+from src.turing_machine.trace import TraceRecorder
 
-RED =  '\033[91m'
-BOLD = '\033[1m'
-RESET = '\033[0m'
-RED_BOLD = RED + BOLD
+class TapeLimitError(Exception):
+    pass
 
+# tape stores the symbol codes (see SymbolTable), the values are decoded only for the display and output
 class Tape:
-    def __init__(self, tape):
-        self.tape = tape
+    def __init__(self, cells: bytearray | array, symbols: SymbolTable):
+        self.cells = cells
+        self.symbols = symbols
         self.head = 0
+        # index in the cells of the first value of the initial tape (position 0)
+        self.origin = 0
 
     def move_left(self):
         if self.head <= 0:
@@ -17,45 +36,428 @@ class Tape:
         self.head -= 1
 
     def move_right(self):
-        if self.head >= len(self.tape) - 1:
+        if self.head >= len(self.cells) - 1:
             raise Exception("Tape head moved out of bounds (greater than tape length)")
         self.head += 1
 
-    def get_value(self):
-        return self.tape[self.head]
+    def get_value(self) -> int:
+        return self.cells[self.head]
 
-    def set_value(self, val):
-        self.tape[self.head] = val
+    def set_value(self, val: int):
+        self.cells[self.head] = val
+
+    def get_position(self) -> int:
+        return self.head - self.origin
+
+    def get_content(self) -> List[str]:
+        begin, end = self._get_content_range()
+        return self.symbols.decode_tape(self.cells[begin:end])
+
+    def _get_content_range(self) -> tuple[int, int]:
+        return (0, len(self.cells))
+
+    # number of the cells read from the tape stream (None - the tape is not read from the stream, see StreamTape)
+    def get_stream_position(self) -> int | None:
+        return None
+
+    # replaces the configuration of the tape with the one restored from the snapshot (see read_snapshot)
+    def restore(self, cells: bytearray | array, head: int, origin: int, stream_position: int | None):
+        self.cells = cells
+        self.head = head
+        self.origin = origin
 
     def clone(self):
-        return Tape(self.tape[:])
+        return Tape(self.cells[:], self.symbols)
 
     def __str__(self):
-        prefix = ", ".join(self.tape[:self.head]) + ", " if self.head > 0 else ''
-        head = f"{RED_BOLD}{self.tape[self.head]}{RESET}"
-        suffix = ", " + ", ".join(self.tape[self.head + 1:]) if self.head < len(self.tape) - 1 else ""
+        begin, end = self._get_content_range()
+        begin = min(begin, self.head)
+        end = max(end, self.head + 1)
+        prefix = ", ".join(self.symbols.decode_tape(self.cells[begin:self.head])) + ", " if self.head > begin else ''
+        head = f"{RED_BOLD}{self.symbols.decode(self.cells[self.head])}{RESET}"
+        suffix = ", " + ", ".join(self.symbols.decode_tape(self.cells[self.head + 1:end])) if self.head < end - 1 else ""
         return f"[{prefix}{head}{suffix}]"
 
+# two-way infinite tape, all the cells outside of the initial tape contain the blank symbol
+#    the cells are allocated in chunks (doubling the tape size), so the growth in both directions
+#    is amortized O(1) per cell; max_size limits the number of the allocated cells
+class GrowableTape(Tape):
+    MIN_GROW_SIZE = 64
+
+    def __init__(self, cells: bytearray | array, symbols: SymbolTable, blank: int, max_size: int | None = None):
+        super().__init__(cells, symbols)
+        self.blank = blank
+        self.max_size = max_size
+        if max_size is not None and len(cells) > max_size:
+            raise Exception(f"Tape size ({len(cells)} cells) exceeds the maximum tape size ({max_size} cells)")
+
+    def move_left(self):
+        if self.head <= 0:
+            self.__grow__(at_front=True)
+        self.head -= 1
+
+    def move_right(self):
+        if self.head >= len(self.cells) - 1:
+            self.__grow__(at_front=False)
+        self.head += 1
+
+    def __grow__(self, at_front: bool):
+        grow_size = self._get_grow_size()
+        chunk = self.symbols.fill_cells(self.blank, grow_size)
+        if at_front:
+            chunk.extend(self.cells)
+            self.cells = chunk
+            self.head += grow_size
+            self.origin += grow_size
+        else:
+            self.cells.extend(chunk)
+
+    def _get_grow_size(self) -> int:
+        size = len(self.cells)
+        grow_size = max(size, GrowableTape.MIN_GROW_SIZE)
+        if self.max_size is not None:
+            grow_size = min(grow_size, self.max_size - size)
+            if grow_size <= 0:
+                raise TapeLimitError(f"Tape exceeded the maximum tape size ({self.max_size} cells)")
+        return grow_size
+
+    def _get_content_range(self) -> tuple[int, int]:
+        begin = 0
+        end = len(self.cells)
+        while begin < end and self.cells[begin] == self.blank:
+            begin += 1
+        while end > begin and self.cells[end - 1] == self.blank:
+            end -= 1
+        return (begin, end)
+
+    def clone(self):
+        tape = GrowableTape(self.cells[:], self.symbols, self.blank, self.max_size)
+        tape.head = self.head
+        tape.origin = self.origin
+        return tape
+
+__TAPE_FILE_ACCESS__ = {"read": mmap.ACCESS_READ, "copy": mmap.ACCESS_COPY, "write": mmap.ACCESS_WRITE}
+
+# tape with the cells mapped from the file (see TapeFile), only the pages visited by the head are read from the disk,
+#    the initial tape maps the file read-only, its clones (the tapes of the running machine) use the mode of the tape file;
+#    if the blank symbol is defined, the tape grows into the new file (the temporary file, or the output file
+#    in the write mode), so the cells are never loaded into the memory as a whole
+class MappedTape(GrowableTape):
+    COPY_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, source: TapeFile, file, symbols: SymbolTable, blank: int | None = None, max_size: int | None = None, access: int = mmap.ACCESS_READ):
+        self.source = source
+        self.file = file
+        self.access = access
+        self.typecode = symbols.typecode
+        self.itemsize = array(symbols.typecode).itemsize
+        self.mapped_cells = self.__map__()
+        super().__init__(self.mapped_cells, symbols, blank, max_size)
+
+    # opens the tape file, the "bytes" files are translated into the symbol codes (into the temporary file),
+    #    in the write mode with the output file, the input file is copied to the output file
+    @staticmethod
+    def open(source: TapeFile, symbols: SymbolTable, blank: int | None = None, max_size: int | None = None):
+        try:
+            if source.format == "bytes":
+                file = MappedTape.__translate_bytes__(source.path, symbols)
+            else:
+                path = source.path
+                if source.output is not None:
+                    shutil.copyfile(path, source.output)
+                    path = source.output
+                file = open(path, "r+b" if source.mode == "write" else "rb")
+        except OSError as e:
+            raise Exception(f"Failed to open the tape file '{source.path}': {e}")
+        return MappedTape(source, file, symbols, blank, max_size)
+
+    @staticmethod
+    def __translate_bytes__(path: str, symbols: SymbolTable):
+        translated = tempfile.TemporaryFile()
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(MappedTape.COPY_CHUNK_SIZE)
+                if len(chunk) == 0:
+                    break
+                try:
+                    translated.write(symbols.encode_bytes(chunk))
+                except Exception as e:
+                    raise Exception(f"Failed to read the tape file '{path}': {e}")
+        translated.flush()
+        return translated
+
+    def __map__(self):
+        size = os.fstat(self.file.fileno()).st_size
+        if size == 0:
+            raise Exception(f"Tape file '{self.source.path}' is empty")
+        if size % self.itemsize != 0:
+            raise Exception(f"Size of the tape file '{self.source.path}' is not a multiple of the symbol code size ({self.itemsize} bytes)")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=self.access)
+        if self.typecode == 'B':
+            return self.map
+        return memoryview(self.map).cast(self.typecode)
+
+    def move_left(self):
+        if self.blank is None:
+            Tape.move_left(self)
+        else:
+            super().move_left()
+
+    def move_right(self):
+        if self.blank is None:
+            Tape.move_right(self)
+        else:
+            super().move_right()
+
+    # the same values are not written, so the pages are not copied (and the read-only tapes can be read)
+    def set_value(self, val: int):
+        if self.cells[self.head] != val:
+            self.cells[self.head] = val
+
+    def _get_content_range(self) -> tuple[int, int]:
+        if self.blank is None:
+            return (0, len(self.cells))
+        return super()._get_content_range()
+
+    def __grow__(self, at_front: bool):
+        # the cells replaced with the array (e.g. restored from the snapshot of the copied tape) grow in the memory
+        if self.cells is not self.mapped_cells:
+            return super().__grow__(at_front)
+        grow_size = self._get_grow_size()
+        file = self.__new_file__()
+        blanks = memoryview(self.symbols.fill_cells(self.blank, min(grow_size, MappedTape.COPY_CHUNK_SIZE))).cast('B')
+        if at_front:
+            self.__write_blanks__(file, blanks, grow_size)
+        cells = memoryview(self.map)
+        for begin in range(0, len(cells), MappedTape.COPY_CHUNK_SIZE):
+            file.write(cells[begin:begin + MappedTape.COPY_CHUNK_SIZE])
+        cells.release()
+        if not at_front:
+            self.__write_blanks__(file, blanks, grow_size)
+        self.__replace_file__(file)
+        if at_front:
+            self.head += grow_size
+            self.origin += grow_size
+
+    # in the write mode, the new file replaces the output file (see __replace_file__)
+    def __new_file__(self):
+        if self.source.mode == "write":
+            path = self.source.output or self.source.path
+            return tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path), suffix=".tmp", delete=False)
+        return tempfile.TemporaryFile()
+
+    def __replace_file__(self, file):
+        file.flush()
+        if self.source.mode == "write":
+            os.replace(file.name, self.source.output or self.source.path)
+        self.file = file
+        self.mapped_cells = self.__map__()
+        self.cells = self.mapped_cells
+
+    # in the write mode, the restored cells are written to the output file (the file is replaced if the size
+    #    of the tape is different), the other tapes keep the restored cells in the memory
+    def restore(self, cells: bytearray | array, head: int, origin: int, stream_position: int | None):
+        if self.source.mode == "write":
+            source = memoryview(cells).cast('B')
+            if len(cells) == len(self.mapped_cells):
+                target = memoryview(self.map)
+                for begin in range(0, len(source), MappedTape.COPY_CHUNK_SIZE):
+                    target[begin:begin + MappedTape.COPY_CHUNK_SIZE] = source[begin:begin + MappedTape.COPY_CHUNK_SIZE]
+                target.release()
+            else:
+                file = self.__new_file__()
+                for begin in range(0, len(source), MappedTape.COPY_CHUNK_SIZE):
+                    file.write(source[begin:begin + MappedTape.COPY_CHUNK_SIZE])
+                self.__replace_file__(file)
+            cells = self.mapped_cells
+        super().restore(cells, head, origin, stream_position)
+
+    def __write_blanks__(self, file, blanks: memoryview, count: int):
+        chunk_cells = len(blanks) // self.itemsize
+        while count > 0:
+            cells = min(count, chunk_cells)
+            file.write(blanks[:cells * self.itemsize])
+            count -= cells
+
+    def clone(self):
+        if self.cells is not self.mapped_cells:
+            if self.blank is None:
+                return Tape(self.cells[:], self.symbols)
+            tape = GrowableTape(self.cells[:], self.symbols, self.blank, self.max_size)
+        else:
+            tape = MappedTape(self.source, self.file, self.symbols, self.blank, self.max_size, __TAPE_FILE_ACCESS__[self.source.mode])
+        tape.head = self.head
+        tape.origin = self.origin
+        return tape
+
+# reads the cells of the tape stream (see TapeStream), the binary streams are read with read1, so the cells are
+#    returned as soon as they are available (the machine doesn't wait for the whole chunk)
+class TapeReader:
+    def __init__(self, stream: TapeStream, symbols: SymbolTable):
+        self.stream = stream
+        self.symbols = symbols
+        self.file = None
+        self.symbols_iterator = None
+        if stream.source is None:
+            self.file = sys.stdin.buffer
+        elif hasattr(stream.source, "read"):
+            self.file = stream.source
+        else:
+            self.symbols_iterator = iter(stream.source)
+        self.itemsize = array(symbols.typecode).itemsize
+        # bytes of the incomplete code (the codes format)
+        self.pending = b""
+        # number of the cells read from the stream
+        self.position = 0
+        self.exhausted = False
+
+    # returns at most count cells (the empty cells at the end of the stream)
+    def read(self, count: int) -> bytearray | array:
+        cells = self.symbols.new_cells(())
+        while len(cells) == 0 and not self.exhausted:
+            if self.symbols_iterator is not None:
+                cells = self.symbols.new_cells(self.symbols.encode(symbol) for symbol in islice(self.symbols_iterator, count))
+                self.exhausted = len(cells) < count
+            else:
+                cells = self.__read_file__(count)
+        self.position += len(cells)
+        return cells
+
+    def __read_file__(self, count: int) -> bytearray | array:
+        read = getattr(self.file, "read1", self.file.read)
+        data = read(count * self.itemsize - len(self.pending))
+        if len(data) == 0:
+            self.exhausted = True
+            if len(self.pending) > 0:
+                raise Exception(f"Tape stream ended inside the symbol code ({len(self.pending)} of {self.itemsize} bytes)")
+            return self.symbols.new_cells(())
+        if self.stream.format == "bytes":
+            return bytearray(self.symbols.encode_bytes(data))
+        data = self.pending + data
+        size = len(data) - len(data) % self.itemsize
+        self.pending = data[size:]
+        return self.symbols.cells_from_bytes(data[:size])
+
+# tape with the cells read from the stream (see TapeReader), when the head reaches the last read cell, the next chunk
+#    of the cells is read, so the machine can start before the whole tape is available; when the stream ends,
+#    the tape grows with the blank cells (if the blank symbol is defined)
+#    the stream is shared by the tape clones, it can be read only by one of them
+class StreamTape(GrowableTape):
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, reader: TapeReader, cells: bytearray | array, symbols: SymbolTable, blank: int | None = None, max_size: int | None = None):
+        super().__init__(cells, symbols, blank, max_size)
+        self.reader = reader
+        # number of the stream cells read by this tape
+        self.read_cells = reader.position
+
+    @staticmethod
+    def open(stream: TapeStream, symbols: SymbolTable, blank: int | None = None, max_size: int | None = None):
+        reader = TapeReader(stream, symbols)
+        cells = reader.read(StreamTape.CHUNK_SIZE if max_size is None else min(StreamTape.CHUNK_SIZE, max_size))
+        if len(cells) == 0:
+            if blank is None:
+                raise Exception("Tape stream is empty")
+            cells = symbols.fill_cells(blank, 1)
+        return StreamTape(reader, cells, symbols, blank, max_size)
+
+    def move_left(self):
+        if self.blank is None:
+            Tape.move_left(self)
+        else:
+            super().move_left()
+
+    def move_right(self):
+        if self.head >= len(self.cells) - 1 and not self.reader.exhausted:
+            self.__read__()
+        if self.blank is None:
+            Tape.move_right(self)
+        else:
+            super().move_right()
+
+    def __read__(self):
+        if self.reader.position != self.read_cells:
+            raise Exception("Tape stream was already read by the other machine")
+        count = StreamTape.CHUNK_SIZE
+        if self.max_size is not None:
+            count = min(count, self.max_size - len(self.cells))
+            if count <= 0:
+                raise TapeLimitError(f"Tape exceeded the maximum tape size ({self.max_size} cells)")
+        cells = self.reader.read(count)
+        self.cells.extend(cells)
+        self.read_cells = self.reader.position
+
+    def _get_content_range(self) -> tuple[int, int]:
+        if self.blank is None:
+            return (0, len(self.cells))
+        return super()._get_content_range()
+
+    def get_stream_position(self) -> int | None:
+        return self.read_cells
+
+    # the stream is read up to the position of the snapshot (the cells before it are restored from the snapshot),
+    #    the cells already read past the position are appended to the restored cells
+    def restore(self, cells: bytearray | array, head: int, origin: int, stream_position: int | None):
+        if self.reader.position != self.read_cells:
+            raise Exception("Tape stream was already read by the other machine")
+        while self.reader.position < stream_position:
+            if len(self.reader.read(min(StreamTape.CHUNK_SIZE, stream_position - self.reader.position))) == 0:
+                raise Exception(f"Tape stream ended before the position of the snapshot ({self.reader.position} of {stream_position} cells)")
+        if self.reader.position > stream_position:
+            cells.extend(self.cells[self.origin + stream_position:self.origin + self.reader.position])
+        super().restore(cells, head, origin, stream_position)
+        self.read_cells = self.reader.position
+
+    def clone(self):
+        tape = StreamTape(self.reader, self.cells[:], self.symbols, self.blank, self.max_size)
+        tape.read_cells = self.read_cells
+        tape.head = self.head
+        tape.origin = self.origin
+        return tape
+
 class TuringMachine(ABC):
-    def __init__(self, tapes, initial_state, final_states):
-        self.initial_tapes = [Tape(tape) for tape in tapes]
+    def __init__(self, tapes: List[List[str]], initial_state: str, final_states: List[str], symbols: SymbolTable, blank: str | None = None, max_tape_size: int | None = None):
+        self.symbols = symbols
+        self.blank = blank
+        # hash of the program stored in the snapshots (computed on the first snapshot, see get_program_hash)
+        self.program_hash: str | None = None
+        blank_code = None if blank is None else symbols.encode(blank)
+        self.initial_tapes = []
+        for tape in tapes:
+            if isinstance(tape, TapeFile):
+                self.initial_tapes.append(MappedTape.open(tape, symbols, blank_code, max_tape_size))
+            elif isinstance(tape, TapeStream):
+                self.initial_tapes.append(StreamTape.open(tape, symbols, blank_code, max_tape_size))
+            elif blank is None:
+                self.initial_tapes.append(Tape(symbols.encode_tape(tape), symbols))
+            else:
+                self.initial_tapes.append(GrowableTape(symbols.encode_tape(tape), symbols, blank_code, max_tape_size))
         self.initial_state = initial_state
         self.final_states = final_states
         self.tapes = [tape.clone() for tape in self.initial_tapes]
         self.state = self.initial_state
+        self.steps = 0
+        # set during the run_auto call with the cycle detection, every step has to be observed by the detector
+        self.cycle_detector: CycleDetector | None = None
+        # cycle found by the last run_auto call (with detect_cycles = True)
+        self.cycle: Cycle | None = None
+        # renders the statuses of print_status and run (see StatusRenderer)
+        self.status_renderer = StatusRenderer()
 
     def reset(self):
         self.tapes = [tape.clone() for tape in self.initial_tapes]
         self.state = self.initial_state
+        self.steps = 0
+        self.cycle = None
 
     def get_tapes_values(self):
         return [tape.get_value() for tape in self.tapes]
 
     def get_tape_positions(self):
-        return [tape.head for tape in self.tapes]
+        return [tape.get_position() for tape in self.tapes]
 
     @abstractmethod
-    def run_state(self, state: str, tape_values: List[str]) -> tuple[str, List[str], List[int]]:
+    def run_state(self, state: str, tape_values: List[int]) -> tuple[str, List[int], List[int]]:
         pass
 
     def set_tapes(self, new_values):
@@ -73,18 +475,164 @@ class TuringMachine(ABC):
         tape_state = self.get_tapes_values()
         new_state, new_values, operations = self.run_state(self.state, tape_state)
         self.state = new_state
+        self.steps += 1
         self.set_tapes(new_values)
         self.move_tapes(operations)
         return self.state
 
+    # the statuses are written at most status_renderer.max_rate times per second (the last status is always written)
     def run(self):
         while self.state not in self.final_states:
             self.step()
-            self.print_status()
+            self.status_renderer.show(self)
+        self.status_renderer.finish(self)
 
-    def run_auto(self):
+    # returns True if the machine reached the final state (False if it was stopped after max_steps steps)
+    #    detect_cycles - stop the machine (and return False) when it enters the cycle of configurations, the cycle
+    #    is stored in the cycle attribute (see CycleDetector)
+    def run_auto(self, max_steps: int | None = None, detect_cycles: bool = False) -> bool:
+        if detect_cycles:
+            return self.__run_detecting_cycles__(max_steps)
+        if max_steps is None:
+            while self.state not in self.final_states:
+                self.step()
+            return True
         while self.state not in self.final_states:
+            if self.steps >= max_steps:
+                return False
             self.step()
+        return True
+
+    # runs the machine like run_auto inside the asyncio event loop, see progress
+    async def run_async(self, quantum: int = 4096, max_steps: int | None = None, detect_cycles: bool = False) -> bool:
+        finished = False
+        async for event in self.progress(quantum, max_steps, detect_cycles):
+            finished = event.finished
+        return finished
+
+    # runs the machine in the batches of quantum steps (each batch is one run_auto call, so the steps are not slowed down),
+    #    the event is yielded after each batch, and the control is returned to the event loop before the next batch,
+    #    so many machines can share one event loop; the run is cancelled (e.g. by asyncio.timeout or Task.cancel)
+    #    only between the batches, so the machine is left in the consistent configuration and can be run again
+    async def progress(self, quantum: int = 4096, max_steps: int | None = None, detect_cycles: bool = False) -> AsyncIterator[ProgressEvent]:
+        if quantum <= 0:
+            raise Exception(f"Quantum must be greater than 0 (got {quantum})")
+        start = time.monotonic()
+        self.cycle = None
+        # the detector is kept between the batches (see run_governed)
+        if detect_cycles:
+            self.cycle_detector = CycleDetector(self)
+        try:
+            while True:
+                batch_end = self.steps + quantum if max_steps is None else min(self.steps + quantum, max_steps)
+                finished = self.run_auto(batch_end, detect_cycles)
+                done = finished or self.cycle is not None or (max_steps is not None and self.steps >= max_steps)
+                yield ProgressEvent(self.steps, self.state, finished, done, time.monotonic() - start, self.cycle)
+                if done:
+                    return
+                await asyncio.sleep(0)
+        finally:
+            if detect_cycles:
+                self.cycle_detector = None
+
+    # runs the machine like run_auto, recording every step in the profiler (see Profiler)
+    def run_profiled(self, profiler: Profiler, max_steps: int | None = None) -> bool:
+        raise Exception(f"{type(self).__name__} does not support profiling")
+
+    # runs the machine like run_auto, recording every step in the trace (see TraceRecorder)
+    def run_traced(self, recorder: TraceRecorder, max_steps: int | None = None) -> bool:
+        raise Exception(f"{type(self).__name__} does not support tracing")
+
+    def __run_detecting_cycles__(self, max_steps: int | None) -> bool:
+        # the detector created by run_governed is kept between the calls
+        owns_detector = self.cycle_detector is None
+        if owns_detector:
+            self.cycle = None
+            self.cycle_detector = CycleDetector(self)
+        try:
+            while self.state not in self.final_states:
+                if max_steps is not None and self.steps >= max_steps:
+                    return False
+                positions = self.get_tape_positions()
+                values = self.get_tapes_values()
+                self.step()
+                self.cycle = self.cycle_detector.observe(positions, values)
+                if self.cycle is not None:
+                    return False
+        finally:
+            if owns_detector:
+                self.cycle_detector = None
+        return True
+
+    # runs the machine until it finishes, or the budget is exhausted (see ResourceBudget)
+    #    the machine runs in chunks of budget.check_interval steps, so the engine loop is not slowed down by the checks;
+    #    the tape cells limit is applied to the growable tapes, when the tape can't grow the machine is stopped
+    #    checkpointer - the snapshots are saved between the chunks, and when the steps or time limit stops the machine
+    #    profiler - the chunks are run with run_profiled, recorder - the chunks are run with run_traced (they can't be used
+    #    together, or with the cycle detection)
+    def run_governed(self, budget: ResourceBudget, detect_cycles: bool = False, checkpointer: Checkpointer | None = None, profiler: Profiler | None = None,
+                     recorder: TraceRecorder | None = None) -> RunResult:
+        if budget.check_interval <= 0:
+            raise Exception(f"Budget check interval must be greater than 0 (got {budget.check_interval})")
+        if profiler is not None and detect_cycles:
+            raise Exception("Profiled run can't detect the cycles")
+        if recorder is not None and (detect_cycles or profiler is not None):
+            raise Exception("Traced run can't detect the cycles or be profiled")
+        self.cycle = None
+        if detect_cycles:
+            self.cycle_detector = CycleDetector(self)
+        deadline = None if budget.timeout is None else time.monotonic() + budget.timeout
+        max_sizes = [getattr(tape, "max_size", None) for tape in self.tapes]
+        if budget.max_tape_cells is not None:
+            for tape, max_size in zip(self.tapes, max_sizes):
+                if isinstance(tape, GrowableTape):
+                    tape.max_size = budget.max_tape_cells if max_size is None else min(max_size, budget.max_tape_cells)
+
+        finished = False
+        exhausted = None
+        is_timed = deadline is not None or (checkpointer is not None and checkpointer.every_seconds is not None)
+        if checkpointer is not None:
+            checkpointer.start(self)
+        try:
+            while True:
+                # without the steps and time limits there is nothing to check between the chunks
+                chunk_end = self.steps + budget.check_interval if is_timed else None
+                for limit in (budget.max_steps, None if checkpointer is None else checkpointer.next_step()):
+                    if limit is not None:
+                        chunk_end = limit if chunk_end is None else min(chunk_end, limit)
+                if profiler is not None:
+                    finished = self.run_profiled(profiler, chunk_end)
+                elif recorder is not None:
+                    finished = self.run_traced(recorder, chunk_end)
+                else:
+                    finished = self.run_auto(chunk_end, detect_cycles)
+                if finished or self.cycle is not None:
+                    break
+                if budget.max_steps is not None and self.steps >= budget.max_steps:
+                    exhausted = BudgetLimit.STEPS
+                elif deadline is not None and time.monotonic() >= deadline:
+                    exhausted = BudgetLimit.DEADLINE
+                if checkpointer is not None and (exhausted is not None or checkpointer.is_due(self)):
+                    checkpointer.save(self)
+                if exhausted is not None:
+                    break
+        except TapeLimitError:
+            exhausted = BudgetLimit.TAPE_CELLS
+        finally:
+            self.cycle_detector = None
+            for tape, max_size in zip(self.tapes, max_sizes):
+                if isinstance(tape, GrowableTape):
+                    tape.max_size = max_size
+        return RunResult(finished, self.state, self.steps, self.get_tape_positions(), self.get_tapes_content, exhausted, self.cycle)
+
+    # writes the compact binary image of the machine configuration (see write_snapshot)
+    #    compression - None, "none", "gzip" or "lzma"
+    def snapshot(self, file: BinaryIO, compression: str | None = None):
+        write_snapshot(self, file, compression)
+
+    # restores the configuration from the snapshot of the machine running the same program
+    def restore(self, file: BinaryIO):
+        read_snapshot(self, file)
 
     def run_tick(self):
         while self.state not in self.final_states:
@@ -92,12 +640,12 @@ class TuringMachine(ABC):
             input("Press Enter to execute the next step...")
             self.step()
 
-    def print_status(self):
-        tapes_str = ' | '.join([str(tape) for tape in self.tapes])
-        heads_str = ' | '.join([str(tape.head) for tape in self.tapes])
-        print(f"Tapes: {tapes_str}")
-        print(f"Head Positions: {heads_str}")
-        print(f"Current State: {self.state}")
+    # full - print the whole tapes instead of the windows around the heads
+    def print_status(self, full: bool = False):
+        self.status_renderer.show(self, force=True, full=full)
+
+    def get_tapes_content(self) -> List[List[str]]:
+        return [tape.get_content() for tape in self.tapes]
 
     def get_match_position(self):
         return self.get_tape_positions()
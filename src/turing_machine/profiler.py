@@ -0,0 +1,151 @@
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, TextIO
+from src.compiler.parser.program_ast import ProgramAST
+from src.compiler.parser.node.node import Node, NodeType
+
+PROFILE_FORMATS = ["json", "collapsed"]
+
+# IF, ELIF or ELSE statement of the state
+@dataclass
+class ProfiledBranch:
+    node_type: NodeType
+    line: int
+    source: str
+
+    def __str__(self):
+        return f"{self.node_type.name} (line {self.line})"
+
+# GOTO statement of the state, with the IF/ELIF/ELSE statements which are matched when it is executed (outermost first)
+@dataclass
+class ProfiledTransition:
+    state: str
+    target: str
+    line: int
+    branches: List[ProfiledBranch]
+    count: int = 0
+    time_ns: int = 0
+
+@dataclass
+class StateProfile:
+    name: str
+    visits: int
+    time_ns: int
+    # executed GOTO statements, most frequent first
+    transitions: List[ProfiledTransition]
+    # matched IF/ELIF/ELSE statements with the number of the steps they were matched in, in the source order
+    branches: List[tuple[ProfiledBranch, int]]
+
+# collects the statistics of the profiled run (see TuringMachine.run_profiled): the number of the executions and the wall time
+#    of each of the GOTO statements, the state and the matched branches are derived from the executed GOTO statement
+#    (a state executes the first GOTO statement which enclosing conditions are all true), so the run records one counter per step
+class Profiler:
+    def __init__(self, program: ProgramAST):
+        self.program = program
+        # GOTO statements by the id of their encoded result (the result returned by the decision tree or the state tree)
+        self.transitions: Dict[int, ProfiledTransition] = {}
+        for name, state in program.nodes.items():
+            self.__add_state__(name, state)
+        # execution counts and times of the GOTO statements (keyed as the transitions), updated by the profiled run
+        self.counts: Dict[int, int] = defaultdict(int)
+        self.times: Dict[int, int] = defaultdict(int)
+        self.steps = 0
+        self.elapsed_ns = 0
+
+    def __add_state__(self, name: str, state: Node):
+        stack = [(state, [])]
+        while len(stack) > 0:
+            node, branches = stack.pop()
+            if node.node_type in (NodeType.IF, NodeType.ELIF, NodeType.ELSE):
+                line = min(node.lines)
+                branches = branches + [ProfiledBranch(node.node_type, line, node.lines[line].value.strip())]
+            elif node.node_type == NodeType.GOTO and node.encoded_result is not None:
+                result = node.encoded_result
+                self.transitions[id(result)] = ProfiledTransition(name, result.new_state, min(node.lines), branches)
+            stack.extend((child, branches) for child in reversed(node.children))
+
+    def get_transitions(self) -> List[ProfiledTransition]:
+        transitions = []
+        for key, count in self.counts.items():
+            transition = self.transitions[key]
+            transition.count = count
+            transition.time_ns = self.times[key]
+            transitions.append(transition)
+        transitions.sort(key=lambda transition: (-transition.time_ns, -transition.count))
+        return transitions
+
+    # returns the visited states sorted by the time spent in them
+    def get_states(self) -> List[StateProfile]:
+        states: Dict[str, StateProfile] = {}
+        branch_counts: Dict[str, Dict[int, list]] = {}
+        for transition in self.get_transitions():
+            state = states.get(transition.state)
+            if state is None:
+                state = StateProfile(transition.state, 0, 0, [], [])
+                states[transition.state] = state
+                branch_counts[transition.state] = {}
+            state.visits += transition.count
+            state.time_ns += transition.time_ns
+            state.transitions.append(transition)
+            for branch in transition.branches:
+                counts = branch_counts[transition.state].setdefault(branch.line, [branch, 0])
+                counts[1] += transition.count
+        for name, state in states.items():
+            state.transitions.sort(key=lambda transition: (-transition.count, transition.line))
+            state.branches = [(branch, count) for _, (branch, count) in sorted(branch_counts[name].items())]
+        return sorted(states.values(), key=lambda state: (-state.time_ns, -state.visits))
+
+    def to_dict(self) -> dict:
+        return {
+            "steps": self.steps,
+            "elapsed_ns": self.elapsed_ns,
+            "states": [
+                {
+                    "name": state.name,
+                    "visits": state.visits,
+                    "time_ns": state.time_ns,
+                    "transitions": [{"line": t.line, "target": t.target, "count": t.count, "time_ns": t.time_ns} for t in state.transitions],
+                    "branches": [{"line": b.line, "type": b.node_type.name, "source": b.source, "count": count} for b, count in state.branches],
+                }
+                for state in self.get_states()
+            ],
+        }
+
+    def write_json(self, file: TextIO):
+        json.dump(self.to_dict(), file, indent=2)
+        file.write("\n")
+
+    # writes the collapsed stacks (state;branches;GOTO weight) read by the flame graph tools
+    #    weight - "time" (nanoseconds) or "steps"
+    def write_collapsed(self, file: TextIO, weight: str = "time"):
+        if weight not in ("time", "steps"):
+            raise Exception(f"Unknown collapsed stack weight '{weight}'. Available weights: time, steps")
+        for transition in self.get_transitions():
+            frames = [transition.state] + [str(branch) for branch in transition.branches]
+            frames.append(f"GOTO {transition.target} (line {transition.line})")
+            value = transition.time_ns if weight == "time" else transition.count
+            file.write(";".join(frame.replace(";", ",") for frame in frames) + f" {value}\n")
+
+    # report of the hottest states (with their transitions and the matched branches) and the hottest transitions
+    def report(self, limit: int = 10) -> str:
+        total_time = max(sum(self.times.values()), 1)
+        total_steps = max(self.steps, 1)
+        lines = [f"Profile: {self.steps} steps in {self.elapsed_ns / 1e9:.3f}s"]
+        lines.append(f"{'state':<32} {'visits':>12} {'steps %':>8} {'time ms':>10} {'time %':>7}")
+        states = self.get_states()
+        for state in states[:limit]:
+            lines.append(f"{state.name:<32} {state.visits:>12} {state.visits * 100 / total_steps:>7.2f}% {state.time_ns / 1e6:>10.3f} {state.time_ns * 100 / total_time:>6.2f}%")
+            for transition in state.transitions:
+                lines.append(f"    -> {transition.target} (line {transition.line}): {transition.count} ({transition.count * 100 / state.visits:.2f}%)")
+            for branch, count in state.branches:
+                lines.append(f"    {branch}: {count} ({count * 100 / state.visits:.2f}%) {branch.source}")
+        if len(states) > limit:
+            lines.append(f"... {len(states) - limit} more states")
+        lines.append("Hottest transitions:")
+        for transition in self.get_transitions()[:limit]:
+            lines.append(f"    {transition.state} -> {transition.target} (line {transition.line}): {transition.count} steps, {transition.time_ns / 1e6:.3f} ms")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import lzma
+import marshal
+import os
+import struct
+import sys
+import tempfile
+import time
+from typing import BinaryIO
+
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_MAGIC = b"TMSN"
+# format version, compression, header size
+__SNAPSHOT_PREFIX__ = struct.Struct("<BBI")
+# size of the slices of the tape cells written at once (the tapes are never copied as a whole)
+SNAPSHOT_CHUNK_SIZE = 1 << 20
+
+COMPRESSIONS = ["none", "gzip", "lzma"]
+
+# hash of the compiled program (state trees, start and end states) and of the alphabet, the snapshot can be
+#    restored only to the machine running the same program, but with any of the engines
+def get_program_hash(program, blank: str | None) -> str:
+    digest = hashlib.sha256(repr((program.alphabet, blank, program.start_node, program.end_nodes)).encode())
+    for name, state in program.nodes.items():
+        digest.update(f"\0{name}\0".encode())
+        stack = [state]
+        while len(stack) > 0:
+            node = stack.pop()
+            for no in sorted(node.lines.keys()):
+                digest.update(node.lines[no].value.encode())
+                digest.update(b"\n")
+            stack.extend(reversed(node.children))
+    return digest.hexdigest()
+
+def __get_program_hash__(machine) -> str:
+    program_hash = machine.program_hash
+    if program_hash is None:
+        program_hash = get_program_hash(machine.program, machine.blank)
+        machine.program_hash = program_hash
+    return program_hash
+
+def __open_payload__(file: BinaryIO, compression: int, mode: str) -> BinaryIO:
+    if compression == 1:
+        return gzip.GzipFile(fileobj=file, mode=mode, mtime=0)
+    if compression == 2:
+        return lzma.LZMAFile(file, mode=mode)
+    return file
+
+# snapshot layout: magic, prefix (format version, compression, header size), marshal serialized header
+#    (program hash, state, steps, byte order, (item size, cells count, head, origin, stream position) of each tape),
+#    and the payload with the packed cells of all the tapes (compressed with gzip or lzma, or stored as they are)
+#    the stream position is the number of the cells read from the tape stream (None for the other tapes), so the
+#    resumed machine continues reading the stream after the restored cells
+def write_snapshot(machine, file: BinaryIO, compression: str | None = None):
+    compression_id = COMPRESSIONS.index(compression or "none")
+    tapes = [(memoryview(tape.cells).itemsize, len(tape.cells), tape.head, tape.origin, tape.get_stream_position()) for tape in machine.tapes]
+    header = marshal.dumps((__get_program_hash__(machine), machine.state, machine.steps, sys.byteorder, tapes))
+    file.write(SNAPSHOT_MAGIC)
+    file.write(__SNAPSHOT_PREFIX__.pack(SNAPSHOT_FORMAT_VERSION, compression_id, len(header)))
+    file.write(header)
+
+    payload = __open_payload__(file, compression_id, "wb")
+    for tape in machine.tapes:
+        cells = memoryview(tape.cells).cast("B")
+        for begin in range(0, len(cells), SNAPSHOT_CHUNK_SIZE):
+            payload.write(cells[begin:begin + SNAPSHOT_CHUNK_SIZE])
+    if payload is not file:
+        payload.close()
+
+def read_snapshot(machine, file: BinaryIO):
+    if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+        raise Exception("File is not a Turing machine snapshot")
+    prefix = file.read(__SNAPSHOT_PREFIX__.size)
+    if len(prefix) != __SNAPSHOT_PREFIX__.size:
+        raise Exception("Snapshot is truncated")
+    version, compression_id, header_size = __SNAPSHOT_PREFIX__.unpack(prefix)
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise Exception(f"Unsupported snapshot format version {version} (expected {SNAPSHOT_FORMAT_VERSION})")
+    if compression_id >= len(COMPRESSIONS):
+        raise Exception(f"Unknown snapshot compression {compression_id}")
+    try:
+        program_hash, state, steps, byteorder, tapes = marshal.loads(file.read(header_size))
+    except (EOFError, ValueError, TypeError):
+        raise Exception("Snapshot header is corrupted")
+    if program_hash != __get_program_hash__(machine):
+        raise Exception("Snapshot was taken from the machine running a different program")
+    if len(tapes) != len(machine.tapes):
+        raise Exception(f"Snapshot contains {len(tapes)} tapes (expected {len(machine.tapes)})")
+
+    # the cells are read into the new arrays first, so the machine is not changed if the snapshot is broken
+    payload = __open_payload__(file, compression_id, "rb")
+    restored = []
+    for tape, (item_size, size, head, origin, stream_position) in zip(machine.tapes, tapes):
+        if (stream_position is None) != (tape.get_stream_position() is None):
+            raise Exception("Snapshot tapes are not read from the same tape streams")
+        cells = tape.symbols.fill_cells(0, size)
+        if item_size != memoryview(cells).itemsize:
+            raise Exception(f"Snapshot tape cells have unexpected size ({item_size} bytes)")
+        __read_into__(payload, memoryview(cells).cast("B"))
+        if item_size > 1 and byteorder != sys.byteorder:
+            cells.byteswap()
+        if not 0 <= head < max(size, 1) or not 0 <= origin <= size:
+            raise Exception("Snapshot head position is out of the tape")
+        restored.append((cells, head, origin, stream_position))
+
+    for tape, (cells, head, origin, stream_position) in zip(machine.tapes, restored):
+        tape.restore(cells, head, origin, stream_position)
+    machine.state = state
+    machine.steps = steps
+    machine.cycle = None
+
+def __read_into__(payload: BinaryIO, view: memoryview):
+    offset = 0
+    while offset < len(view):
+        count = payload.readinto(view[offset:offset + SNAPSHOT_CHUNK_SIZE])
+        if not count:
+            raise Exception("Snapshot is truncated")
+        offset += count
+
+# the snapshot is written to the temporary file and renamed, so the previous snapshot is kept if the process is killed
+def save_snapshot(machine, path: str, compression: str | None = None):
+    directory = os.path.dirname(os.path.abspath(path))
+    file, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix=".tmp")
+    try:
+        with os.fdopen(file, "wb") as f:
+            write_snapshot(machine, f, compression)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def load_snapshot(machine, path: str):
+    with open(path, "rb") as f:
+        read_snapshot(machine, f)
+
+# periodic snapshots of the governed run (see TuringMachine.run_governed)
+#    every_steps - number of steps between the snapshots, every_seconds - wall-clock time between the snapshots
+class Checkpointer:
+    def __init__(self, path: str, every_steps: int | None = None, every_seconds: float | None = None, compression: str | None = None):
+        if every_steps is not None and every_steps <= 0:
+            raise Exception(f"Checkpoint steps interval must be greater than 0 (got {every_steps})")
+        if every_seconds is not None and every_seconds <= 0:
+            raise Exception(f"Checkpoint time interval must be greater than 0 (got {every_seconds})")
+        if compression is not None and compression not in COMPRESSIONS:
+            raise Exception(f"Unknown compression '{compression}'. Available compressions: {', '.join(COMPRESSIONS)}")
+        self.path = path
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self.compression = compression
+        self.saved = 0
+        self.last_step = None
+        self.last_time = None
+
+    def start(self, machine):
+        self.last_step = machine.steps
+        self.last_time = time.monotonic()
+
+    # step at which the machine has to be stopped for the next snapshot (None - the snapshots are taken by time)
+    def next_step(self) -> int | None:
+        if self.every_steps is None:
+            return None
+        return self.last_step + self.every_steps
+
+    def is_due(self, machine) -> bool:
+        if self.every_steps is not None and machine.steps >= self.last_step + self.every_steps:
+            return True
+        return self.every_seconds is not None and time.monotonic() - self.last_time >= self.every_seconds
+
+    def save(self, machine):
+        save_snapshot(machine, self.path, self.compression)
+        self.saved += 1
+        self.last_step = machine.steps
+        self.last_time = time.monotonic()
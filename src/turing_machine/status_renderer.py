@@ -0,0 +1,112 @@
+import sys
+import time
+from typing import Callable, Dict, TextIO
+
+RED =  '\033[91m'
+BOLD = '\033[1m'
+RESET = '\033[0m'
+RED_BOLD = RED + BOLD
+
+# renders the machine status (tapes, head positions and state), showing only the window of the cells around each head
+#    window - number of the cells shown on each side of the head (None - whole tapes, the same as str(tape))
+#    max_rate - maximum number of the statuses written per second by show (None - unlimited), the statuses over the limit
+#    are skipped (the last skipped status is written by finish)
+#    the status is written with one write call to the stream (sys.stdout if not set)
+class StatusRenderer:
+    # rendered windows, by the window cells and the head offset (cleared when it's full)
+    MAX_CACHED_SEGMENTS = 1024
+    # number of the cells outside of the window compared with the blank cells at once
+    BLANK_SCAN_CHUNK = 1 << 16
+
+    def __init__(self, stream: TextIO | None = None, window: int | None = 64, max_rate: float | None = None, clock: Callable[[], float] = time.monotonic):
+        if window is not None and window < 0:
+            raise Exception(f"Status window must be greater or equal to 0 (got {window})")
+        if max_rate is not None and max_rate <= 0:
+            raise Exception(f"Status rate must be greater than 0 (got {max_rate})")
+        self.stream = stream
+        self.window = window
+        self.max_rate = max_rate
+        self.clock = clock
+        self.segments: Dict[tuple, str] = {}
+        self.next_time = None
+        self.skipped = 0
+
+    # writes the status, unless the last status was written less than 1 / max_rate seconds ago (returns False if it's skipped)
+    def show(self, machine, force: bool = False, full: bool = False) -> bool:
+        if self.max_rate is not None and not force:
+            now = self.clock()
+            if self.next_time is not None and now < self.next_time:
+                self.skipped += 1
+                return False
+            self.next_time = now + 1 / self.max_rate
+        stream = self.stream or sys.stdout
+        stream.write(self.render(machine, full))
+        stream.flush()
+        self.skipped = 0
+        return True
+
+    # writes the last status, if it was skipped by the rate limit
+    def finish(self, machine):
+        if self.skipped > 0:
+            self.show(machine, force=True)
+
+    def render(self, machine, full: bool = False) -> str:
+        tapes_str = ' | '.join([str(tape) if full or self.window is None else self.render_tape(tape) for tape in machine.tapes])
+        heads_str = ' | '.join([str(tape.get_position()) for tape in machine.tapes])
+        return f"Tapes: {tapes_str}\nHead Positions: {heads_str}\nCurrent State: {machine.state}\n"
+
+    # renders the window of the cells around the head, the cells outside of the window are marked with "..." (unless they are
+    #    all blank), the blank cells at the uncut ends of the window are not shown (as in str(tape))
+    def render_tape(self, tape) -> str:
+        cells = tape.cells
+        head = tape.head
+        blank = getattr(tape, "blank", None)
+        begin = max(head - self.window, 0)
+        end = min(head + self.window + 1, len(cells))
+        is_cut = (begin > 0 and not self.__is_blank__(tape, 0, begin, True), end < len(cells) and not self.__is_blank__(tape, end, len(cells), False))
+        if blank is not None:
+            while not is_cut[0] and begin < head and cells[begin] == blank:
+                begin += 1
+            while not is_cut[1] and end > head + 1 and cells[end - 1] == blank:
+                end -= 1
+        key = (memoryview(cells)[begin:end].tobytes(), head - begin, is_cut, tape.symbols)
+        segment = self.segments.get(key)
+        if segment is None:
+            segment = self.__render_segment__(tape, begin, end, is_cut)
+            if len(self.segments) >= StatusRenderer.MAX_CACHED_SEGMENTS:
+                self.segments.clear()
+            self.segments[key] = segment
+        return segment
+
+    # compares the cells with the blank cells in chunks (without decoding or copying them), starting next to the window
+    #    (backward - the cells before the window are scanned from the end), so the scan stops at the first non-blank cells
+    #    and only the blank cells next to the window are read
+    def __is_blank__(self, tape, begin: int, end: int, backward: bool) -> bool:
+        blank = getattr(tape, "blank", None)
+        if blank is None:
+            return False
+        blanks = memoryview(tape.symbols.fill_cells(blank, min(end - begin, StatusRenderer.BLANK_SCAN_CHUNK)))
+        cells = memoryview(tape.cells)
+        while begin < end:
+            size = min(end - begin, len(blanks))
+            if backward:
+                end -= size
+                chunk = cells[end:end + size]
+            else:
+                chunk = cells[begin:begin + size]
+                begin += size
+            if chunk != blanks[:size]:
+                return False
+        return True
+
+    def __render_segment__(self, tape, begin: int, end: int, is_cut: tuple[bool, bool]) -> str:
+        symbols = tape.symbols
+        head = tape.head
+        values = symbols.decode_tape(tape.cells[begin:head])
+        values.append(f"{RED_BOLD}{symbols.decode(tape.cells[head])}{RESET}")
+        values += symbols.decode_tape(tape.cells[head + 1:end])
+        if is_cut[0]:
+            values.insert(0, "...")
+        if is_cut[1]:
+            values.append("...")
+        return f"[{', '.join(values)}]"
@@ -0,0 +1,132 @@
+import re
+from typing import Callable, Dict, List, Tuple
+from src.compiler.symbol_table import SymbolTable
+from src.compiler.optimizer.sweep_analysis import SweepState
+
+# scans the tape for the first cell that ends the sweep (any value outside of the continue codes)
+#    the tape is scanned in windows of doubling size, so the cost is proportional to the skipped distance
+class SweepScanner:
+    WINDOW_SIZE = 256
+    MAX_FIND_TERMINATORS = 4
+
+    def __init__(self, continue_codes: set, symbols: SymbolTable):
+        self.continue_codes = continue_codes
+        self.is_byte_tape = symbols.typecode == 'B'
+        self.terminators = []
+        if self.is_byte_tape:
+            self.terminators = [bytes((code,)) for code in range(len(symbols)) if code not in continue_codes]
+        self.pattern = None
+        if self.is_byte_tape and len(self.terminators) > SweepScanner.MAX_FIND_TERMINATORS:
+            self.pattern = re.compile(b"[" + b"".join(re.escape(terminator) for terminator in self.terminators) + b"]")
+
+    # returns the index of the first terminating cell in the move direction (or the last scanned cell)
+    #    limit - maximum distance from the head of the scanned cells (the cells beyond it are never read)
+    def scan(self, cells, head: int, move: int, limit: int | None = None) -> int:
+        window = SweepScanner.WINDOW_SIZE
+        if move == 1:
+            stop = len(cells) if limit is None else min(head + limit + 1, len(cells))
+            begin = head
+            while begin < stop:
+                end = min(begin + window, stop)
+                index = self.__find__(cells, begin, end)
+                if index >= 0:
+                    return index
+                begin = end
+                window *= 2
+            return stop - 1
+
+        stop = 0 if limit is None else max(head - limit, 0)
+        end = head + 1
+        while end > stop:
+            begin = max(end - window, stop)
+            index = self.__rfind__(cells, begin, end)
+            if index >= 0:
+                return index
+            end = begin
+            window *= 2
+        return stop
+
+    def __find__(self, cells, begin: int, end: int) -> int:
+        if not self.is_byte_tape:
+            for index in range(begin, end):
+                if cells[index] not in self.continue_codes:
+                    return index
+            return -1
+        if self.pattern is not None:
+            match = self.pattern.search(cells, begin, end)
+            return match.start() if match is not None else -1
+        found = [index for index in (cells.find(terminator, begin, end) for terminator in self.terminators) if index >= 0]
+        return min(found) if len(found) > 0 else -1
+
+    def __rfind__(self, cells, begin: int, end: int) -> int:
+        if not self.is_byte_tape:
+            for index in range(end - 1, begin - 1, -1):
+                if cells[index] not in self.continue_codes:
+                    return index
+            return -1
+        if self.pattern is not None:
+            match = self.pattern.search(bytes(cells[begin:end])[::-1])
+            return end - 1 - match.start() if match is not None else -1
+        return max((cells.rfind(terminator, begin, end) for terminator in self.terminators), default=-1)
+
+# skips the steps of the sweep states (see find_sweep_states), by moving the head directly to the cell that ends the sweep
+#    the symbols that continue the sweep are resolved with the machine transition function for each of the values
+#    of the other tapes, so the result (and the step count) is the same as in the step by step execution
+class SweepAccelerator:
+    def __init__(self, sweep_states: Dict[str, SweepState], symbols: SymbolTable, resolve: Callable[[str, List[int]], Tuple[str, List[int], List[int]]]):
+        self.sweep_states = sweep_states
+        self.symbols = symbols
+        self.resolve = resolve
+        self.scanners: Dict[tuple, SweepScanner | None] = {}
+        self.skipped_steps = 0
+
+    # returns the number of skipped steps, the head of the sweep tape has to be moved by (sweep.move * skipped steps)
+    #    cells, heads - cells and head indexes of all the machine tapes
+    def skip(self, state: str, cells: List, heads: List[int], budget: int | None = None) -> int:
+        sweep = self.sweep_states.get(state)
+        if sweep is None:
+            return 0
+        if budget is not None and budget <= 0:
+            return 0
+        key = (state, tuple(cells[tape_id][heads[tape_id]] for tape_id in sweep.read_tapes))
+        scanner = self.scanners.get(key)
+        if scanner is None:
+            if key in self.scanners:
+                return 0
+            scanner = self.__create_scanner__(state, sweep, [tape_cells[head] for tape_cells, head in zip(cells, heads)])
+            self.scanners[key] = scanner
+            if scanner is None:
+                return 0
+
+        tape_cells = cells[sweep.tape]
+        head = heads[sweep.tape]
+        # short sweeps are left to the step by step execution
+        following = head + sweep.move
+        if tape_cells[head] not in scanner.continue_codes or following < 0 or following >= len(tape_cells) or tape_cells[following] not in scanner.continue_codes:
+            return 0
+
+        # the cells after the budget would not be visited
+        skipped = abs(scanner.scan(tape_cells, following, sweep.move, None if budget is None else budget - 1) - head)
+        self.skipped_steps += skipped
+        return skipped
+
+    def __create_scanner__(self, state: str, sweep: SweepState, values: List[int]) -> SweepScanner | None:
+        continue_codes = set()
+        tape_values = list(values)
+        for code in range(len(self.symbols)):
+            tape_values[sweep.tape] = code
+            try:
+                new_state, new_values, movement = self.resolve(state, tape_values)
+            except Exception:
+                # the step by step execution reports the error when the head reaches this value
+                continue
+            if new_state != state:
+                continue
+            if any(new_value != value for new_value, value in zip(new_values, tape_values)):
+                continue
+            if any(move != (sweep.move if tape_id == sweep.tape else 0) for tape_id, move in enumerate(movement)):
+                continue
+            continue_codes.add(code)
+        if len(continue_codes) == 0:
+            return None
+        return SweepScanner(continue_codes, self.symbols)
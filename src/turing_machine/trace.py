@@ -0,0 +1,342 @@
+import lzma
+import marshal
+import struct
+import sys
+import threading
+import zlib
+from dataclasses import dataclass
+from queue import Queue
+from typing import BinaryIO, Dict, List
+
+TRACE_FORMAT_VERSION = 2
+TRACE_MAGIC = b"TMTR"
+# format version, compression, header size
+TRACE_PREFIX = struct.Struct("<BBI")
+# first step, last step, records count, full keyframe flag, keyframe size, compressed keyframe size, records size,
+#    compressed records size
+TRACE_CHUNK_HEADER = struct.Struct("<QQIBQQQQ")
+# number of the added tape cells compared with the blank cells at once (see __trim_blanks__)
+TRACE_BLANK_CHUNK = 4096
+
+TRACE_COMPRESSIONS = ["none", "zlib", "lzma"]
+
+# record kinds (the lowest bit of the first varint of the record)
+STEP_RECORD = 0
+SAMPLE_RECORD = 1
+
+def encode_varint(value: int, output: bytearray):
+    while value >= 0x80:
+        output.append((value & 0x7f) | 0x80)
+        value >>= 7
+    output.append(value)
+
+def encode_zigzag(value: int, output: bytearray):
+    encode_varint(value << 1 if value >= 0 else (-value << 1) - 1, output)
+
+def decode_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def decode_zigzag(data: bytes, offset: int) -> tuple[int, int]:
+    value, offset = decode_varint(data, offset)
+    return (value >> 1) if value & 1 == 0 else -((value + 1) >> 1), offset
+
+def compress_chunk(data: bytes, compression_id: int) -> bytes:
+    if compression_id == 1:
+        return zlib.compress(data)
+    if compression_id == 2:
+        return lzma.compress(data)
+    return data
+
+def decompress_chunk(data: bytes, compression_id: int) -> bytes:
+    if compression_id == 1:
+        return zlib.decompress(data)
+    if compression_id == 2:
+        return lzma.decompress(data)
+    return data
+
+# header of the trace, the state ids and the symbol codes of the records are resolved with it
+@dataclass
+class TraceHeader:
+    state_names: List[str]
+    alphabet: List[str]
+    blank: int | None
+    tape_count: int
+    typecode: str
+    byteorder: str
+    sample_interval: int
+    keyframe_interval: int
+
+    def pack(self) -> bytes:
+        return marshal.dumps((self.state_names, self.alphabet, self.blank, self.tape_count, self.typecode, self.byteorder, self.sample_interval, self.keyframe_interval))
+
+# records the run of the machine (see TuringMachine.run_traced) as the binary stream of the per step deltas
+#    the stream is split into the chunks, each of them starts with the keyframe followed by at most keyframe_interval records,
+#    so the replay can start at any of the chunks (see src/turing_machine/trace_replay.py)
+#    the first keyframe (and the keyframe after the steps run without the recorder) is full: it copies all the cells of
+#    the tapes, so it costs O(tape size) memory and disk once; the other keyframes are the deltas, they contain only the cells
+#    which could have been changed since the previous keyframe (the cells at most that many steps away from the previous head
+#    positions, and the non-blank cells added to the tapes), so their size is bounded by the steps of the chunk
+#    the chunks are compressed and written by the background thread, the machine only appends the records to the buffer
+#
+#    trace layout: magic, prefix (format version, compression, header size), marshal serialized TraceHeader, and the chunks:
+#    chunk header (TRACE_CHUNK_HEADER), the keyframe and the records (each of them compressed with zlib or lzma, or stored
+#    as it is, so the keyframes can be read without the records)
+#    keyframe: varint state id, for each tape: varint cells count, head and origin, followed by the packed cells of all
+#    the tapes (full keyframe) or by the varint count of the cell ranges and the ranges (varint tape id, zigzag position
+#    of the first cell, varint cells count and the packed cells) of the delta keyframe
+#    records: the step record - state id, head moves and the writes of the GOTO statement, precomputed for each
+#    of the GOTO statements; the sample record - number of the steps, state id, head position changes and the cells written
+#    since the previous record
+#    sample_interval - one record for every sample_interval steps (the step records are written only if it's 1)
+class TraceRecorder:
+    QUEUE_SIZE = 8
+
+    def __init__(self, file: BinaryIO, compression: str | None = None, sample_interval: int = 1, keyframe_interval: int = 65536):
+        if compression is not None and compression not in TRACE_COMPRESSIONS:
+            raise Exception(f"Unknown trace compression '{compression}'. Available compressions: {', '.join(TRACE_COMPRESSIONS)}")
+        if sample_interval <= 0:
+            raise Exception(f"Trace sample interval must be greater than 0 (got {sample_interval})")
+        if keyframe_interval <= 0:
+            raise Exception(f"Trace keyframe interval must be greater than 0 (got {keyframe_interval})")
+        self.file = file
+        self.owns_file = False
+        self.compression_id = TRACE_COMPRESSIONS.index(compression or "none")
+        self.sample_interval = sample_interval
+        self.keyframe_interval = keyframe_interval
+        self.program = None
+        self.state_ids: Dict[str, int] = {}
+        # step records of the GOTO statements, by the id of their encoded result
+        self.step_records: Dict[int, bytes] = {}
+        # records of the open chunk
+        self.buffer = bytearray()
+        self.records = 0
+        self.keyframe: bytearray | None = None
+        self.is_full_keyframe = False
+        self.chunk_step = 0
+        # (cells count, origin, head position) of each tape at the last keyframe
+        self.keyframe_layouts: List[tuple[int, int, int]] | None = None
+        # last recorded step and the head positions at that step
+        self.step: int | None = None
+        self.positions: List[int] = []
+        # cells written since the last record, by (tape id, position), and the number of the steps not recorded yet
+        self.pending: Dict[tuple[int, int], int] = {}
+        self.pending_steps = 0
+        self.queue: Queue = Queue(TraceRecorder.QUEUE_SIZE)
+        self.thread: threading.Thread | None = None
+        self.error: BaseException | None = None
+        self.is_closed = False
+
+    @staticmethod
+    def open(path: str, compression: str | None = None, sample_interval: int = 1, keyframe_interval: int = 65536):
+        recorder = TraceRecorder(open(path, "wb"), compression, sample_interval, keyframe_interval)
+        recorder.owns_file = True
+        return recorder
+
+    # called when the traced run starts, the new chunk is started if the machine was run without the recorder since the last record
+    def start(self, machine):
+        if self.is_closed:
+            raise Exception("Trace recorder is closed")
+        if self.program is None:
+            self.__write_header__(machine)
+        elif machine.program is not self.program:
+            raise Exception("Trace recorder was started for the different program")
+        self.__check_error__()
+        if self.step != machine.steps:
+            # the tapes could have been changed without the recorder in any way
+            self.start_chunk(machine, full=True)
+
+    # called when the traced run stops, the steps not recorded yet are recorded
+    def stop(self, machine):
+        if self.pending_steps > 0:
+            self.record(machine)
+        else:
+            self.step = machine.steps
+            self.positions = machine.get_tape_positions()
+
+    # sample record of the steps since the last record
+    def record(self, machine):
+        positions = machine.get_tape_positions()
+        record = self.buffer
+        encode_varint((self.pending_steps << 1) | SAMPLE_RECORD, record)
+        encode_varint(self.state_ids[machine.state], record)
+        for position, previous in zip(positions, self.positions):
+            encode_zigzag(position - previous, record)
+        encode_varint(len(self.pending), record)
+        for (tape_id, position), code in self.pending.items():
+            encode_varint(tape_id, record)
+            encode_zigzag(position - positions[tape_id], record)
+            encode_varint(code, record)
+        self.pending.clear()
+        self.pending_steps = 0
+        self.records += 1
+        self.step = machine.steps
+        self.positions = positions
+        if self.records >= self.keyframe_interval:
+            self.start_chunk(machine)
+
+    # sends the open chunk to the writer and starts the new chunk with the keyframe of the machine configuration
+    #    full - the keyframe contains all the cells (otherwise only the cells changed since the previous keyframe)
+    def start_chunk(self, machine, full: bool = False):
+        self.__flush__()
+        full = full or self.keyframe_layouts is None
+        keyframe = bytearray()
+        encode_varint(self.state_ids[machine.state], keyframe)
+        for tape in machine.tapes:
+            encode_varint(len(tape.cells), keyframe)
+            encode_varint(tape.head, keyframe)
+            encode_varint(tape.origin, keyframe)
+        if full:
+            for tape in machine.tapes:
+                keyframe += memoryview(tape.cells).cast("B")
+        else:
+            ranges = self.__get_changed_ranges__(machine)
+            encode_varint(len(ranges), keyframe)
+            for tape_id, begin, end in ranges:
+                tape = machine.tapes[tape_id]
+                encode_varint(tape_id, keyframe)
+                encode_zigzag(begin - tape.origin, keyframe)
+                encode_varint(end - begin, keyframe)
+                keyframe += memoryview(tape.cells)[begin:end].cast("B")
+        self.keyframe = keyframe
+        self.is_full_keyframe = full
+        self.keyframe_layouts = [(len(tape.cells), tape.origin, tape.get_position()) for tape in machine.tapes]
+        self.chunk_step = machine.steps
+        self.step = machine.steps
+        self.positions = machine.get_tape_positions()
+        self.pending.clear()
+        self.pending_steps = 0
+
+    # ranges (tape id, first cell, end) of the cells which could have been changed since the last keyframe: every step moves
+    #    each head by at most one cell, so the written cells are at most that many steps away from the head positions at
+    #    the keyframe; the cells added to the tapes are stored without the blank cells at their outer ends
+    def __get_changed_ranges__(self, machine) -> List[tuple[int, int, int]]:
+        distance = machine.steps - self.chunk_step
+        ranges = []
+        for tape_id, (tape, (size, origin, position)) in enumerate(zip(machine.tapes, self.keyframe_layouts)):
+            # cells of the tape at the keyframe
+            old_begin = tape.origin - origin
+            old_end = old_begin + size
+            head = position + tape.origin
+            begin = max(head - distance, old_begin)
+            end = min(head + distance + 1, old_end)
+            if begin < end:
+                ranges.append((tape_id, begin, end))
+            blank = getattr(tape, "blank", None)
+            if old_begin > 0:
+                begin, end = (0, old_begin) if blank is None else __trim_blanks__(tape, 0, old_begin, True)
+                if begin < end:
+                    ranges.append((tape_id, begin, end))
+            if old_end < len(tape.cells):
+                begin, end = (old_end, len(tape.cells)) if blank is None else __trim_blanks__(tape, old_end, len(tape.cells), False)
+                if begin < end:
+                    ranges.append((tape_id, begin, end))
+        return ranges
+
+    def close(self):
+        if self.is_closed:
+            return
+        self.is_closed = True
+        try:
+            if self.thread is not None:
+                self.__flush__()
+                self.queue.put(None)
+                self.thread.join()
+                self.__check_error__()
+            self.file.flush()
+        finally:
+            if self.owns_file:
+                self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __write_header__(self, machine):
+        self.program = machine.program
+        state_names = list(machine.program.nodes.keys())
+        self.state_ids = {name: state_id for state_id, name in enumerate(state_names)}
+        for state in machine.program.nodes.values():
+            for node in state.get_nodes():
+                result = getattr(node, "encoded_result", None)
+                if result is not None:
+                    self.step_records[id(result)] = self.__get_step_record__(result)
+        blank = None if machine.blank is None else machine.symbols.encode(machine.blank)
+        header = TraceHeader(state_names, machine.symbols.symbols, blank, len(machine.tapes), machine.symbols.typecode,
+                             sys.byteorder, self.sample_interval, self.keyframe_interval).pack()
+        self.file.write(TRACE_MAGIC)
+        self.file.write(TRACE_PREFIX.pack(TRACE_FORMAT_VERSION, self.compression_id, len(header)))
+        self.file.write(header)
+        self.thread = threading.Thread(target=self.__write_chunks__, name="trace-writer", daemon=True)
+        self.thread.start()
+
+    # step record of the GOTO statement: the written values are either the symbol codes or the tapes they are copied from
+    #    (read before the step), the values are written at the head positions from before the move
+    def __get_step_record__(self, result) -> bytes:
+        record = bytearray()
+        encode_varint(STEP_RECORD, record)
+        encode_varint(self.state_ids[result.new_state], record)
+        for move in result.tape_movement:
+            record.append(0 if move == 0 else (1 if move == 1 else 2))
+        writes = [(tape_id, value, source) for tape_id, (value, source) in enumerate(zip(result.tape_value, result.tape_source)) if source != tape_id]
+        encode_varint(len(writes), record)
+        for tape_id, value, source in writes:
+            encode_varint((tape_id << 1) | (0 if source is None else 1), record)
+            encode_varint(value if source is None else source, record)
+        return bytes(record)
+
+    def __flush__(self):
+        if self.keyframe is None:
+            return
+        self.__check_error__()
+        self.queue.put((self.chunk_step, self.step, self.records, self.is_full_keyframe, self.keyframe, bytes(self.buffer)))
+        self.keyframe = None
+        self.buffer.clear()
+        self.records = 0
+
+    def __write_chunks__(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                return
+            if self.error is not None:
+                continue
+            first_step, last_step, records, is_full, keyframe, payload = chunk
+            try:
+                keyframe_data = compress_chunk(keyframe, self.compression_id)
+                data = compress_chunk(payload, self.compression_id)
+                self.file.write(TRACE_CHUNK_HEADER.pack(first_step, last_step, records, 1 if is_full else 0, len(keyframe), len(keyframe_data), len(payload), len(data)))
+                self.file.write(keyframe_data)
+                self.file.write(data)
+            except BaseException as e:
+                self.error = e
+
+    def __check_error__(self):
+        if self.error is not None:
+            raise Exception(f"Failed to write the trace: {self.error}")
+
+# returns the range of the cells without the blank cells at its outer end (at_front - the blank cells at the beginning
+#    of the range), the cells are compared with the blank cells in chunks, so a few blank cells can be left in the range
+def __trim_blanks__(tape, begin: int, end: int, at_front: bool) -> tuple[int, int]:
+    blanks = memoryview(tape.symbols.fill_cells(tape.blank, min(end - begin, TRACE_BLANK_CHUNK)))
+    cells = memoryview(tape.cells)
+    while begin < end:
+        size = min(end - begin, len(blanks))
+        if at_front:
+            if cells[begin:begin + size] != blanks[:size]:
+                break
+            begin += size
+        else:
+            if cells[end - size:end] != blanks[:size]:
+                break
+            end -= size
+    return begin, end
@@ -0,0 +1,266 @@
+import bisect
+import marshal
+import os
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List
+from src.compiler.symbol_table import SymbolTable
+from src.turing_machine.machine import GrowableTape, Tape
+from src.turing_machine.trace import (SAMPLE_RECORD, TRACE_CHUNK_HEADER, TRACE_COMPRESSIONS, TRACE_FORMAT_VERSION, TRACE_MAGIC,
+                                      TraceHeader, TRACE_PREFIX, decode_varint, decode_zigzag, decompress_chunk)
+
+@dataclass
+class TraceChunk:
+    first_step: int
+    last_step: int
+    records: int
+    is_full: bool
+    offset: int
+    keyframe_size: int
+    compressed_keyframe_size: int
+    size: int
+    compressed_size: int
+
+# machine configuration at the recorded step (the tapes are replayed on the Tape objects, so they are displayed
+#    the same way as the tapes of the machine)
+class TraceFrame:
+    def __init__(self, step: int, state: str, tapes: List[Tape]):
+        self.step = step
+        self.state = state
+        self.tapes = tapes
+
+    def get_tape_positions(self) -> List[int]:
+        return [tape.get_position() for tape in self.tapes]
+
+    def get_tapes_content(self) -> List[List[str]]:
+        return [tape.get_content() for tape in self.tapes]
+
+    def __str__(self):
+        tapes_str = ' | '.join([str(tape) for tape in self.tapes])
+        heads_str = ' | '.join([str(tape.get_position()) for tape in self.tapes])
+        return f"Step: {self.step}\nTapes: {tapes_str}\nHead Positions: {heads_str}\nCurrent State: {self.state}"
+
+# reads the trace written by the TraceRecorder, only the chunk headers are read when the trace is opened,
+#    the configuration at any recorded step is restored from the keyframe of its chunk and the records that follow it
+class TraceReader:
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        if file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise Exception("File is not a Turing machine trace")
+        prefix = file.read(TRACE_PREFIX.size)
+        if len(prefix) != TRACE_PREFIX.size:
+            raise Exception("Trace is truncated")
+        version, self.compression_id, header_size = TRACE_PREFIX.unpack(prefix)
+        if version != TRACE_FORMAT_VERSION:
+            raise Exception(f"Unsupported trace format version {version} (expected {TRACE_FORMAT_VERSION})")
+        if self.compression_id >= len(TRACE_COMPRESSIONS):
+            raise Exception(f"Unknown trace compression {self.compression_id}")
+        try:
+            self.header = TraceHeader(*marshal.loads(file.read(header_size)))
+        except (EOFError, ValueError, TypeError):
+            raise Exception("Trace header is corrupted")
+        self.symbols = SymbolTable(self.header.alphabet)
+        if self.symbols.typecode != self.header.typecode:
+            raise Exception(f"Trace tape cells have unexpected type '{self.header.typecode}'")
+        self.itemsize = array(self.symbols.typecode).itemsize
+        self.chunks: List[TraceChunk] = []
+        # the chunk written partially (the recording process was killed) is ignored
+        end = os.fstat(file.fileno()).st_size
+        while True:
+            chunk_header = file.read(TRACE_CHUNK_HEADER.size)
+            if len(chunk_header) < TRACE_CHUNK_HEADER.size:
+                break
+            first_step, last_step, records, is_full, keyframe_size, compressed_keyframe_size, size, compressed_size = TRACE_CHUNK_HEADER.unpack(chunk_header)
+            offset = file.tell()
+            if offset + compressed_keyframe_size + compressed_size > end:
+                break
+            file.seek(compressed_keyframe_size + compressed_size, os.SEEK_CUR)
+            self.chunks.append(TraceChunk(first_step, last_step, records, is_full == 1, offset, keyframe_size, compressed_keyframe_size, size, compressed_size))
+        if len(self.chunks) > 0 and not self.chunks[0].is_full:
+            raise Exception("Trace does not start with the full keyframe")
+        self.first_steps = [chunk.first_step for chunk in self.chunks]
+        # last restored keyframe (chunk index, state id, tape layouts and cells), the delta keyframes are applied to it
+        #    when the chunks are replayed in order
+        self.keyframe: tuple[int, int, list, list] | None = None
+
+    @staticmethod
+    def open(path: str):
+        return TraceReader(open(path, "rb"))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_first_step(self) -> int:
+        if len(self.chunks) == 0:
+            raise Exception("Trace is empty")
+        return self.chunks[0].first_step
+
+    def get_last_step(self) -> int:
+        if len(self.chunks) == 0:
+            raise Exception("Trace is empty")
+        return max(chunk.last_step for chunk in self.chunks)
+
+    # returns the configuration at the last recorded step before or at the step
+    def seek(self, step: int) -> TraceFrame:
+        index = bisect.bisect_right(self.first_steps, step) - 1
+        if index < 0:
+            raise Exception(f"Step {step} is before the first recorded step {self.get_first_step()}")
+        frame = None
+        for frame in self.__replay_chunk__(index, step):
+            pass
+        return frame
+
+    # yields the configurations at the recorded steps from the first step to the last step (the same frame is updated)
+    def replay(self, first_step: int = 0, last_step: int | None = None) -> Iterator[TraceFrame]:
+        index = max(bisect.bisect_right(self.first_steps, first_step) - 1, 0)
+        previous_step = None
+        for index in range(index, len(self.chunks)):
+            if last_step is not None and self.chunks[index].first_step > last_step:
+                return
+            for frame in self.__replay_chunk__(index, last_step):
+                # the keyframe of the chunk repeats the last record of the previous chunk
+                if frame.step >= first_step and frame.step != previous_step:
+                    previous_step = frame.step
+                    yield frame
+
+    def __replay_chunk__(self, index: int, last_step: int | None) -> Iterator[TraceFrame]:
+        chunk = self.chunks[index]
+        state_id, layouts, keyframe_cells = self.__get_keyframe__(index)
+        tapes = []
+        for (size, head, origin), cells in zip(layouts, keyframe_cells):
+            cells = cells[:]
+            tape = Tape(cells, self.symbols) if self.header.blank is None else GrowableTape(cells, self.symbols, self.header.blank)
+            tape.head = head
+            tape.origin = origin
+            tapes.append(tape)
+        data = self.__read__(chunk.offset + chunk.compressed_keyframe_size, chunk.compressed_size, chunk.size, chunk)
+
+        state_names = self.header.state_names
+        frame = TraceFrame(chunk.first_step, state_names[state_id], tapes)
+        yield frame
+        offset = 0
+        while offset < len(data):
+            kind, offset = decode_varint(data, offset)
+            steps = 1 if kind & 1 != SAMPLE_RECORD else kind >> 1
+            if last_step is not None and frame.step + steps > last_step:
+                return
+            state_id, offset = decode_varint(data, offset)
+            if kind & 1 == SAMPLE_RECORD:
+                offset = self.__replay_sample__(data, offset, tapes)
+            else:
+                offset = self.__replay_step__(data, offset, tapes)
+            frame.step += steps
+            frame.state = state_names[state_id]
+            yield frame
+
+    # restores the keyframe of the chunk from the last full keyframe before it and the delta keyframes that follow it
+    def __get_keyframe__(self, index: int) -> tuple[int, list, list]:
+        start = index
+        while not self.chunks[start].is_full:
+            start -= 1
+        if self.keyframe is not None and start <= self.keyframe[0] <= index:
+            start, state_id, layouts, cells = self.keyframe
+        else:
+            state_id, layouts, cells = self.__read_keyframe__(self.chunks[start], None, None)
+        for chunk in self.chunks[start + 1:index + 1]:
+            state_id, layouts, cells = self.__read_keyframe__(chunk, layouts, cells)
+        self.keyframe = (index, state_id, layouts, cells)
+        return state_id, layouts, cells
+
+    # reads the keyframe of the chunk, the delta keyframe is applied to the cells of the previous keyframe (the cells are updated)
+    def __read_keyframe__(self, chunk: TraceChunk, layouts: list | None, cells: list | None) -> tuple[int, list, list]:
+        data = self.__read__(chunk.offset, chunk.compressed_keyframe_size, chunk.keyframe_size, chunk)
+        state_id, offset = decode_varint(data, 0)
+        new_layouts = []
+        for _ in range(self.header.tape_count):
+            size, offset = decode_varint(data, offset)
+            head, offset = decode_varint(data, offset)
+            origin, offset = decode_varint(data, offset)
+            new_layouts.append((size, head, origin))
+        if chunk.is_full:
+            cells = []
+            for size, _, _ in new_layouts:
+                cells.append(self.__read_cells__(data, offset, size))
+                offset += size * self.itemsize
+            return state_id, new_layouts, cells
+
+        fill = 0 if self.header.blank is None else self.header.blank
+        for tape_id, ((size, _, origin), (new_size, _, new_origin)) in enumerate(zip(layouts, new_layouts)):
+            if size == new_size and origin == new_origin:
+                continue
+            # the cells of the previous keyframe are moved to their positions in the grown tape
+            tape_cells = self.symbols.fill_cells(fill, new_size)
+            shift = new_origin - origin
+            begin = max(0, -shift)
+            end = min(size, new_size - shift)
+            if begin < end:
+                tape_cells[begin + shift:end + shift] = cells[tape_id][begin:end]
+            cells[tape_id] = tape_cells
+        count, offset = decode_varint(data, offset)
+        for _ in range(count):
+            tape_id, offset = decode_varint(data, offset)
+            position, offset = decode_zigzag(data, offset)
+            size, offset = decode_varint(data, offset)
+            begin = position + new_layouts[tape_id][2]
+            cells[tape_id][begin:begin + size] = self.__read_cells__(data, offset, size)
+            offset += size * self.itemsize
+        return state_id, new_layouts, cells
+
+    def __read_cells__(self, data: bytes, offset: int, size: int) -> bytearray | array:
+        cells = self.symbols.cells_from_bytes(data[offset:offset + size * self.itemsize])
+        if self.itemsize > 1 and self.header.byteorder != sys.byteorder:
+            cells.byteswap()
+        return cells
+
+    def __read__(self, offset: int, compressed_size: int, size: int, chunk: TraceChunk) -> bytes:
+        self.file.seek(offset)
+        data = decompress_chunk(self.file.read(compressed_size), self.compression_id)
+        if len(data) != size:
+            raise Exception(f"Trace chunk at step {chunk.first_step} is corrupted")
+        return data
+
+    def __replay_step__(self, data: bytes, offset: int, tapes: List[Tape]) -> int:
+        moves = data[offset:offset + len(tapes)]
+        offset += len(tapes)
+        count, offset = decode_varint(data, offset)
+        # the copied values are read before the writes
+        values = [tape.get_value() for tape in tapes]
+        for _ in range(count):
+            target, offset = decode_varint(data, offset)
+            value, offset = decode_varint(data, offset)
+            tapes[target >> 1].set_value(values[value] if target & 1 else value)
+        for tape, move in zip(tapes, moves):
+            if move == 1:
+                tape.move_right()
+            elif move == 2:
+                tape.move_left()
+        return offset
+
+    def __replay_sample__(self, data: bytes, offset: int, tapes: List[Tape]) -> int:
+        positions = []
+        for tape in tapes:
+            delta, offset = decode_zigzag(data, offset)
+            positions.append(tape.get_position() + delta)
+        count, offset = decode_varint(data, offset)
+        for _ in range(count):
+            tape_id, offset = decode_varint(data, offset)
+            position, offset = decode_zigzag(data, offset)
+            code, offset = decode_varint(data, offset)
+            __move_to__(tapes[tape_id], positions[tape_id] + position)
+            tapes[tape_id].set_value(code)
+        for tape, position in zip(tapes, positions):
+            __move_to__(tape, position)
+        return offset
+
+def __move_to__(tape: Tape, position: int):
+    while tape.get_position() < position:
+        tape.move_right()
+    while tape.get_position() > position:
+        tape.move_left()
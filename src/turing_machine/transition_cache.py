@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# memoizes the resolved transitions of the machine, keyed by (state, values of the tapes read by the state)
+#    max_size = None means that the cache is unbounded, otherwise the least recently used
+#    entry is evicted, when the cache grows over the max_size
+class TransitionCache:
+    def __init__(self, max_size: int | None = None):
+        if max_size is not None and max_size <= 0:
+            raise Exception(f"Transition cache size must be greater than 0 (got {max_size})")
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.max_size is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, entry: Any):
+        self.entries[key] = entry
+        if self.max_size is not None and len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        size_limit = "unbounded" if self.max_size is None else f"max {self.max_size}"
+        return f"entries: {len(self.entries)} ({size_limit}), hits: {self.hits}, misses: {self.misses}, evictions: {self.evictions}, hit rate: {self.hit_rate() * 100:.2f}%"
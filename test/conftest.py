@@ -0,0 +1,8 @@
+import pytest
+import src.config.config_cache as config_cache
+
+# the compiled configs are cached in the temporary directory of the test (never in the user cache directory)
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("TURING_MACHINE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(config_cache, "__default_cache__", None)
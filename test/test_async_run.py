@@ -0,0 +1,97 @@
+import asyncio
+import os
+import pytest
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.engines import ENGINES, create_machine
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+# bounces between two cells forever
+LOOP_CONFIG = r'''
+[tape]
+alphabet = [a, b]
+T.0 = [a, b]
+
+[program]
+START right
+END [done]
+right {
+    IF (T.0 == "a") THEN {
+        GOTO left { T.0: ["b", MOV_R] }
+    } ELSE {
+        GOTO left { T.0: ["a", MOV_R] }
+    }
+}
+left {
+    GOTO right { T.0: [T.0, MOV_L] }
+}
+done {}
+'''
+
+def test_run_async_matches_run_auto():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    for engine in ENGINES:
+        expected = create_machine(config, engine)
+        assert expected.run_auto()
+        machine = create_machine(config, engine)
+        assert asyncio.run(machine.run_async(quantum=7))
+        assert (machine.state, machine.steps, machine.get_tapes_content()) == (expected.state, expected.steps, expected.get_tapes_content())
+
+        machine = create_machine(config, engine)
+        assert not asyncio.run(machine.run_async(quantum=7, max_steps=20))
+        assert machine.steps == 20
+
+def test_machines_share_the_event_loop():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    order = []
+
+    async def run(name: str):
+        machine = create_machine(config, accelerate_sweeps=False)
+        events = []
+        async for event in machine.progress(quantum=10):
+            order.append(name)
+            events.append(event)
+        return machine, events
+
+    async def run_all():
+        return await asyncio.gather(run("first"), run("second"))
+
+    results = asyncio.run(run_all())
+    for machine, events in results:
+        # each batch (except the last one) executes quantum steps
+        assert [event.steps for event in events] == list(range(10, machine.steps, 10)) + [machine.steps]
+        assert events[-1].finished and events[-1].done and not any(event.done for event in events[:-1])
+    # the batches of the machines are interleaved
+    assert order[:4] == ["first", "second", "first", "second"]
+
+def test_cancelled_run_can_be_resumed():
+    config = load_from_string(LOOP_CONFIG)
+    assert config is not None
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(asyncio.wait_for(machine.run_async(quantum=100), 0.05))
+        steps = machine.steps
+        assert steps > 0 and steps % 100 == 0
+        assert machine.state == "right" and machine.get_tape_positions() == [0]
+        assert not machine.run_auto(steps + 3) and (machine.state, machine.steps) == ("left", steps + 3)
+
+def test_cycle_is_detected_across_batches():
+    config = load_from_string(LOOP_CONFIG)
+    assert config is not None
+    machine = create_machine(config)
+    events = []
+
+    async def run():
+        async for event in machine.progress(quantum=1, detect_cycles=True):
+            events.append(event)
+
+    asyncio.run(run())
+    assert events[-1].done and not events[-1].finished
+    assert events[-1].cycle is not None and events[-1].cycle.length == 4
+    assert machine.cycle_detector is None
+
+    with pytest.raises(Exception, match="Quantum must be greater than 0"):
+        asyncio.run(machine.run_async(quantum=0))
@@ -0,0 +1,144 @@
+import os
+import random
+import pytest
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.ast_turing_machine import ASTTuringMachine
+from src.turing_machine.engines import create_machine
+from src.turing_machine.governor import BudgetLimit, ResourceBudget
+from src.turing_machine.machine import TapeLimitError
+
+np = pytest.importorskip("numpy")
+
+from src.turing_machine.batch_executor import BatchExecutor
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+def random_search_tapes(rng: random.Random) -> list[list[str]]:
+    text = [rng.choice("abt_e") for _ in range(rng.randint(0, 30))]
+    pattern = [rng.choice("abte") for _ in range(rng.randint(1, 3))]
+    return [["^"] + text + ["$"], ["^"] + pattern + ["$"], ["^", "0", "0", "0", "$"]]
+
+def test_batch_executor_matches_interpreter():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+
+    rng = random.Random(1234)
+    tape_sets = [random_search_tapes(rng) for _ in range(200)]
+    tape_sets.append([["x", "$"], ["^", "$"], ["^", "0", "$"]])
+
+    results = BatchExecutor(config.program, config.blank).run(tape_sets)
+
+    assert len(results) == len(tape_sets)
+    for tapes, result in zip(tape_sets, results):
+        config.tapes = tapes
+        machine = ASTTuringMachine(config)
+        machine.run_auto()
+        assert result.finished
+        assert result.state == machine.state
+        assert result.steps == machine.steps
+        assert result.tapes == machine.get_tapes_content()
+        assert result.positions == machine.get_tape_positions()
+
+def test_transitions_are_resolved_once_with_the_lookup_table(monkeypatch):
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    rng = random.Random(42)
+    tape_sets = [random_search_tapes(rng) for _ in range(100)]
+
+    executor = BatchExecutor(config.program, config.blank)
+    assert executor.lookup_table is not None
+    resolved = []
+    add_transition = executor.__add_transition__
+    monkeypatch.setattr(executor, "__add_transition__", lambda state_id, tape_values: resolved.append((state_id, tape_values)) or add_transition(state_id, tape_values))
+    results = executor.run(tape_sets)
+    assert len(resolved) == len(set((state_id, tuple(tape_values)) for state_id, tape_values in resolved))
+    assert len(resolved) == executor.table_size
+
+    # the same results without the lookup table
+    monkeypatch.setattr(BatchExecutor, "MAX_LOOKUP_TABLE_SIZE", 0)
+    executor = BatchExecutor(config.program, config.blank)
+    assert executor.lookup_table is None
+    assert executor.run(tape_sets) == results
+
+# goes to the first blank cell on the left, then to the first blank cell on the right
+GROW_PROGRAM = r'''
+[program]
+START go_left
+END done
+go_left {
+    IF (T.0 == "_") THEN {
+        GOTO go_right { T.0: ["0", MOV_R] }
+    } ELSE {
+        GOTO go_left { T.0: [T.0, MOV_L] }
+    }
+}
+go_right {
+    IF (T.0 == "_") THEN {
+        GOTO done { T.0: ["0", MOV_L] }
+    } ELSE {
+        GOTO go_right { T.0: [T.0, MOV_R] }
+    }
+}
+done {}
+'''
+
+def test_batch_executor_growable_tapes_and_errors():
+    program = GROW_PROGRAM
+    config = load_from_string("[tape]\nalphabet = [0, 1, _]\nblank = _\nT.0 = [1]\n" + program)
+    assert config is not None
+
+    results = BatchExecutor(config.program, config.blank).run([[["1"]], [["1", "1", "1"]], [["_"]]])
+    assert [result.tapes for result in results] == [[["0", "1", "0"]], [["0", "1", "1", "1", "0"]], [["0", "0"]]]
+    assert [result.steps for result in results] == [4, 6, 2]
+    assert all(result.finished for result in results)
+
+    bounded = load_from_string("[tape]\nalphabet = [0, 1, _]\nT.0 = [1]\n" + program)
+    assert bounded is not None
+    results = BatchExecutor(bounded.program).run([[["_", "1", "1"]], [["1", "1"]]], max_steps=2)
+    assert results[0].state == "go_right"
+    assert results[0].finished is False
+    assert results[0].error is None
+    assert results[1].error == "Tape head moved out of bounds (less than 0)"
+    assert results[1].steps == 1
+
+def test_failed_machines_do_not_stop_the_batch(monkeypatch):
+    config = load_from_string("[tape]\nalphabet = [0, 1, _]\nblank = _\nT.0 = [1]\n" + GROW_PROGRAM)
+    assert config is not None
+    # the state fails on the "0" values (as the state without the matching branch)
+    state = config.program.get_state("go_left")
+    execute = state.execute
+    zero = config.symbols.encode("0")
+    monkeypatch.setattr(state, "execute", lambda tape_values: None if tape_values[0] == zero else execute(tape_values))
+    results = BatchExecutor(config.program, config.blank).run([[["1"]], [["0", "1"]], [["1", "1"]]])
+    assert [(result.state, result.steps, result.finished, result.error) for result in results] == \
+        [("done", 4, True, None), ("go_left", 0, False, "Failed when running state go_left"), ("done", 5, True, None)]
+    assert results[2].tapes == [["0", "1", "1", "0"]]
+
+def test_tape_size_limit_stops_only_the_affected_machines():
+    config = load_from_string("[tape]\nalphabet = [0, 1, _]\nblank = _\nT.0 = [1]\n" + GROW_PROGRAM)
+    assert config is not None
+    tape_sets = [[["1"] * size] for size in (1, 3, 62, 63, 100)]
+    for max_tape_size in (2, 3, 65, 66, 200):
+        for executor, budget in [(BatchExecutor(config.program, config.blank, max_tape_size), None),
+                                 (BatchExecutor(config.program, config.blank), ResourceBudget(max_tape_cells=max_tape_size))]:
+            results = executor.run(tape_sets, budget=budget)
+            for tapes, result in zip(tape_sets, results):
+                # the same cells are allocated as by the interpreter
+                config.tapes = tapes
+                exhausted = None
+                error = None
+                try:
+                    machine = create_machine(config, max_tape_size=max_tape_size)
+                    machine.run_auto()
+                except TapeLimitError:
+                    exhausted = BudgetLimit.TAPE_CELLS.value
+                except Exception as e:
+                    error = f"{e}"
+                assert (result.error, result.exhausted) == (error, exhausted)
+                if error is None:
+                    assert (result.state, result.steps, result.tapes, result.positions) == \
+                        (machine.state, machine.steps, machine.get_tapes_content(), machine.get_tape_positions())
+                    assert result.finished == (exhausted is None)
+
+    results = BatchExecutor(config.program, config.blank).run(tape_sets, budget=ResourceBudget(max_steps=4))
+    assert [result.exhausted for result in results] == [None, "steps", "steps", "steps", "steps"]
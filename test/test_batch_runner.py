@@ -0,0 +1,55 @@
+import io
+import json
+import os
+from src.config.config import load_from_file, read_config_file
+from src.turing_machine.ast_turing_machine import ASTTuringMachine
+from src.turing_machine.batch_runner import run_batch
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+def search_input(text: str, pattern: str, max_steps: int | None = None) -> str:
+    batch_input = {"tapes": [["^"] + list(text) + ["$"], ["^"] + list(pattern) + ["$"], ["^", "0", "0", "0", "$"]]}
+    if max_steps is not None:
+        batch_input["max_steps"] = max_steps
+    return json.dumps(batch_input)
+
+def test_batch_runner_results_in_input_order():
+    config_source = read_config_file(CONFIG_PATH)
+    assert config_source is not None
+    texts = ["abc_test", "tes_tes", "", "test", "xtestx", "aaaaaaaaaa_test"]
+    lines = [search_input(text, "test") for text in texts] + ["", search_input("abc", "a", max_steps=3), "[]"]
+
+    output = io.StringIO()
+    count = run_batch(config_source, lines, output, ordered=True, workers=2, chunk_size=2)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert count == 8
+    assert [result["line"] for result in results] == [1, 2, 3, 4, 5, 6, 8, 9]
+
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    for text, result in zip(texts, results):
+        config.tapes = json.loads(search_input(text, "test"))["tapes"]
+        machine = ASTTuringMachine(config)
+        machine.run_auto()
+        assert result["state"] == machine.state
+        assert result["steps"] == machine.steps
+        assert result["tapes"] == machine.get_tapes_content()
+        assert result["finished"]
+
+    assert results[6]["steps"] == 3
+    assert not results[6]["finished"]
+    assert results[7]["error"].startswith("Invalid input")
+
+def test_batch_runner_unordered():
+    config_source = read_config_file(CONFIG_PATH)
+    assert config_source is not None
+    lines = [search_input("abc_test" * (i % 5), "test") for i in range(50)]
+
+    output = io.StringIO()
+    count = run_batch(config_source, lines, output, ordered=False, workers=2, chunk_size=3)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert count == 50
+    assert sorted(result["line"] for result in results) == list(range(1, 51))
+    assert all(result["finished"] for result in results)
@@ -0,0 +1,60 @@
+import io
+import json
+import pytest
+from dataclasses import replace
+from src.benchmark.runner import compare, load_baseline, run_case, run_suite, write_report
+from src.benchmark.workloads import busy_beaver_workload, copy_workload, counter_workload, generated_workload, get_suite, search_workload
+from src.config.config import load_from_string
+from src.turing_machine.engines import ENGINES, create_machine
+
+def run(workload, engine: str):
+    config = load_from_string(workload.source, use_cache=False)
+    assert config is not None
+    machine = create_machine(config, engine, accelerate_sweeps=False)
+    finished = machine.run_auto(workload.max_steps)
+    return finished, machine
+
+def test_workloads():
+    for engine in ENGINES:
+        for states, steps in [(2, 6), (3, 21), (4, 107)]:
+            finished, machine = run(busy_beaver_workload(states), engine)
+            assert (finished, machine.state, machine.steps) == (True, "halt", steps)
+        finished, machine = run(search_workload(300), engine)
+        assert (finished, machine.state, machine.get_tapes_content()[2]) == (True, "ok_found", ["^", "2", "9", "6", "$"])
+        finished, machine = run(counter_workload(6), engine)
+        assert (finished, machine.state, machine.get_tapes_content()[0]) == (True, "done", ["0"] * 6)
+        finished, machine = run(copy_workload(5, 50), engine)
+        assert finished and machine.state == "done"
+        assert all(content == machine.get_tapes_content()[0] for content in machine.get_tapes_content())
+        finished, machine = run(generated_workload(200, 5000), engine)
+        assert (finished, machine.steps) == (False, 5000)
+    with pytest.raises(Exception):
+        get_suite("huge")
+
+def test_results_and_baseline():
+    workloads = [counter_workload(6), busy_beaver_workload(5, 2000)]
+    results = run_suite(workloads, list(ENGINES), repeat=2, isolate=False)
+    assert [(result.workload, result.engine) for result in results] == [(workload.get_key(), engine) for workload in workloads for engine in ENGINES]
+    assert all(len(result.run_times) == 2 and result.steps_per_second > 0 and result.first_step_time >= result.load_time for result in results)
+    assert results[-1].steps == 2000 and not results[-1].finished
+    # the counter overflows to the blank cell on the left of the 6 bits
+    assert results[0].tape_cells == 7 and results[0].tape_bytes >= 16
+
+    output = io.StringIO()
+    write_report(output, "test", 2, results)
+    baseline = load_baseline(io.StringIO(output.getvalue()))
+    assert len(baseline["results"]) == len(results)
+    slower = [replace(result, steps_per_second=result.steps_per_second / 2) for result in results[1:]]
+    comparisons = compare(slower, baseline, threshold=0.1)
+    assert len(comparisons) == len(results) - 1
+    assert all(comparison.regression and comparison.ratio == pytest.approx(0.5) for comparison in comparisons)
+    assert not any(comparison.regression for comparison in compare(results, baseline))
+
+    with pytest.raises(Exception):
+        load_baseline(io.StringIO(json.dumps({"version": 0})))
+    with pytest.raises(Exception):
+        run_case(counter_workload(4), "interpreter", repeat=0)
+
+def test_isolated_case():
+    result = run_suite([counter_workload(4)], ["codegen"], repeat=1)[0]
+    assert (result.finished, result.state, result.steps) == (True, "done", 62)
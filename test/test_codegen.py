@@ -0,0 +1,141 @@
+import os
+import random
+import pytest
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.ast_turing_machine import ASTTuringMachine
+from src.turing_machine.codegen_turing_machine import CodegenTuringMachine, compile_program
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+def run_machine(machine: ASTTuringMachine, max_steps: int | None = None) -> tuple:
+    error = None
+    finished = None
+    try:
+        finished = machine.run_auto(max_steps)
+    except Exception as e:
+        error = f"{e}"
+    return (machine.state, machine.steps, machine.get_tapes_content(), machine.get_tape_positions(), finished, error)
+
+def test_codegen_matches_interpreter():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+
+    rng = random.Random(42)
+    for _ in range(100):
+        text = [rng.choice("abt_e") for _ in range(rng.randint(0, 30))]
+        pattern = [rng.choice("abte") for _ in range(rng.randint(1, 3))]
+        config.tapes = [["^"] + text + ["$"], ["^"] + pattern + ["$"], ["^", "0", "0", "0", "$"]]
+        assert run_machine(ASTTuringMachine(config)) == run_machine(CodegenTuringMachine(config))
+        assert run_machine(ASTTuringMachine(config), 7) == run_machine(CodegenTuringMachine(config), 7)
+
+def test_codegen_conditions_and_errors():
+    config = load_from_string(r'''
+[tape]
+alphabet = [0, 1, 2]
+T.0 = [0, 1, 2, 1, 0, 2, 2, 1]
+T.1 = [1, 1, 0, 2, 2, 1, 0, 0]
+
+[program]
+START s0
+END [s1]
+s0 {
+    IF (T.0 == "1" && (T.1 == "0" || T.0 == "0" && T.1 == "1") || T.0 == "2") THEN {
+        GOTO s0 {
+            T.0: [T.1, MOV_R],
+            T.1: ["2", MOV_R],
+        }
+    } ELIF (T.0 != T.1) THEN {
+        IF (T.1 == "2") THEN {
+            GOTO s1 {}
+        } ELSE {
+            GOTO s0 {
+                T.1: [T.0, MOV_R],
+                T.0: ["1", MOV_R],
+            }
+        }
+    } ELSE {
+        GOTO s0 {
+            T.0: [T.0, MOV_R],
+            T.1: [T.1, MOV_R],
+        }
+    }
+}
+s1 {}
+''')
+    assert config is not None
+    assert "if" in compile_program(config.program).source
+
+    rng = random.Random(7)
+    for _ in range(200):
+        config.tapes = [[rng.choice("012") for _ in range(8)] for _ in range(2)]
+        assert run_machine(ASTTuringMachine(config)) == run_machine(CodegenTuringMachine(config))
+
+def test_codegen_growable_tapes():
+    config = load_from_string(r'''
+[tape]
+alphabet = [0, 1, _]
+blank = _
+T.0 = [1, 1]
+
+[program]
+START go_left
+END done
+go_left {
+    IF (T.0 == "_") THEN {
+        GOTO go_right { T.0: ["0", MOV_R] }
+    } ELSE {
+        GOTO go_left { T.0: [T.0, MOV_L] }
+    }
+}
+go_right {
+    IF (T.0 == "_") THEN {
+        GOTO done { T.0: ["0", MOV_L] }
+    } ELSE {
+        GOTO go_right { T.0: [T.0, MOV_R] }
+    }
+}
+done {}
+''')
+    assert config is not None
+
+    machine = CodegenTuringMachine(config)
+    assert run_machine(machine) == run_machine(ASTTuringMachine(config))
+    assert machine.get_tapes_content() == [["0", "1", "1", "0"]]
+
+    bounded = CodegenTuringMachine(config, max_tape_size=3)
+    with pytest.raises(Exception, match="maximum tape size"):
+        bounded.run_auto()
+    assert run_machine(CodegenTuringMachine(config, max_tape_size=3)) == run_machine(ASTTuringMachine(config, max_tape_size=3))
+
+# writes back the values already in the cells (init is fused with the first step of scan), then stops at "b"
+REWRITE_CONFIG = r'''
+[tape]
+alphabet = [a, b]
+T.0 = TAPE
+
+[program]
+START init
+END [done]
+init {
+    GOTO scan { T.0: ["a", STAY] }
+}
+scan {
+    IF (T.0 == "a") THEN {
+        GOTO scan { T.0: ["a", MOV_R] }
+    } ELSE {
+        GOTO done { T.0: ["b", STAY] }
+    }
+}
+done {}
+'''
+
+def test_codegen_runs_read_only_mapped_tapes(tmp_path):
+    path = os.path.join(tmp_path, "input.txt")
+    with open(path, "wb") as f:
+        f.write(b"aaab")
+    config = load_from_string(REWRITE_CONFIG.replace("TAPE", f'bytes("{path}", read)'))
+    assert config is not None
+    for accelerate_sweeps in (True, False):
+        expected = run_machine(ASTTuringMachine(config, accelerate_sweeps=accelerate_sweeps))
+        assert expected[4] is True and expected[2] == [["a", "a", "a", "b"]]
+        assert run_machine(CodegenTuringMachine(config, accelerate_sweeps=accelerate_sweeps)) == expected
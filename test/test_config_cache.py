@@ -0,0 +1,68 @@
+import os
+from src.config.config import load_from_file, load_from_string, read_config_file
+from src.config.config_cache import CACHE_FILE_EXTENSION, ConfigCache, get_source_hash
+from src.turing_machine.engines import ENGINES, create_machine
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+def test_disk_cache_round_trip(tmp_path):
+    source = read_config_file(CONFIG_PATH)
+    assert source is not None
+    config = load_from_string(source, use_cache=False)
+    assert config is not None
+    ConfigCache(str(tmp_path)).store(source, config)
+    assert os.path.exists(os.path.join(tmp_path, get_source_hash(source) + CACHE_FILE_EXTENSION))
+
+    # new cache (empty in-process LRU), so the config is read from the disk
+    cache = ConfigCache(str(tmp_path))
+    cached_config = cache.load(source)
+    assert cached_config is not None
+    assert cache.disk_hits == 1
+    assert cached_config.alphabet == config.alphabet
+    assert cached_config.tapes == config.tapes
+    assert cached_config.blank == config.blank
+    assert list(cached_config.program.nodes.keys()) == list(config.program.nodes.keys())
+    for engine in ENGINES:
+        machine = create_machine(cached_config, engine)
+        assert machine.run_auto()
+        assert machine.state == "ok_found"
+        assert machine.get_tape_positions() == [28, 5, 3]
+        assert machine.get_tapes_content()[2] == ["^", "0", "2", "3", "$"]
+
+def test_memory_cache_returns_copies(tmp_path):
+    source = read_config_file(CONFIG_PATH)
+    cache = ConfigCache(str(tmp_path), memory_size=1)
+    config = load_from_string(source, use_cache=False)
+    cache.store(source, config)
+    first = cache.load(source)
+    first.tapes[0].append("x")
+    second = cache.load(source)
+    assert cache.memory_hits == 2
+    assert second.tapes == config.tapes
+    assert second.program is first.program
+
+def test_invalid_entries_are_ignored(tmp_path):
+    source = read_config_file(CONFIG_PATH)
+    cache = ConfigCache(str(tmp_path), memory_size=0)
+    assert cache.load(source) is None
+    cache.store(source, load_from_string(source, use_cache=False))
+    path = cache.get_path(get_source_hash(source))
+    with open(path, "r+b") as f:
+        f.seek(20)
+        f.write(b"\xff" * 64)
+    assert cache.load(source) is None
+    with open(path, "wb") as f:
+        f.write(b"not a cache entry")
+    assert cache.load(source) is None
+    # entry stored for the different source
+    os.replace(path, cache.get_path(get_source_hash(source + " ")))
+    assert cache.load(source + " ") is None
+    assert cache.misses == 4
+
+    cache.clear()
+    assert os.listdir(tmp_path) == []
+
+def test_load_without_cache():
+    config = load_from_file(CONFIG_PATH, use_cache=False)
+    assert config is not None
+    assert load_from_string("[tape]\nalphabet = [a]\n", use_cache=False) is None
@@ -0,0 +1,155 @@
+import os
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.cycle_detection import ConfigurationHash, get_configuration
+from src.turing_machine.engines import ENGINES, create_machine
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+# moves right over the 'a' values, then bounces between the last two cells (flipping the last value)
+BOUNCE_CONFIG = r'''
+[tape]
+alphabet = [a, b, c, _]
+T.0 = [a, a, a, a, a, b, c]
+T.1 = [a]
+
+[program]
+START right
+END [done]
+right {
+    IF (T.0 == "a") THEN {
+        GOTO right { T.0: ["b", MOV_R] }
+    } ELIF (T.0 == "_") THEN {
+        GOTO done {}
+    } ELSE {
+        GOTO bounce { T.0: [T.0, MOV_R] }
+    }
+}
+bounce {
+    IF (T.0 == "c") THEN {
+        GOTO bounce_back { T.0: ["b", MOV_L] }
+    } ELSE {
+        GOTO bounce_back { T.0: ["c", MOV_L] }
+    }
+}
+bounce_back {
+    GOTO bounce { T.0: [T.0, MOV_R] }
+}
+done {}
+'''
+
+# moves right forever over the blank cells, the configuration never repeats
+RUNAWAY_CONFIG = r'''
+[tape]
+alphabet = [a, _]
+T.0 = [a]
+blank = _
+
+[program]
+START run
+END [done]
+run {
+    GOTO run { T.0: ["a", MOV_R] }
+}
+done {}
+'''
+
+def find_cycle_naive(machine, max_steps: int) -> tuple | None:
+    seen = {get_configuration(machine): machine.steps}
+    while machine.steps < max_steps and machine.state not in machine.final_states:
+        machine.step()
+        configuration = get_configuration(machine)
+        if configuration in seen:
+            return (machine.steps - seen[configuration], seen[configuration])
+        seen[configuration] = machine.steps
+    return None
+
+def test_detects_cycle_length_and_start():
+    config = load_from_string(BOUNCE_CONFIG)
+    assert config is not None
+
+    for prefix in range(0, 40, 7):
+        config.tapes = [["a"] * prefix + ["b", "c"], ["a"]]
+        expected = find_cycle_naive(create_machine(config, accelerate_sweeps=False), 1000)
+        assert expected is not None
+        for engine in ENGINES:
+            machine = create_machine(config, engine)
+            assert not machine.run_auto(detect_cycles=True)
+            assert machine.cycle is not None
+            assert (machine.cycle.length, machine.cycle.start_step) == expected
+            assert machine.cycle.detected_step == machine.steps
+            assert machine.cycle.start_step == prefix + 1
+
+def test_detects_cycle_on_growable_tapes():
+    config = load_from_string(BOUNCE_CONFIG.replace("T.1 = [a]", "T.1 = [a]\nblank = _"))
+    assert config is not None
+    config.tapes = [["a"] * 5 + ["c"], ["a"]]
+    expected = find_cycle_naive(create_machine(config), 1000)
+    assert expected is not None
+
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert not machine.run_auto(detect_cycles=True)
+        assert machine.cycle is not None
+        assert (machine.cycle.length, machine.cycle.start_step) == expected
+
+def test_terminating_and_runaway_programs():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert machine.run_auto(detect_cycles=True)
+        assert machine.cycle is None
+        assert machine.state == "ok_found"
+
+    config = load_from_string(RUNAWAY_CONFIG)
+    assert config is not None
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert not machine.run_auto(5000, detect_cycles=True)
+        assert machine.cycle is None
+        assert machine.steps == 5000
+
+def test_hash_collisions_are_not_reported(monkeypatch):
+    config = load_from_string(BOUNCE_CONFIG)
+    assert config is not None
+    config.tapes = [["a"] * 20 + ["b", "c"], ["a"]]
+    expected = find_cycle_naive(create_machine(config), 1000)
+
+    # every configuration has the same hash, the match must be confirmed with the full comparison
+    monkeypatch.setattr(ConfigurationHash, "get_hash", lambda self, state, positions: 0)
+    machine = create_machine(config)
+    assert not machine.run_auto(detect_cycles=True)
+    assert machine.cycle is not None
+    assert (machine.cycle.length, machine.cycle.start_step) == expected
+
+def test_configuration_hash_is_incremental():
+    config = load_from_string(BOUNCE_CONFIG.replace("T.1 = [a]", "T.1 = [a]\nblank = _"))
+    assert config is not None
+    config.tapes = [["a"] * 3 + ["c"], ["a"]]
+    machine = create_machine(config)
+    incremental = ConfigurationHash(machine)
+    for _ in range(30):
+        positions = machine.get_tape_positions()
+        values = machine.get_tapes_values()
+        machine.step()
+        for tape_id, (tape, position, value) in enumerate(zip(machine.tapes, positions, values)):
+            incremental.update_cell(tape_id, position, value, tape.cells[tape.origin + position])
+        assert incremental.get_hash(machine.state, machine.get_tape_positions()) == \
+            ConfigurationHash(machine).get_hash(machine.state, machine.get_tape_positions())
+
+def test_configuration_hash_skips_blank_cells(monkeypatch):
+    config = load_from_string(RUNAWAY_CONFIG)
+    assert config is not None
+    machine = create_machine(config)
+    expected = ConfigurationHash(machine).get_hash(machine.state, machine.get_tape_positions())
+    # the tape grown with the blank cells in both directions
+    tape = machine.tapes[0]
+    blank = config.symbols.encode("_")
+    tape.cells = config.symbols.fill_cells(blank, 1000) + tape.cells + config.symbols.fill_cells(blank, 1000)
+    tape.head += 1000
+    tape.origin += 1000
+    hashed = []
+    original_cell_key = ConfigurationHash.cell_key
+    monkeypatch.setattr(ConfigurationHash, "cell_key", lambda self, tape_id, position, code: hashed.append(position) or original_cell_key(self, tape_id, position, code))
+    assert ConfigurationHash(machine).get_hash(machine.state, machine.get_tape_positions()) == expected
+    assert hashed == [0]
@@ -0,0 +1,90 @@
+import itertools
+import random
+from src.config.config import load_from_string
+from src.compiler.optimizer.decision_tree import Dispatch, compile_decision_tree, get_decision_trees
+from src.turing_machine.codegen_turing_machine import compile_program
+from src.turing_machine.engines import ENGINES, create_machine
+
+ALPHABET = ["a", "b", "c", "_"]
+
+def make_config(program: str, tapes: int = 2, alphabet: list = ALPHABET, value: str = "a") -> str:
+    tape_lines = "\n".join(f"T.{tape_id} = [{value}]" for tape_id in range(tapes))
+    return f'''
+[tape]
+alphabet = [{", ".join(alphabet)}]
+{tape_lines}
+blank = _
+
+[program]
+START s
+END [{", ".join(f"r{i}" for i in range(40))}]
+{program}
+{"".join(f"r{i} {{}}" + chr(10) for i in range(40))}
+'''
+
+def random_condition(rng: random.Random, tapes: int, depth: int = 0) -> str:
+    operands = []
+    for _ in range(rng.randint(1, 3)):
+        if depth < 2 and rng.random() < 0.2:
+            operands.append(f"({random_condition(rng, tapes, depth + 1)})")
+        else:
+            rhs = f'"{rng.choice(ALPHABET)}"' if rng.random() < 0.7 else f"T.{rng.randrange(tapes)}"
+            operands.append(f"T.{rng.randrange(tapes)} {rng.choice(['==', '!='])} {rhs}")
+    result = operands[0]
+    for operand in operands[1:]:
+        result += f" {rng.choice(['&&', '||'])} {operand}"
+    return result
+
+def random_block(rng: random.Random, tapes: int, depth: int = 0) -> str:
+    if depth >= 2 or rng.random() < 0.3:
+        return f"GOTO r{rng.randrange(40)} {{ T.0: [\"{rng.choice(ALPHABET)}\", MOV_R] }}"
+    lines = [f"IF ({random_condition(rng, tapes)}) THEN {{", random_block(rng, tapes, depth + 1)]
+    for _ in range(rng.randint(0, 3)):
+        lines += [f"}} ELIF ({random_condition(rng, tapes)}) THEN {{", random_block(rng, tapes, depth + 1)]
+    lines += ["} ELSE {", random_block(rng, tapes, depth + 1), "}"]
+    return "\n".join(lines)
+
+def test_decision_trees_match_state_execution():
+    rng = random.Random(17)
+    for _ in range(200):
+        tapes = rng.randint(1, 3)
+        config = load_from_string(make_config(f"s {{\n{random_block(rng, tapes)}\n}}", tapes), use_cache=False)
+        assert config is not None
+        state = config.program.nodes["s"]
+        tree = compile_decision_tree(state)
+        assert tree is not None
+        codes = [config.symbols.encode(value) for value in ALPHABET]
+        for values in itertools.product(codes, repeat=tapes):
+            assert tree.execute(list(values)) is state.execute(list(values))
+
+        for engine in ENGINES:
+            machine = create_machine(config, engine)
+            assert machine.run_auto()
+            expected = state.execute([config.symbols.encode("a")] * tapes)
+            assert machine.state == expected.new_state
+
+def test_equality_ladder_is_single_dispatch():
+    alphabet = [f"s{i}" for i in range(30)]
+    branches = [f'IF (T.0 == "{alphabet[0]}") THEN {{\nGOTO r0 {{}}\n}}']
+    branches += [f'ELIF (T.0 == "{value}") THEN {{\nGOTO r{i} {{}}\n}}' for i, value in enumerate(alphabet) if i > 0]
+    branches.append("ELSE {\nGOTO r39 {}\n}")
+    config = load_from_string(make_config("s {\n" + "\n".join(branches) + "\n}", 1, ALPHABET + alphabet, "s17"), use_cache=False)
+    assert config is not None
+
+    tree = get_decision_trees(config.program)["s"]
+    assert isinstance(tree.root, Dispatch)
+    assert len(tree.root.branches) == 30
+    assert tree.root.default.new_state == "r39"
+    assert "state_0_table_0.get(v0, " in compile_program(config.program).source
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert machine.run_auto()
+        assert machine.state == "r17"
+
+def test_large_states_are_not_compiled():
+    conditions = " || ".join(f'T.0 == "{value}"' for value in ALPHABET)
+    config = load_from_string(make_config(f"s {{\nIF ({conditions}) THEN {{\nGOTO r1 {{}}\n}} ELSE {{\nGOTO r2 {{}}\n}}\n}}"), use_cache=False)
+    state = config.program.nodes["s"]
+    assert compile_decision_tree(state) is not None
+    assert compile_decision_tree(state, max_comparisons=3) is None
+    assert compile_decision_tree(state, max_nodes=0) is None
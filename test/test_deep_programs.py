@@ -0,0 +1,82 @@
+import sys
+from src.config.config import load_from_string
+from src.config.config_cache import ConfigCache
+from src.turing_machine.engines import ENGINES, create_machine
+
+DEPTH = 10 ** 4
+
+def make_config(program: str) -> str:
+    return f'''
+[tape]
+alphabet = [a, b, c, _]
+T.0 = [a]
+T.1 = [b]
+blank = _
+
+[program]
+START s
+END [yes, no]
+{program}
+yes {{}}
+no {{}}
+'''
+
+def make_condition_config(condition: str) -> str:
+    return make_config(f's {{\n    IF ({condition}) THEN {{\n        GOTO yes {{}}\n    }} ELSE {{\n        GOTO no {{}}\n    }}\n}}')
+
+def run(source: str) -> list:
+    config = load_from_string(source, use_cache=False)
+    assert config is not None
+    states = []
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert machine.run_auto()
+        states.append(machine.state)
+    return states
+
+def test_long_condition_chains():
+    assert sys.getrecursionlimit() < DEPTH
+    assert run(make_condition_config(" || ".join(['T.0 == "b"'] * DEPTH + ['T.1 == "b"']))) == ["yes", "yes"]
+    assert run(make_condition_config(" || ".join(['T.0 == "b"'] * DEPTH))) == ["no", "no"]
+    assert run(make_condition_config(" && ".join(['T.0 == "a"', 'T.1 != "a"'] * (DEPTH // 2)))) == ["yes", "yes"]
+    assert run(make_condition_config(" && ".join(['T.0 == "a"'] * DEPTH + ['T.1 == "c"']))) == ["no", "no"]
+    # each of the AND groups falls back to the following alternative
+    assert run(make_condition_config(" || ".join(['(T.0 == "a" && T.1 == "c")'] * DEPTH + ['T.1 == T.1']))) == ["yes", "yes"]
+
+def test_nested_condition_groups():
+    condition = "(" * DEPTH + 'T.0 == "b" || T.1 == "b"' + ")" * DEPTH
+    assert run(make_condition_config(condition)) == ["yes", "yes"]
+    condition = " && ".join(["(" * 100 + 'T.0 == "a" || T.0 == "c"' + ")" * 100] * 100)
+    assert run(make_condition_config(condition)) == ["yes", "yes"]
+
+def test_deeply_nested_statements(tmp_path):
+    program = ["s {"]
+    program += ['IF (T.0 == "a") THEN {'] * DEPTH
+    program.append("GOTO yes { T.1: [\"c\", MOV_R] }")
+    program += ["} ELSE {\nGOTO no {}\n}"] * DEPTH
+    program.append("}")
+    source = make_config("\n".join(program))
+    assert run(source) == ["yes", "yes"]
+
+    # the program tree is stored and loaded without the recursion
+    cache = ConfigCache(str(tmp_path), memory_size=0)
+    cache.store(source, load_from_string(source, use_cache=False))
+    config = cache.load(source)
+    assert config is not None
+    machine = create_machine(config)
+    assert machine.run_auto()
+    assert machine.get_tapes_content() == [["a"], ["c"]]
+    assert machine.get_tape_positions() == [0, 1]
+
+def test_long_elif_ladders():
+    program = ["s {", 'IF (T.0 == "b") THEN {\nGOTO no {}\n}']
+    program += ['ELIF (T.1 == "a") THEN {\nGOTO no {}\n}'] * DEPTH
+    program.append('ELIF (T.1 == "b") THEN {\nGOTO yes {}\n} ELSE {\nGOTO no {}\n}')
+    program.append("}")
+    assert run(make_config("\n".join(program))) == ["yes", "yes"]
+
+def test_unclosed_nested_section(capsys):
+    # the end of the program inside of the innermost section
+    source = make_config("s {\n" + 'IF (T.0 == "a") THEN {\n' * DEPTH + "GOTO yes {}").rsplit("\nyes {}", 1)[0]
+    assert load_from_string(source, use_cache=False) is None
+    assert "Expected } tag, for the section opened at line" in capsys.readouterr().out
@@ -0,0 +1,109 @@
+import random
+from src.config.config import load_from_string
+from src.compiler.optimizer.goto_fusion import MAX_FUSED_STEPS, FusedTransition, get_fused_transitions
+from src.turing_machine.engines import ENGINES, create_machine
+
+# init and glue are the lone GOTO statements, mark writes the value checked by check (check always goes to the ELSE branch)
+FUSION_CONFIG = r'''
+[tape]
+alphabet = [a, b, x, _]
+T.0 = [a, b, a, a, b]
+T.1 = [_]
+blank = _
+
+[program]
+START init
+END [done]
+init {
+    GOTO glue {}
+}
+glue {
+    GOTO mark { T.1: [T.0, STAY] }
+}
+mark {
+    IF (T.0 == "_") THEN {
+        GOTO done {}
+    } ELSE {
+        GOTO check { T.0: ["x", STAY] }
+    }
+}
+check {
+    IF (T.0 == "x") THEN {
+        GOTO mark {
+            T.0: [T.0, MOV_R],
+            T.1: [T.1, MOV_R],
+        }
+    } ELSE {
+        GOTO done {}
+    }
+}
+done {}
+'''
+
+def run_machine(machine, max_steps: int | None = None) -> tuple:
+    error = None
+    finished = None
+    try:
+        finished = machine.run_auto(max_steps)
+    except Exception as e:
+        error = f"{e}"
+    return (machine.state, machine.steps, machine.get_tapes_content(), machine.get_tape_positions(), finished, error)
+
+def test_find_fused_transitions():
+    config = load_from_string(FUSION_CONFIG, use_cache=False)
+    fused = get_fused_transitions(config.program)
+    assert sorted(fused) == ["init", "mark"]
+    # init -> glue -> mark (the value of T.0 in mark is not known)
+    assert list(fused["init"].values()) == [FusedTransition(2, "mark", [(0, 0)], [(1, 0, None, 0)], [0, 0], [(0, 0), (0, 0)])]
+    # mark -> check -> mark: "x" is written to T.0, then both heads move right
+    x = config.symbols.encode("x")
+    assert list(fused["mark"].values()) == [FusedTransition(2, "mark", [], [(0, 0, x, None)], [1, 1], [(0, 1), (0, 1)])]
+
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert machine.run_auto() and (machine.state, machine.steps) == ("done", 13)
+        assert machine.get_tapes_content() == [["x"] * 5, ["a"]]
+        # the first and the last loop are executed step by step (T.1 grows, T.0 ends)
+        if engine == "interpreter":
+            assert machine.fusion.fused_steps == 8
+
+def test_lone_goto_loop_is_fused_in_parts():
+    source = "[tape]\nalphabet = [0, 1]\nT.0 = [0]\n\n[program]\nSTART a\nEND [done]\na { GOTO b {} }\nb { GOTO a {} }\ndone {}\n"
+    # a and b are not merged by the minimization
+    config = load_from_string(source, use_cache=False, minimize=False)
+    fused = get_fused_transitions(config.program)
+    assert [transition.steps for transition in fused["a"].values()] == [MAX_FUSED_STEPS]
+    for engine in ENGINES:
+        for max_steps in (1, MAX_FUSED_STEPS - 1, 1000):
+            machine = create_machine(config, engine)
+            assert not machine.run_auto(max_steps) and machine.steps == max_steps
+            assert machine.state == ("a" if max_steps % 2 == 0 else "b")
+
+VALUES = ['"0"', '"1"', '"_"', "T.0", "T.1"]
+
+def test_fusion_matches_step_by_step_execution():
+    rng = random.Random(3)
+    fused_count = 0
+    for _ in range(60):
+        # the written constants are often checked by the next state, and the lone GOTO statements are frequent
+        count = rng.randrange(2, 8)
+        states = []
+        for no in range(count):
+            if rng.random() < 0.3:
+                states.append(f"s{no} {{ GOTO s{rng.randrange(count)} {{ T.1: [T.0, {rng.choice(['MOV_L', 'MOV_R', 'STAY'])}] }} }}")
+                continue
+            branches = []
+            for keyword, value in [("IF", "0"), ("} ELIF", "1")]:
+                target = rng.choice(["halt"] + [f"s{rng.randrange(count)}"] * 4)
+                writes = ", ".join(f"T.{tape_id}: [{rng.choice(VALUES)}, {rng.choice(['MOV_L', 'MOV_R', 'STAY', 'STAY'])}]" for tape_id in range(2))
+                branches.append(f'    {keyword} (T.{rng.randrange(2)} == "{value}") THEN {{\n        GOTO {target} {{ {writes} }}')
+            states.append(f"s{no} {{\n" + "\n".join(branches) + f"\n    }} ELSE {{\n        GOTO s{rng.randrange(count)} {{ T.0: [\"1\", STAY] }}\n    }}\n}}")
+        for blank in ("blank = _\n", ""):
+            source = f"[tape]\nalphabet = [0, 1, _]\nT.0 = [0, 1, _, 1]\nT.1 = [1, 0]\n{blank}\n[program]\nSTART s0\nEND [halt]\n" + "\n".join(states) + "\nhalt {}\n"
+            config = load_from_string(source, use_cache=False)
+            fused_count += sum(len(fused) for fused in get_fused_transitions(config.program).values())
+            for engine in ENGINES:
+                for max_steps in (3, 100, 500):
+                    expected = run_machine(create_machine(config, engine, accelerate_sweeps=False, max_tape_size=200), max_steps)
+                    assert run_machine(create_machine(config, engine, max_tape_size=200), max_steps) == expected
+    assert fused_count > 0
@@ -0,0 +1,135 @@
+import json
+import os
+import time
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.batch_runner import run_input
+from src.turing_machine.engines import ENGINES, create_machine
+from src.turing_machine.governor import BudgetLimit, ResourceBudget
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+# moves right forever, writing the values (the growable tape grows on every step)
+RUNAWAY_CONFIG = r'''
+[tape]
+alphabet = [a, _]
+T.0 = [a]
+blank = _
+
+[program]
+START run
+END [done]
+run {
+    GOTO run { T.0: ["a", MOV_R] }
+}
+done {}
+'''
+
+# moves back and forth between the two cells forever
+PING_PONG_CONFIG = r'''
+[tape]
+alphabet = [a, b]
+T.0 = [a, b]
+
+[program]
+START right
+END [done]
+right {
+    GOTO left { T.0: [T.0, MOV_R] }
+}
+left {
+    GOTO right { T.0: [T.0, MOV_L] }
+}
+done {}
+'''
+
+def test_finished_run():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        result = machine.run_governed(ResourceBudget(max_steps=100000, timeout=60, max_tape_cells=1000, check_interval=10))
+        assert result.finished
+        assert result.exhausted is None
+        assert result.state == "ok_found"
+        assert result.positions == [28, 5, 3]
+        assert result.tapes[2] == ["^", "0", "2", "3", "$"]
+
+def test_steps_budget():
+    config = load_from_string(RUNAWAY_CONFIG)
+    assert config is not None
+    for engine in ENGINES:
+        for check_interval in (7, 4096):
+            machine = create_machine(config, engine)
+            result = machine.run_governed(ResourceBudget(max_steps=1000, timeout=60, check_interval=check_interval))
+            assert not result.finished
+            assert result.exhausted == BudgetLimit.STEPS
+            assert result.steps == 1000
+            assert result.state == "run"
+            assert result.positions == [1000]
+            assert result.tapes == [["a"] * 1000]
+
+def test_deadline_budget():
+    config = load_from_string(PING_PONG_CONFIG)
+    assert config is not None
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        start = time.monotonic()
+        result = machine.run_governed(ResourceBudget(timeout=0.05))
+        assert time.monotonic() - start < 5
+        assert not result.finished
+        assert result.exhausted == BudgetLimit.DEADLINE
+        assert result.steps > 0
+        assert result.tapes == [["a", "b"]]
+
+def test_tape_cells_budget():
+    config = load_from_string(RUNAWAY_CONFIG)
+    assert config is not None
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        result = machine.run_governed(ResourceBudget(max_tape_cells=500))
+        assert not result.finished
+        assert result.exhausted == BudgetLimit.TAPE_CELLS
+        assert len(machine.tapes[0].cells) <= 500
+        assert result.steps == 500
+        # the limit is applied only during the governed run
+        assert machine.tapes[0].max_size is None
+
+def test_cycle_detection_between_chunks():
+    config = load_from_string(PING_PONG_CONFIG)
+    assert config is not None
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        result = machine.run_governed(ResourceBudget(timeout=60, check_interval=1), detect_cycles=True)
+        assert not result.finished
+        assert result.exhausted is None
+        assert result.cycle is not None
+        assert (result.cycle.length, result.cycle.start_step) == (2, 0)
+
+def test_batch_input_budget():
+    config = load_from_string(RUNAWAY_CONFIG)
+    assert config is not None
+    line = json.dumps({"tapes": [["a"]]})
+    result = run_input(config, line, budget=ResourceBudget(max_steps=100))
+    assert result.exhausted == "steps"
+    assert result.steps == 100
+    assert result.error is None
+
+    result = run_input(config, line, max_tape_size=200)
+    assert result.exhausted == "tape_cells"
+    assert result.error is None
+
+    result = run_input(config, json.dumps({"tapes": [["a"]], "max_steps": 10}), budget=ResourceBudget(max_steps=100))
+    assert result.steps == 10
+
+def test_result_tapes_are_decoded_lazily(monkeypatch):
+    config = load_from_string(RUNAWAY_CONFIG)
+    assert config is not None
+    machine = create_machine(config)
+    decoded = []
+    get_tapes_content = machine.get_tapes_content
+    monkeypatch.setattr(machine, "get_tapes_content", lambda: decoded.append(machine.steps) or get_tapes_content())
+    result = machine.run_governed(ResourceBudget(max_steps=10))
+    assert decoded == []
+    assert (result.state, result.steps, result.positions, result.exhausted) == ("run", 10, [10], BudgetLimit.STEPS)
+    assert result.tapes == [["a"] * 10]
+    assert decoded == [10]
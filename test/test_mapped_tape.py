@@ -0,0 +1,121 @@
+import os
+import pytest
+from array import array
+from src.config.config import load_from_string, read_config_file
+from src.compiler.tokenizer.tokenizer import TapeFile
+from src.turing_machine.engines import ENGINES, create_machine
+from src.turing_machine.machine import MappedTape
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+# moves over the values to the first blank cell on the right, then back to the first blank cell on the left,
+#    and replaces "a" with "b" on the way back
+GROW_CONFIG = r'''
+[tape]
+alphabet = [a, b, _]
+T.0 = TAPE
+blank = _
+
+[program]
+START right
+END [done]
+right {
+    IF (T.0 == "_") THEN {
+        GOTO left { T.0: ["_", MOV_L] }
+    } ELSE {
+        GOTO right { T.0: [T.0, MOV_R] }
+    }
+}
+left {
+    IF (T.0 == "_") THEN {
+        GOTO done { T.0: ["b", STAY] }
+    } ELSE {
+        GOTO left { T.0: ["b", MOV_L] }
+    }
+}
+done {}
+'''
+
+def write_file(path, data: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+def read_file(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def run_machine(config, engine: str) -> tuple:
+    machine = create_machine(config, engine)
+    assert machine.run_auto()
+    return (machine.state, machine.steps, machine.get_tape_positions(), machine.get_tapes_content())
+
+def test_bytes_tape_file(tmp_path):
+    source = read_config_file(CONFIG_PATH)
+    config = load_from_string(source)
+    assert config is not None
+    path = write_file(tmp_path / "text.txt", "".join(config.tapes[0]).encode())
+    lines = [f'T.0 = bytes("{path}", read)' if line.startswith("T.0 =") else line for line in source.split("\n")]
+    mapped_config = load_from_string("\n".join(lines))
+    assert mapped_config is not None
+    assert mapped_config.tapes[0] == TapeFile(path=path, format="bytes", mode="read")
+    for engine in ENGINES:
+        machine = create_machine(mapped_config, engine)
+        assert isinstance(machine.tapes[0], MappedTape)
+        assert run_machine(mapped_config, engine) == run_machine(config, engine)
+
+def test_codes_tape_file_modes(tmp_path):
+    config = load_from_string(GROW_CONFIG.replace("TAPE", "[a, a, b]"))
+    input_path = write_file(tmp_path / "input.bin", bytes([0, 0, 1]))
+    output_path = str(tmp_path / "output.bin")
+    for engine in ENGINES:
+        expected = run_machine(config, engine)
+        copy_config = load_from_string(GROW_CONFIG.replace("TAPE", f'codes("{input_path}")'))
+        assert run_machine(copy_config, engine) == expected
+        assert read_file(input_path) == bytes([0, 0, 1])
+
+        write_config = load_from_string(GROW_CONFIG.replace("TAPE", f'codes("{input_path}", write, "{output_path}")'))
+        assert run_machine(write_config, engine) == expected
+        assert read_file(input_path) == bytes([0, 0, 1])
+        # the tape grew in both directions in the output file
+        assert read_file(output_path).strip(b"\x02") == bytes([1, 1, 1, 1])
+
+        read_config = load_from_string(GROW_CONFIG.replace("TAPE", f'codes("{input_path}", read)'))
+        with pytest.raises(Exception):
+            create_machine(read_config, engine).run_auto()
+
+def test_wide_alphabet_codes_file(tmp_path):
+    alphabet = ", ".join(f"s{i}" for i in range(300))
+    path = write_file(tmp_path / "input.bin", array("H", [0, 0, 1]).tobytes())
+    config = load_from_string(GROW_CONFIG.replace("[a, b, _]", f"[a, b, {alphabet}, _]").replace("TAPE", f'codes("{path}")'))
+    assert config is not None
+    assert config.symbols.typecode == "H"
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert machine.run_auto()
+        assert machine.get_tapes_content() == [["b", "b", "b", "b"]]
+        assert machine.tapes[0].origin > 0
+
+def test_tape_file_errors(tmp_path, capsys):
+    path = write_file(tmp_path / "input.txt", b"abc")
+    config = load_from_string(GROW_CONFIG.replace("TAPE", f'bytes("{path}")'))
+    with pytest.raises(Exception, match="Value 'c' is not defined in the alphabet"):
+        create_machine(config)
+    config = load_from_string(GROW_CONFIG.replace("TAPE", f'codes("{tmp_path / "missing.bin"}")'))
+    with pytest.raises(Exception, match="Failed to open the tape file"):
+        create_machine(config)
+
+    assert load_from_string(GROW_CONFIG.replace("TAPE", f'text("{path}")'), use_cache=False) is None
+    assert "Unknown tape file format 'text'" in capsys.readouterr().out
+    assert load_from_string(GROW_CONFIG.replace("TAPE", f'bytes("{path}", write)'), use_cache=False) is None
+    assert "Only the tape files with the symbol codes can be written" in capsys.readouterr().out
+
+def test_tape_file_config_cache(tmp_path):
+    from src.config.config_cache import ConfigCache
+    path = write_file(tmp_path / "input.bin", bytes([0, 1]))
+    source = GROW_CONFIG.replace("TAPE", f'codes("{path}", copy)')
+    cache = ConfigCache(str(tmp_path / "cache"), memory_size=0)
+    cache.store(source, load_from_string(source, use_cache=False))
+    config = cache.load(source)
+    assert config is not None
+    assert config.tapes == [TapeFile(path=path, format="codes", mode="copy")]
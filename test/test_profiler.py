@@ -0,0 +1,105 @@
+import io
+import json
+import os
+import pytest
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.engines import ENGINES, create_machine
+from src.turing_machine.governor import BudgetLimit, ResourceBudget
+from src.turing_machine.profiler import Profiler
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+# binary counter on T.0, counts up until all of the cells are 1
+COUNTER_CONFIG = r'''
+[tape]
+alphabet = [0, 1, _]
+T.0 = [0, 0, 0, 0]
+blank = _
+
+[program]
+START right
+END [done]
+right {
+    IF (T.0 == "_") THEN {
+        GOTO inc { T.0: [T.0, MOV_L] }
+    } ELSE {
+        GOTO right { T.0: [T.0, MOV_R] }
+    }
+}
+inc {
+    IF (T.0 == "1") THEN {
+        GOTO inc { T.0: ["0", MOV_L] }
+    } ELIF (T.0 == "0") THEN {
+        GOTO right { T.0: ["1", MOV_R] }
+    } ELSE {
+        GOTO done {}
+    }
+}
+done {}
+'''
+
+def profile(config, engine: str) -> Profiler:
+    machine = create_machine(config, engine)
+    profiler = Profiler(config.program)
+    assert machine.run_profiled(profiler)
+    assert profiler.steps == machine.steps
+    return profiler
+
+def test_profiles_match_in_all_engines():
+    config = load_from_file(CONFIG_PATH)
+    expected = create_machine(config)
+    expected.run_auto()
+    profiles = []
+    for engine in ENGINES:
+        profiler = profile(config, engine)
+        assert sum(profiler.counts.values()) == expected.steps
+        assert profiler.elapsed_ns >= sum(profiler.times.values()) > 0
+        profiles.append({state.name: (state.visits, [(t.line, t.count) for t in state.transitions]) for state in profiler.get_states()})
+    assert profiles[0] == profiles[1]
+
+def test_branch_and_transition_counts():
+    config = load_from_string(COUNTER_CONFIG, use_cache=False)
+    for engine in ENGINES:
+        states = {state.name: state for state in profile(config, engine).get_states()}
+        assert set(states) == {"right", "inc"}
+        inc = states["inc"]
+        # 15 increments with 15 carries, the last carry moves to the blank cell
+        assert [(transition.target, transition.count) for transition in inc.transitions] == [("inc", 15), ("right", 15), ("done", 1)]
+        assert [(str(branch), count) for branch, count in inc.branches] == [("IF (line 18)", 15), ("ELIF (line 20)", 15), ("ELSE (line 22)", 1)]
+        assert inc.branches[1][0].source == '} ELIF (T.0 == "0") THEN {'
+        assert inc.visits == 31
+        assert states["right"].visits == sum(count for _, count in states["right"].branches)
+
+def test_governed_profiled_run():
+    config = load_from_string(COUNTER_CONFIG, use_cache=False)
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        profiler = Profiler(config.program)
+        result = machine.run_governed(ResourceBudget(max_steps=50, check_interval=7), profiler=profiler)
+        assert result.exhausted == BudgetLimit.STEPS
+        assert profiler.steps == sum(profiler.counts.values()) == 50
+        # the profile is accumulated over the runs
+        assert machine.run_governed(ResourceBudget(), profiler=profiler).finished
+        assert profiler.steps == machine.steps
+        with pytest.raises(Exception):
+            machine.run_governed(ResourceBudget(), detect_cycles=True, profiler=profiler)
+
+def test_profile_output():
+    config = load_from_string(COUNTER_CONFIG, use_cache=False)
+    profiler = profile(config, "interpreter")
+    output = io.StringIO()
+    profiler.write_json(output)
+    data = json.loads(output.getvalue())
+    assert data["steps"] == profiler.steps
+    assert [state["name"] for state in data["states"]] == [state.name for state in profiler.get_states()]
+
+    output = io.StringIO()
+    profiler.write_collapsed(output, "steps")
+    lines = output.getvalue().splitlines()
+    assert "inc;IF (line 18);GOTO inc (line 19) 15" in lines
+    assert "inc;ELSE (line 22);GOTO done (line 23) 1" in lines
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profiler.steps
+    assert "Hottest transitions:" in profiler.report()
+
+    with pytest.raises(Exception):
+        create_machine(load_from_string(COUNTER_CONFIG, use_cache=False)).run_profiled(profiler)
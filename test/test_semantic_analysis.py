@@ -0,0 +1,91 @@
+import time
+from src.config.config import load_from_string
+from src.compiler.tokenizer.tokenizer import tokenize
+from src.compiler.parser.program_ast import parse_program
+from src.compiler.parser.semantic_analysis import analyze_program
+
+def parse(config: str):
+    result = tokenize(config)
+    assert result is not None
+    program = parse_program(result.program_content, len(result.tapes), result.alphabet)
+    assert program is not None
+    return program
+
+def generate_program(count: int) -> str:
+    lines = ["[tape]", "alphabet = [a, b]", "T.0 = [a, b]", "T.1 = [a]", "[program]", "START s0", f"END [s{count}]"]
+    for i in range(count):
+        lines += [
+            f"s{i} {{",
+            '    IF (T.0 == "a" && T.1 != "b" || (T.0 == T.1)) THEN {',
+            f'        GOTO s{i + 1} {{ T.0: ["b", MOV_R], T.1: [T.0, STAY] }}',
+            '    } ELIF (T.1 == "a") THEN {',
+            f"        GOTO s{i} {{ T.0: [T.0, MOV_L] }}",
+            "    } ELSE {",
+            f"        GOTO s{i} {{ T.0: [T.0, MOV_L] }}",
+            "    }",
+            "}",
+        ]
+    lines.append(f"s{count} {{}}")
+    return "\n".join(lines)
+
+def test_all_errors_are_reported(capsys):
+    program = parse(r'''
+[tape]
+alphabet = [a, b, _]
+T.0 = [a]
+blank = _
+
+[program]
+START s0
+END [s3, s4]
+s0 {
+    IF (T.0 == "c" || T.2 == "a") THEN {
+        GOTO s5 { T.0: ["d", MOV_R] }
+    } ELSE {
+        GOTO s1 {}
+    }
+}
+s1 {
+    IF (T.0 == "a") THEN {
+        GOTO s1 {}
+    }
+}
+s2 {
+    GOTO s6 { T.0: ["a", STAY] }
+}
+s7 {}
+''')
+    messages = [error.message for error in analyze_program(program)]
+    assert messages == [
+        "End state 's3' is undefined",
+        "End state 's4' is undefined",
+        "Value 'c' is not defined in the alphabet.",
+        "Tape T.2 is not defined",
+        "State 's5' is not defined",
+        "Value 'd' is not defined in the alphabet",
+        "Missing ELSE statement",
+        "State 's6' is not defined",
+        "State 's7' have a path that does not result in tape action.",
+    ]
+    assert not program.check_syntax()
+    output = capsys.readouterr().out
+    assert all(message in output for message in messages)
+    # the errors of the components are printed with their source lines
+    assert "GOTO s6 { T.0: [\"a\", STAY] }\nState 's6' is not defined" in output
+
+def test_valid_program():
+    program = parse(generate_program(10))
+    assert analyze_program(program) == []
+    assert program.check_syntax()
+
+def test_analysis_is_linear():
+    small = parse(generate_program(1000))
+    large = parse(generate_program(8000))
+    durations = []
+    for program in (small, large):
+        start = time.perf_counter()
+        assert analyze_program(program) == []
+        durations.append(time.perf_counter() - start)
+    # 8 times more states, the quadratic pass took 64 times longer
+    assert durations[1] < durations[0] * 24
+    assert load_from_string(generate_program(100), use_cache=False) is not None
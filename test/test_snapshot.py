@@ -0,0 +1,207 @@
+import io
+import os
+import subprocess
+import sys
+import pytest
+import src.turing_machine.snapshot as snapshot
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.engines import ENGINES, create_machine
+from src.compiler.tokenizer.tokenizer import TapeStream
+from src.turing_machine.governor import BudgetLimit, ResourceBudget
+from src.turing_machine.machine import StreamTape
+from src.turing_machine.snapshot import COMPRESSIONS, Checkpointer, load_snapshot
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+MAIN_PATH = os.path.join(os.path.dirname(__file__), "..", "main.py")
+
+# replaces the values with "b" up to the first blank cell, and moves back to the blank cell before the values
+COUNTER_CONFIG = r'''
+[tape]
+alphabet = [a, b, _]
+T.0 = [a, a, a, a, a, a, a, a, a, a]
+blank = _
+
+[program]
+START right
+END [done]
+right {
+    IF (T.0 == "_") THEN {
+        GOTO left { T.0: ["a", MOV_L] }
+    } ELSE {
+        GOTO right { T.0: ["b", MOV_R] }
+    }
+}
+left {
+    IF (T.0 == "_") THEN {
+        GOTO done { T.0: [T.0, STAY] }
+    } ELSE {
+        GOTO left { T.0: [T.0, MOV_L] }
+    }
+}
+done {}
+'''
+
+def test_snapshot_round_trip(monkeypatch):
+    # small chunks, so the cells are written and read in many slices
+    monkeypatch.setattr(snapshot, "SNAPSHOT_CHUNK_SIZE", 7)
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    for compression in COMPRESSIONS:
+        for engine, resume_engine in zip(ENGINES, reversed(list(ENGINES))):
+            machine = create_machine(config, engine)
+            assert not machine.run_auto(40)
+            data = io.BytesIO()
+            machine.snapshot(data, compression)
+
+            data.seek(0)
+            resumed = create_machine(config, resume_engine)
+            resumed.restore(data)
+            assert (resumed.state, resumed.steps, resumed.get_tape_positions()) == (machine.state, 40, machine.get_tape_positions())
+            assert resumed.get_tapes_content() == machine.get_tapes_content()
+            assert resumed.run_auto()
+            assert resumed.state == "ok_found"
+            assert resumed.get_tape_positions() == [28, 5, 3]
+            assert resumed.get_tapes_content()[2] == ["^", "0", "2", "3", "$"]
+
+def test_snapshot_of_wide_alphabet():
+    alphabet = [f"s{i}" for i in range(300)] + ["_"]
+    source = COUNTER_CONFIG.replace("alphabet = [a, b, _]", f"alphabet = [a, b, {', '.join(alphabet)}]")
+    config = load_from_string(source)
+    assert config is not None
+    assert config.symbols.typecode == "H"
+    machine = create_machine(config)
+    assert not machine.run_auto(10)
+    data = io.BytesIO()
+    machine.snapshot(data, "gzip")
+    data.seek(0)
+    resumed = create_machine(config)
+    resumed.restore(data)
+    assert resumed.get_tapes_content() == machine.get_tapes_content()
+    assert resumed.tapes[0].origin == machine.tapes[0].origin
+
+def test_invalid_snapshots():
+    machine = create_machine(load_from_string(COUNTER_CONFIG))
+    machine.run_auto(5)
+    data = io.BytesIO()
+    machine.snapshot(data)
+
+    fresh = create_machine(load_from_string(COUNTER_CONFIG))
+    with pytest.raises(Exception, match="truncated"):
+        fresh.restore(io.BytesIO(data.getvalue()[:-1]))
+    # the machine is not changed by the failed restore
+    assert (fresh.state, fresh.steps, fresh.get_tapes_content()) == ("right", 0, [["a"] * 10])
+    with pytest.raises(Exception, match="not a Turing machine snapshot"):
+        fresh.restore(io.BytesIO(b"TMCC" + data.getvalue()[4:]))
+
+    other = create_machine(load_from_file(CONFIG_PATH))
+    with pytest.raises(Exception, match="different program"):
+        other.restore(io.BytesIO(data.getvalue()))
+
+def test_checkpoints(tmp_path):
+    config = load_from_string(COUNTER_CONFIG)
+    path = os.path.join(tmp_path, "machine.snapshot")
+    machine = create_machine(config)
+    checkpointer = Checkpointer(path, every_steps=3, compression="lzma")
+    result = machine.run_governed(ResourceBudget(max_steps=10), checkpointer=checkpointer)
+    assert result.exhausted == BudgetLimit.STEPS
+    # steps 3, 6 and 9, and the final snapshot at step 10
+    assert checkpointer.saved == 4
+    assert os.listdir(tmp_path) == ["machine.snapshot"]
+
+    resumed = create_machine(config, "codegen")
+    load_snapshot(resumed, path)
+    assert resumed.steps == 10
+    assert resumed.run_governed(ResourceBudget()).finished
+    expected = create_machine(config)
+    assert expected.run_auto()
+    assert (resumed.state, resumed.steps, resumed.get_tapes_content()) == (expected.state, expected.steps, expected.get_tapes_content())
+
+def test_stream_tape_snapshot(monkeypatch):
+    monkeypatch.setattr(StreamTape, "CHUNK_SIZE", 4)
+    config = load_from_string(COUNTER_CONFIG)
+    data = b"a" * 30
+    expected = create_machine(config)
+    assert expected.run_auto()
+    for engine in ENGINES:
+        for resume_chunk_size in (4, 64):
+            config.tapes = [TapeStream(source=io.BytesIO(data))]
+            machine = create_machine(config, engine)
+            assert not machine.run_auto(10)
+            snapshot_data = io.BytesIO()
+            machine.snapshot(snapshot_data)
+            assert 4 < machine.tapes[0].read_cells < 30
+
+            # the resumed machine skips the cells of the stream restored from the snapshot, or keeps the cells
+            #    read past the position of the snapshot
+            monkeypatch.setattr(StreamTape, "CHUNK_SIZE", resume_chunk_size)
+            config.tapes = [TapeStream(source=io.BytesIO(data))]
+            resumed = create_machine(config, engine)
+            resumed.restore(io.BytesIO(snapshot_data.getvalue()))
+            monkeypatch.setattr(StreamTape, "CHUNK_SIZE", 4)
+            assert resumed.run_auto()
+            config.tapes = [TapeStream(source=io.BytesIO(data))]
+            uninterrupted = create_machine(config, engine)
+            assert uninterrupted.run_auto()
+            assert (resumed.state, resumed.steps, resumed.get_tapes_content()) == (uninterrupted.state, uninterrupted.steps, uninterrupted.get_tapes_content())
+
+            config.tapes = [TapeStream(source=io.BytesIO(data[:8]))]
+            with pytest.raises(Exception, match="Tape stream ended before the position of the snapshot"):
+                create_machine(config, engine).restore(io.BytesIO(snapshot_data.getvalue()))
+            with pytest.raises(Exception, match="not read from the same tape streams"):
+                expected.restore(io.BytesIO(snapshot_data.getvalue()))
+
+def test_mapped_tape_snapshot(tmp_path):
+    input_path = os.path.join(tmp_path, "input.bin")
+    output_path = os.path.join(tmp_path, "output.bin")
+    with open(input_path, "wb") as f:
+        f.write(b"\x00" * 10)
+    config = load_from_string(COUNTER_CONFIG.replace("T.0 = [a, a, a, a, a, a, a, a, a, a]", f'T.0 = codes("{input_path}", write, "{output_path}")'))
+    assert config is not None
+    for engine in ENGINES:
+        for stop_step in (5, 15):
+            machine = create_machine(config, engine)
+            assert not machine.run_auto(stop_step)
+            data = io.BytesIO()
+            machine.snapshot(data)
+
+            # the output file is copied again from the input file, the restored cells are written to it
+            resumed = create_machine(config, engine)
+            resumed.restore(io.BytesIO(data.getvalue()))
+            assert resumed.tapes[0].cells is resumed.tapes[0].mapped_cells
+            assert resumed.run_auto()
+            with open(output_path, "rb") as f:
+                output = f.read()
+            assert output.strip(b"\x02") == b"\x01" * 10 + b"\x00"
+            assert resumed.get_tapes_content() == [["b"] * 10 + ["a"]]
+
+def run_main(arguments: list, stdin: bytes | None = None, exit_code: int = 0) -> str:
+    # the whole tapes are displayed
+    result = subprocess.run([sys.executable, MAIN_PATH, "--no-cache", "--status-window", "0"] + arguments, input=stdin, capture_output=True, timeout=120)
+    assert result.returncode == exit_code, result.stdout.decode() + result.stderr.decode()
+    return result.stdout.decode()
+
+@pytest.mark.parametrize("tape_kind", ["memory", "mapped", "stream"])
+def test_resume_from_main(tmp_path, tape_kind):
+    input_path = os.path.join(tmp_path, "input.bin")
+    output_path = os.path.join(tmp_path, "output.bin")
+    # the stream is longer than the chunk read at once, the machine is stopped after the next chunk is read
+    data = b"\x00" * (StreamTape.CHUNK_SIZE + 100)
+    with open(input_path, "wb") as f:
+        f.write(data)
+    tape = {"memory": "[a, a, a, a, a, a, a, a, a, a]", "mapped": f'codes("{input_path}", write, "{output_path}")', "stream": "stdin(codes)"}[tape_kind]
+    source = COUNTER_CONFIG.replace("[a, a, a, a, a, a, a, a, a, a]", tape)
+    stdin = data if tape_kind == "stream" else None
+    snapshot_path = os.path.join(tmp_path, "machine.snapshot")
+
+    expected = run_main(["--input", source], stdin)
+    expected_output = open(output_path, "rb").read() if tape_kind == "mapped" else None
+    stop_step = 7 if tape_kind == "memory" else StreamTape.CHUNK_SIZE + 50
+    # the machine stopped by the steps limit exits with the code 4
+    stopped = run_main(["--input", source, "--max-steps", f"{stop_step}", "--checkpoint", snapshot_path], stdin, 4)
+    assert f"Budget exhausted (steps) after {stop_step} steps" in stopped
+    resumed = run_main(["--input", source, "--resume", snapshot_path], stdin)
+    assert f"Machine resumed at step {stop_step}:" in resumed
+    # the final configuration of the resumed run is the same as of the uninterrupted run
+    assert resumed.split("Machine initial state:")[-1].split("\n")[-4:] == expected.split("\n")[-4:]
+    if tape_kind == "mapped":
+        assert open(output_path, "rb").read() == expected_output
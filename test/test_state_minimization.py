@@ -0,0 +1,139 @@
+import random
+from src.config.config import load_from_string
+from src.config.config_cache import ConfigCache
+from src.turing_machine.engines import ENGINES, create_machine
+
+# copy_a and copy_b are the same loop, skip and unused are not reachable, done_a and done_b are the END states with the same statements
+DUPLICATES_CONFIG = r'''
+[tape]
+alphabet = [0, 1, _]
+T.0 = [1, 0, 1, 1]
+T.1 = [_]
+blank = _
+
+[program]
+START copy_a
+END [done_a, done_b]
+copy_a {
+    IF (T.0 == "_") THEN {
+        GOTO check { T.0: [T.0, MOV_L] }
+    } ELSE {
+        GOTO copy_b { T.1: [T.0, MOV_R], T.0: [T.0, MOV_R] }
+    }
+}
+copy_b {
+    IF (T.0 == "_") THEN {
+        GOTO check { T.0: [T.0, MOV_L] }
+    } ELSE {
+        GOTO copy_a { T.1: [T.0, MOV_R], T.0: [T.0, MOV_R] }
+    }
+}
+check {
+    IF (T.0 == "1") THEN {
+        GOTO done_a {}
+    } ELSE {
+        GOTO done_b {}
+    }
+}
+skip {
+    GOTO unused {}
+}
+unused {
+    GOTO copy_a {}
+}
+done_a {}
+done_b {}
+'''
+
+# a_n and b_n states differ only by the END state reached after n steps
+CHAIN_CONFIG = r'''
+[tape]
+alphabet = [0, 1]
+T.0 = [0]
+
+[program]
+START init
+END [end_a, end_b]
+init {
+    IF (T.0 == "0") THEN {
+        GOTO a_0 {}
+    } ELSE {
+        GOTO b_0 {}
+    }
+}
+%s
+end_a {}
+end_b {}
+'''
+
+def make_chain_config(length: int) -> str:
+    states = []
+    for prefix, end in [("a", "end_a"), ("b", "end_b")]:
+        for no in range(length):
+            target = f"{prefix}_{no + 1}" if no + 1 < length else end
+            states.append(f"{prefix}_{no} {{ GOTO {target} {{ T.0: [T.0, STAY] }} }}")
+    return CHAIN_CONFIG % "\n".join(states)
+
+def test_unreachable_and_equivalent_states():
+    config = load_from_string(DUPLICATES_CONFIG, use_cache=False)
+    report = config.program.minimization
+    assert report.unreachable == ["skip", "unused"]
+    assert report.merged == {"copy_b": "copy_a"}
+    assert list(config.program.nodes) == ["copy_a", "check", "done_a", "done_b"]
+    assert "Merged into copy_a: copy_b" in str(report)
+
+    full_config = load_from_string(DUPLICATES_CONFIG, use_cache=False, minimize=False)
+    assert full_config.program.minimization is None and len(full_config.program.nodes) == 7
+    for engine in ENGINES:
+        minimized = create_machine(config, engine)
+        full = create_machine(full_config, engine)
+        assert minimized.run_auto() and full.run_auto()
+        assert (minimized.state, minimized.steps, minimized.get_tapes_content()) == (full.state, full.steps, full.get_tapes_content())
+        assert minimized.state == "done_a"
+
+def test_states_leading_to_different_end_states_are_kept():
+    config = load_from_string(make_chain_config(50), use_cache=False)
+    assert config.program.minimization.get_removed_count() == 0
+    machine = create_machine(config)
+    assert machine.run_auto() and (machine.state, machine.steps) == ("end_a", 51)
+
+def test_random_programs_run_the_same():
+    rng = random.Random(7)
+    merged_count = 0
+    for _ in range(20):
+        # few distinct statements, so many of the states are equivalent
+        bodies = [(rng.choice(["0", "1"]), rng.choice(["MOV_L", "MOV_R", "STAY"]), rng.choice(["0", "1"])) for _ in range(3)]
+        count = rng.randrange(5, 40)
+        states = []
+        for no in range(count):
+            value, move, written = rng.choice(bodies)
+            states.append(f's{no} {{\n    IF (T.0 == "{value}") THEN {{\n        GOTO {rng.choice(["halt", f"s{rng.randrange(count)}"])} {{ T.0: ["{written}", {move}] }}\n'
+                          f'    }} ELSE {{\n        GOTO s{rng.randrange(count)} {{ T.0: [T.0, MOV_R] }}\n    }}\n}}')
+        source = f"[tape]\nalphabet = [0, 1]\nT.0 = [0, 1, 1, 0]\nblank = 0\n\n[program]\nSTART s0\nEND [halt]\n" + "\n".join(states) + "\nhalt {}\n"
+        config = load_from_string(source, use_cache=False)
+        merged = config.program.minimization.merged
+        merged_count += len(merged)
+        full = create_machine(load_from_string(source, use_cache=False, minimize=False), accelerate_sweeps=False)
+        for engine in ENGINES:
+            minimized = create_machine(config, engine, accelerate_sweeps=False)
+            full.reset()
+            for _ in range(300):
+                assert minimized.state == merged.get(full.state, full.state)
+                assert minimized.get_tapes_content() == full.get_tapes_content()
+                if full.state == "halt":
+                    break
+                full.step()
+                minimized.step()
+    assert merged_count > 0
+
+def test_cached_minimized_program(tmp_path):
+    cache = ConfigCache(str(tmp_path))
+    cache.store(DUPLICATES_CONFIG, load_from_string(DUPLICATES_CONFIG, use_cache=False))
+    cache.store(DUPLICATES_CONFIG, load_from_string(DUPLICATES_CONFIG, use_cache=False, minimize=False), minimize=False)
+    for cache in [cache, ConfigCache(str(tmp_path))]:
+        config = cache.load(DUPLICATES_CONFIG)
+        assert config.program.minimization.merged == {"copy_b": "copy_a"}
+        assert list(config.program.nodes) == ["copy_a", "check", "done_a", "done_b"]
+        assert len(cache.load(DUPLICATES_CONFIG, minimize=False).program.nodes) == 7
+        machine = create_machine(config)
+        assert machine.run_auto() and machine.state == "done_a"
@@ -0,0 +1,102 @@
+import io
+import pytest
+from src.config.config import load_from_string
+from src.turing_machine.engines import create_machine
+from src.turing_machine.machine import RED_BOLD, RESET
+from src.turing_machine.status_renderer import StatusRenderer
+
+# moves the head to the right until the blank cell, then stops
+SCAN_CONFIG = r'''
+[tape]
+alphabet = [0, 1, _]
+T.0 = [%s]
+T.1 = [1, 0, 1]
+blank = _
+
+[program]
+START scan
+END [done]
+scan {
+    IF (T.0 == "_") THEN {
+        GOTO done {}
+    } ELSE {
+        GOTO scan { T.0: [T.0, MOV_R] }
+    }
+}
+done {}
+'''
+
+def make_machine(cells: int):
+    config = load_from_string(SCAN_CONFIG % ", ".join(["0", "1"] * (cells // 2)), use_cache=False)
+    return create_machine(config, accelerate_sweeps=False)
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self) -> float:
+        return self.time
+
+def test_window_around_the_heads():
+    machine = make_machine(10000)
+    machine.run_auto(1001)
+    renderer = StatusRenderer(window=3)
+    assert renderer.render_tape(machine.tapes[0]) == f"[..., 0, 1, 0, {RED_BOLD}1{RESET}, 0, 1, 0, ...]"
+    # the window of the short tape matches the whole tape
+    assert renderer.render_tape(machine.tapes[1]) == str(machine.tapes[1])
+    machine.run_auto()
+    # the blank cells after the end of the tape are not shown
+    assert renderer.render_tape(machine.tapes[0]) == f"[..., 1, 0, 1, {RED_BOLD}_{RESET}]"
+    assert StatusRenderer(window=None).render(machine) == StatusRenderer().render(machine, full=True)
+    assert "Head Positions: 10000 | 0\nCurrent State: done\n" in renderer.render(machine)
+
+def test_rendered_windows_are_cached():
+    machine = make_machine(1000)
+    renderer = StatusRenderer(window=2)
+    for _ in range(100):
+        machine.step()
+        renderer.render(machine)
+    # T.1 is not changed, the windows of T.0 repeat every 2 steps after the first 2 steps (the window is not cut on the left)
+    assert len(renderer.segments) == 5
+    renderer.render(machine)
+    assert len(renderer.segments) == 5
+
+def test_rate_limit():
+    machine = make_machine(20)
+    output = io.StringIO()
+    clock = FakeClock()
+    renderer = StatusRenderer(output, max_rate=10, clock=clock)
+    assert renderer.show(machine)
+    assert not renderer.show(machine)
+    clock.time = 0.1
+    assert renderer.show(machine)
+    assert not renderer.show(machine)
+    assert renderer.show(machine, force=True)
+    assert output.getvalue().count("Current State:") == 3
+
+    # the run writes only the first and the final status (the clock is stopped)
+    output = io.StringIO()
+    machine.status_renderer = StatusRenderer(output, max_rate=10, clock=clock)
+    machine.run()
+    statuses = output.getvalue().split("Tapes: ")[1:]
+    assert len(statuses) == 2
+    assert statuses[1].endswith("Current State: done\n")
+
+    with pytest.raises(Exception):
+        StatusRenderer(max_rate=0)
+    with pytest.raises(Exception):
+        StatusRenderer(window=-1)
+
+def test_cells_outside_of_the_window_are_scanned_in_chunks(monkeypatch):
+    monkeypatch.setattr(StatusRenderer, "BLANK_SCAN_CHUNK", 3)
+    machine = make_machine(2)
+    tape = machine.tapes[0]
+    symbols = tape.symbols
+    tape.cells = symbols.fill_cells(tape.blank, 50)
+    tape.head = 30
+    renderer = StatusRenderer(window=2)
+    assert renderer.render_tape(tape) == f"[{RED_BOLD}_{RESET}]"
+    tape.cells[1] = symbols.encode("1")
+    assert renderer.render_tape(tape) == f"[..., _, _, {RED_BOLD}_{RESET}]"
+    tape.cells[48] = symbols.encode("0")
+    assert renderer.render_tape(tape) == f"[..., _, _, {RED_BOLD}_{RESET}, _, _, ...]"
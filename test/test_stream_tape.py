@@ -0,0 +1,109 @@
+import io
+import itertools
+import sys
+import pytest
+from array import array
+from src.config.config import load_from_string
+from src.compiler.tokenizer.tokenizer import TapeStream
+from src.turing_machine.engines import ENGINES, create_machine
+from src.turing_machine.governor import BudgetLimit, ResourceBudget
+from src.turing_machine.machine import StreamTape
+
+# finds the first "x" and marks it with "y"
+FIND_CONFIG = r'''
+[tape]
+alphabet = [a, b, x, y, _]
+T.0 = TAPE
+blank = _
+
+[program]
+START find
+END [found, missing]
+find {
+    IF (T.0 == "x") THEN {
+        GOTO found { T.0: ["y", STAY] }
+    } ELIF (T.0 == "_") THEN {
+        GOTO missing {}
+    } ELSE {
+        GOTO find { T.0: [T.0, MOV_R] }
+    }
+}
+found {}
+missing {}
+'''
+
+def test_iterator_tape_is_read_lazily(monkeypatch):
+    monkeypatch.setattr(StreamTape, "CHUNK_SIZE", 16)
+    config = load_from_string(FIND_CONFIG.replace("TAPE", "[a]"))
+    assert config is not None
+    for engine in ENGINES:
+        # infinite input, the machine stops at the first "x"
+        symbols = itertools.chain(["a", "b"] * 100, ["x"], itertools.cycle("ab"))
+        config.tapes = [TapeStream(source=symbols)]
+        machine = create_machine(config, engine)
+        assert isinstance(machine.tapes[0], StreamTape)
+        assert machine.run_auto()
+        assert machine.state == "found"
+        assert machine.get_tape_positions() == [200]
+        # only the chunks up to the head were read
+        assert len(machine.tapes[0].cells) <= 216
+        assert machine.tapes[0].get_value() == config.symbols.encode("y")
+
+def test_binary_streams():
+    for engine in ENGINES:
+        config = load_from_string(FIND_CONFIG.replace("TAPE", "[a]"))
+        config.tapes = [TapeStream(source=io.BytesIO(b"ab" * 50000 + b"a"))]
+        machine = create_machine(config, engine)
+        assert machine.run_auto()
+        assert (machine.state, machine.steps) == ("missing", 100002)
+        assert machine.get_tapes_content() == [["a", "b"] * 50000 + ["a"]]
+
+        codes = array("H", [0, 1, 0, 2])
+        config = load_from_string(FIND_CONFIG.replace("TAPE", "[a]").replace("[a, b, x, y, _]", f"[a, b, x, y, _, {', '.join(f's{i}' for i in range(300))}]"))
+        config.tapes = [TapeStream(source=io.BytesIO(codes.tobytes()), format="codes")]
+        machine = create_machine(config, engine)
+        assert machine.run_auto()
+        assert machine.get_tapes_content() == [["a", "b", "a", "y"]]
+
+def test_stdin_tape(monkeypatch):
+    config = load_from_string(FIND_CONFIG.replace("TAPE", "stdin()"), use_cache=False)
+    assert config is not None
+    assert config.tapes == [TapeStream()]
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(b"aabxa")))
+    machine = create_machine(config)
+    assert machine.run_auto()
+    assert machine.get_tapes_content() == [["a", "a", "b", "y", "a"]]
+
+def test_stream_tape_cycle_detection():
+    for engine in ENGINES:
+        config = load_from_string(FIND_CONFIG.replace("TAPE", "[a]"))
+        config.tapes = [TapeStream(source=iter("ab" * 100 + "x"))]
+        machine = create_machine(config, engine)
+        position = machine.tapes[0].reader.position
+        for run in (lambda: machine.run_auto(detect_cycles=True), lambda: machine.run_governed(ResourceBudget(), detect_cycles=True)):
+            with pytest.raises(Exception, match="Cycles can't be detected"):
+                run()
+        # the stream was not read, the machine can still run
+        assert machine.tapes[0].reader.position == position
+        assert machine.run_auto()
+        assert (machine.state, machine.get_tape_positions()) == ("found", [200])
+
+def test_stream_errors(monkeypatch, capsys):
+    monkeypatch.setattr(StreamTape, "CHUNK_SIZE", 64)
+    config = load_from_string(FIND_CONFIG.replace("TAPE", "[a]"))
+    config.tapes = [TapeStream(source=io.BytesIO(b"ab" * 100 + b"z"))]
+    with pytest.raises(Exception, match="Value 'z' is not defined in the alphabet"):
+        create_machine(config).run_auto()
+
+    config.tapes = [TapeStream(source=iter("ab" * 100000))]
+    machine = create_machine(config)
+    result = machine.run_governed(ResourceBudget(max_tape_cells=1000))
+    assert result.exhausted == BudgetLimit.TAPE_CELLS
+    assert len(machine.tapes[0].cells) == 1000
+    # the initial tape is cloned, but the stream was already read by the first run
+    machine.reset()
+    with pytest.raises(Exception, match="already read"):
+        machine.run_auto()
+
+    assert load_from_string(FIND_CONFIG.replace("TAPE", "stdin()\nT.1 = stdin()"), use_cache=False) is None
+    assert "Only one tape can be read from the standard input" in capsys.readouterr().out
@@ -0,0 +1,145 @@
+import os
+import random
+from src.config.config import load_from_file, load_from_string
+from src.compiler.optimizer.sweep_analysis import SweepState, find_sweep_states
+from src.turing_machine.ast_turing_machine import ASTTuringMachine
+from src.turing_machine.engines import ENGINES, create_machine
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+SWEEP_CONFIG = r'''
+[tape]
+alphabet = [a, b, c, d, e, f, x, _]
+T.0 = [_, a, b, c, d, e, f, a, b, c, x, a, b, _]
+T.1 = [a, b]
+blank = _
+
+[program]
+START right
+END [done]
+right {
+    IF (T.0 == "x" || T.0 == "_") THEN {
+        GOTO left { T.0: ["_", MOV_L] }
+    } ELIF (T.1 == "b") THEN {
+        GOTO right { T.0: [T.0, MOV_R] }
+    } ELSE {
+        GOTO right {
+            T.0: [T.0, MOV_R],
+            T.1: ["b", STAY],
+        }
+    }
+}
+left {
+    IF (T.0 == "_") THEN {
+        GOTO done { T.0: ["x", STAY] }
+    } ELSE {
+        GOTO left { T.0: [T.0, MOV_L] }
+    }
+}
+done {}
+'''
+
+def run_machine(machine: ASTTuringMachine, max_steps: int | None = None) -> tuple:
+    error = None
+    finished = None
+    try:
+        finished = machine.run_auto(max_steps)
+    except Exception as e:
+        error = f"{e}"
+    return (machine.state, machine.steps, machine.get_tapes_content(), machine.get_tape_positions(), finished, error)
+
+def test_find_sweep_states():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    assert find_sweep_states(config.program) == {"move_to_end_tape_2": SweepState(tape=2, move=1, read_tapes=[])}
+
+    config = load_from_string(SWEEP_CONFIG)
+    assert config is not None
+    assert find_sweep_states(config.program) == {
+        "right": SweepState(tape=0, move=1, read_tapes=[1]),
+        "left": SweepState(tape=0, move=-1, read_tapes=[]),
+    }
+
+def test_sweep_matches_step_by_step_execution():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+
+    rng = random.Random(7)
+    for _ in range(50):
+        text = [rng.choice("abt_e") for _ in range(rng.randint(0, 30))]
+        pattern = [rng.choice("abte") for _ in range(rng.randint(1, 3))]
+        config.tapes = [["^"] + text + ["$"], ["^"] + pattern + ["$"], ["^"] + ["0"] * rng.randint(1, 300) + ["$"]]
+        for engine in ENGINES:
+            expected = run_machine(create_machine(config, engine, accelerate_sweeps=False))
+            assert run_machine(create_machine(config, engine)) == expected
+            for max_steps in (5, 150, 301):
+                expected = run_machine(create_machine(config, engine, accelerate_sweeps=False), max_steps)
+                assert run_machine(create_machine(config, engine), max_steps) == expected
+
+def test_sweep_skips_steps_on_long_tapes():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    config.tapes = [["^", "t", "e", "s", "t", "$"], ["^", "t", "e", "s", "t", "$"], ["^"] + ["0"] * 5000 + ["$"]]
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert machine.run_auto()
+        assert machine.state == "ok_found"
+        assert machine.sweep is not None
+        assert machine.sweep.skipped_steps >= 5000
+
+def test_sweep_both_directions_and_growable_tapes():
+    config = load_from_string(SWEEP_CONFIG)
+    assert config is not None
+
+    rng = random.Random(3)
+    for length in (0, 1, 10, 300, 2000):
+        # without the leading blank, the left sweep grows the tape
+        config.tapes = [rng.choice([["_"], []]) + [rng.choice("abcdef") for _ in range(length)] + [rng.choice("x_")] + ["a", "b"], [rng.choice("ab"), "b"]]
+        for engine in ENGINES:
+            expected = run_machine(create_machine(config, engine, accelerate_sweeps=False))
+            assert run_machine(create_machine(config, engine)) == expected
+            assert run_machine(create_machine(config, engine, max_tape_size=length + 6)) == \
+                run_machine(create_machine(config, engine, max_tape_size=length + 6, accelerate_sweeps=False))
+            for max_steps in (1, length // 2 + 1, length + 2):
+                expected = run_machine(create_machine(config, engine, accelerate_sweeps=False), max_steps)
+                assert run_machine(create_machine(config, engine), max_steps) == expected
+
+def test_sweep_many_terminators():
+    alphabet = [f"s{i}" for i in range(40)]
+    config = load_from_string(f'''
+[tape]
+alphabet = [{", ".join(alphabet)}]
+T.0 = [s0]
+
+[program]
+START scan
+END [done]
+scan {{
+    IF (T.0 == "s0" || T.0 == "s1") THEN {{
+        GOTO scan {{ T.0: [T.0, MOV_R] }}
+    }} ELSE {{
+        GOTO done {{}}
+    }}
+}}
+done {{}}
+''')
+    assert config is not None
+
+    rng = random.Random(5)
+    for _ in range(20):
+        config.tapes = [[rng.choice(["s0", "s1"]) for _ in range(rng.randint(0, 1000))] + [rng.choice(alphabet)] + ["s0"]]
+        for engine in ENGINES:
+            expected = run_machine(create_machine(config, engine, accelerate_sweeps=False))
+            assert run_machine(create_machine(config, engine)) == expected
+
+def test_sweep_wide_alphabet():
+    # the tape cells are stored in array('H') and the terminators have codes greater than 255
+    alphabet = [f"s{i}" for i in range(300)]
+    config = load_from_string(SWEEP_CONFIG.replace("alphabet = [a, b, c, d, e, f, x, _]", f"alphabet = [a, b, c, d, e, f, {', '.join(alphabet)}, x, _]"))
+    assert config is not None
+    assert config.symbols.typecode == "H"
+    config.tapes = [["a", "b", "c"] * 500 + ["x", "a", "b"], ["a", "b"]]
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        assert run_machine(machine) == run_machine(create_machine(config, engine, accelerate_sweeps=False))
+        assert machine.sweep.skipped_steps > 0
@@ -0,0 +1,78 @@
+import os
+from src.config.config import load_from_file, load_from_string
+from src.compiler.optimizer.tape_access import WritePlan, get_tape_access
+from src.compiler.parser.node.goto_node import GotoNode
+from src.turing_machine.engines import ENGINES, create_machine
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+# copies T.0 to T.1 on the machine with 24 tapes, the other tapes are never accessed
+WIDE_CONFIG = r'''
+[tape]
+alphabet = [a, b, _]
+T.0 = [a, b, b, a]
+T.1 = [_]
+%s
+blank = _
+
+[program]
+START copy
+END [done]
+copy {
+    IF (T.0 == "_") THEN {
+        GOTO done {}
+    } ELSE {
+        GOTO copy {
+            T.0: [T.0, MOV_R],
+            T.1: [T.0, MOV_R],
+        }
+    }
+}
+done {}
+'''
+
+def test_read_tapes_and_write_plans():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    access = get_tape_access(config.program)
+    assert access.read_tapes["check_initial_conditions"] == (0, 1, 2)
+    assert access.read_tapes["search"] == (0, 1)
+    assert access.read_tapes["increment_t2"] == (2,)
+    assert access.read_tapes["ok_found"] == ()
+
+    plans = [access.plans[id(node.encoded_result)] for node in config.program.nodes["search"].get_nodes() if isinstance(node, GotoNode)]
+    # the identity writes are skipped, only the moved tapes are moved
+    assert plans == [WritePlan((), ()), WritePlan((), ((0, 1), (1, 1))), WritePlan((), ((1, -1),))]
+    one = config.symbols.encode("1")
+    plan = next(access.plans[id(node.encoded_result)] for node in config.program.nodes["increment_t2"].get_nodes() if isinstance(node, GotoNode))
+    assert plan == WritePlan(((2, one, None),), ())
+
+def test_untouched_tapes_are_not_accessed():
+    source = WIDE_CONFIG % "\n".join(f"T.{tape_id} = [a]" for tape_id in range(2, 24))
+    config = load_from_string(source, use_cache=False)
+    access = get_tape_access(config.program)
+    assert access.read_tapes["copy"] == (0,)
+
+    for engine in ENGINES:
+        machine = create_machine(config, engine, accelerate_sweeps=False)
+        # the cells of the untouched tapes can't be indexed
+        for tape in machine.tapes[2:]:
+            tape.cells = None
+        if engine == "interpreter":
+            while machine.state != "done":
+                machine.step()
+            # the transitions are cached by the value of T.0 only
+            assert sorted(key[1] for key in machine.transition_cache.entries) == [(0,), (1,), (2,)]
+        else:
+            assert machine.run_auto()
+        assert machine.steps == 5
+        assert [tape.get_content() for tape in machine.tapes[:2]] == [["a", "b", "b", "a"], ["a", "b", "b", "a"]]
+
+def test_run_state_returns_all_tapes():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+    machine = create_machine(config)
+    caret = config.symbols.encode("^")
+    zero = config.symbols.encode("0")
+    assert machine.run_state("increment_t2", [caret, caret, zero]) == ("move_to_end_tape_2", [caret, caret, config.symbols.encode("1")], [0, 0, 0])
+    assert machine.run_state("search", [caret, caret, zero]) == ("match", [caret, caret, zero], [1, 1, 0])
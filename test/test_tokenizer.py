@@ -0,0 +1,42 @@
+from typing import List
+from src.compiler.tokenizer.tokenizer import SectionLine, Token, TokenizerSection, __tokenize_program_section__ as tokenize_program_section
+
+def tokenize_lines(lines: List[str]) -> List[tuple] | None:
+    section = TokenizerSection(name="program", content=[SectionLine(no=no + 1, value=line) for no, line in enumerate(lines)])
+    program = tokenize_program_section(section)
+    if program is None:
+        return None
+    return [(token.token, token.value, token.line.no) for token in program.tokens]
+
+def test_program_tokens():
+    assert tokenize_lines(['START s0', 'IF (T.0=="A"||T.1 != T.2&&T.0 == "b") THEN {', 'GOTO s1 {T.0: ["\\"", MOV_R], T.1:[T.1,stay]}}']) == [
+        (Token.START, None, 1), (Token.VAR, "s0", 1),
+        (Token.IF, None, 2), (Token.GROUP_START, None, 2), (Token.VAR, "t.0", 2), (Token.EQUAL, None, 2), (Token.CONST, "a", 2),
+        (Token.OR, None, 2), (Token.VAR, "t.1", 2), (Token.NOT_EQUAL, None, 2), (Token.VAR, "t.2", 2), (Token.AND, None, 2),
+        (Token.VAR, "t.0", 2), (Token.EQUAL, None, 2), (Token.CONST, "b", 2), (Token.GROUP_END, None, 2), (Token.THEN, None, 2),
+        (Token.SECTION_START, None, 2),
+        (Token.GOTO, None, 3), (Token.VAR, "s1", 3), (Token.SECTION_START, None, 3), (Token.VAR, "t.0", 3), (Token.ASSIGN, None, 3),
+        (Token.TAB_START, None, 3), (Token.CONST, "\\\"", 3), (Token.SEPARATOR, None, 3), (Token.MOV_R, None, 3), (Token.TAB_END, None, 3),
+        (Token.SEPARATOR, None, 3), (Token.VAR, "t.1", 3), (Token.ASSIGN, None, 3), (Token.TAB_START, None, 3), (Token.VAR, "t.1", 3),
+        (Token.SEPARATOR, None, 3), (Token.STAY, None, 3), (Token.TAB_END, None, 3), (Token.SECTION_END, None, 3), (Token.SECTION_END, None, 3),
+    ]
+
+def test_keywords_are_whole_words():
+    # only the values (MOV_L, MOV_R, STAY) are recognized inside the words
+    assert tokenize_lines(['}else{ goto{ mov_l]']) == [
+        (Token.SECTION_END, None, 1), (Token.VAR, "else", 1), (Token.SECTION_START, None, 1),
+        (Token.VAR, "goto", 1), (Token.SECTION_START, None, 1), (Token.MOV_L, None, 1), (Token.TAB_END, None, 1),
+    ]
+
+def test_operators_are_matched_from_the_left(capsys):
+    assert tokenize_lines(['a ==', '!= &&b||']) == [
+        (Token.VAR, "a", 1), (Token.EQUAL, None, 1), (Token.NOT_EQUAL, None, 2), (Token.AND, None, 2), (Token.VAR, "b", 2), (Token.OR, None, 2),
+    ]
+    assert tokenize_lines(['a ===']) is None
+    assert "Restricted token '=' found in the value." in capsys.readouterr().out
+
+def test_tokenizer_errors(capsys):
+    assert tokenize_lines(['GOTO a&b']) is None
+    assert capsys.readouterr().out == "Failed to tokenize the program at line '1: GOTO a&b' Restricted token '&' found in the value.\n"
+    assert tokenize_lines(['x', 'T.0 == "a"b"']) is None
+    assert capsys.readouterr().out == "Failed to tokenize the program at line '2: T.0 == \"a\"b\"' Found unescaped character '\"' inside constant value definition.\n"
@@ -0,0 +1,136 @@
+import os
+import pytest
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.engines import ENGINES, create_machine
+from src.turing_machine.governor import ResourceBudget
+from src.turing_machine.trace import TRACE_COMPRESSIONS, TraceRecorder
+from src.turing_machine.trace_replay import TraceReader
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+# binary counter on T.0 (the tape grows to the left), T.1 copies the last counter digit
+COUNTER_CONFIG = r'''
+[tape]
+alphabet = [0, 1, _]
+T.0 = [0, 0, 0, 0, 0]
+T.1 = [_]
+blank = _
+
+[program]
+START right
+END [done]
+right {
+    IF (T.0 == "_") THEN {
+        GOTO inc { T.0: [T.0, MOV_L], T.1: [T.1, MOV_R] }
+    } ELSE {
+        GOTO right { T.0: [T.0, MOV_R] }
+    }
+}
+inc {
+    IF (T.0 == "1") THEN {
+        GOTO inc { T.0: ["0", MOV_L] }
+    } ELIF (T.0 == "0") THEN {
+        GOTO right { T.0: ["1", MOV_R], T.1: [T.0, STAY] }
+    } ELSE {
+        GOTO done {}
+    }
+}
+done {}
+'''
+
+def get_configurations(config) -> dict:
+    machine = create_machine(config, accelerate_sweeps=False)
+    configurations = {}
+    while True:
+        configurations[machine.steps] = (machine.state, machine.get_tape_positions(), machine.get_tapes_content())
+        if machine.state in machine.final_states:
+            return configurations
+        machine.step()
+
+def record(config, path: str, engine: str, **options):
+    machine = create_machine(config, engine)
+    with TraceRecorder.open(path, **options) as recorder:
+        assert machine.run_traced(recorder)
+    return machine
+
+def test_replay_matches_the_run(tmp_path):
+    config = load_from_string(COUNTER_CONFIG, use_cache=False)
+    expected = get_configurations(config)
+    path = str(tmp_path / "run.trace")
+    for engine in ENGINES:
+        for compression in TRACE_COMPRESSIONS:
+            machine = record(config, path, engine, compression=compression, keyframe_interval=50)
+            with TraceReader.open(path) as reader:
+                assert reader.get_first_step() == 0
+                assert reader.get_last_step() == machine.steps
+                assert len(reader.chunks) == machine.steps // 50 + 1
+                steps = []
+                for frame in reader.replay():
+                    assert expected[frame.step] == (frame.state, frame.get_tape_positions(), frame.get_tapes_content())
+                    steps.append(frame.step)
+                assert steps == list(range(machine.steps + 1))
+                frame = reader.seek(123)
+                assert (frame.step, frame.state, frame.get_tapes_content()) == (123, expected[123][0], expected[123][2])
+
+def test_sampled_trace(tmp_path):
+    config = load_from_string(COUNTER_CONFIG, use_cache=False)
+    expected = get_configurations(config)
+    path = str(tmp_path / "run.trace")
+    for engine in ENGINES:
+        machine = record(config, path, engine, sample_interval=7, keyframe_interval=10)
+        with TraceReader.open(path) as reader:
+            steps = [frame.step for frame in reader.replay() if expected[frame.step] == (frame.state, frame.get_tape_positions(), frame.get_tapes_content())]
+            # the last record contains the remaining steps
+            assert steps == list(range(0, machine.steps, 7)) + [machine.steps]
+            assert reader.seek(100).step == 98
+
+def test_keyframes_store_only_the_changed_cells(tmp_path):
+    # the counter runs next to the large tape it never reads, only the first keyframe contains its cells
+    size = 50000
+    config = load_from_string(COUNTER_CONFIG.replace("T.1 = [_]", "T.1 = [_]\nT.2 = [" + ", ".join(["1"] * size) + "]"), use_cache=False)
+    expected = get_configurations(config)
+    path = str(tmp_path / "run.trace")
+    for engine in ENGINES:
+        machine = record(config, path, engine, compression="none", keyframe_interval=10)
+        with TraceReader.open(path) as reader:
+            assert len(reader.chunks) > 10
+            assert [chunk.is_full for chunk in reader.chunks].count(True) == 1
+            assert os.path.getsize(path) < 2 * size
+            assert [frame.step for frame in reader.replay()] == list(range(machine.steps + 1))
+            for step in [machine.steps, 7, 55, 54, 100, 0]:
+                frame = reader.seek(step)
+                assert expected[step] == (frame.state, frame.get_tape_positions(), frame.get_tapes_content())
+
+def test_governed_traced_run(tmp_path):
+    config = load_from_file(CONFIG_PATH)
+    expected = get_configurations(config)
+    path = str(tmp_path / "run.trace")
+    for engine in ENGINES:
+        machine = create_machine(config, engine)
+        with TraceRecorder.open(path, "zlib") as recorder:
+            assert not machine.run_governed(ResourceBudget(max_steps=40, check_interval=16), recorder=recorder).finished
+            # the steps run without the recorder start the new chunk
+            machine.run_auto(60)
+            assert machine.run_governed(ResourceBudget(), recorder=recorder).finished
+        with TraceReader.open(path) as reader:
+            assert [chunk.first_step for chunk in reader.chunks] == [0, 60]
+            assert [frame.step for frame in reader.replay(35, 65)] == [35, 36, 37, 38, 39, 40, 60, 61, 62, 63, 64, 65]
+            assert reader.seek(50).step == 40
+            frame = reader.seek(10 ** 6)
+            assert (frame.step, frame.state, frame.get_tapes_content()) == (machine.steps, "ok_found", expected[machine.steps][2])
+
+def test_invalid_traces(tmp_path):
+    path = tmp_path / "run.trace"
+    path.write_bytes(b"TMSN")
+    with pytest.raises(Exception):
+        TraceReader.open(str(path))
+    with pytest.raises(Exception):
+        TraceRecorder(open(str(path), "wb"), "gzip")
+
+    # the chunk written partially is ignored
+    config = load_from_string(COUNTER_CONFIG, use_cache=False)
+    machine = record(config, str(path), "interpreter", keyframe_interval=100)
+    data = path.read_bytes()
+    path.write_bytes(data[:-10])
+    with TraceReader.open(str(path)) as reader:
+        assert reader.get_last_step() == machine.steps // 100 * 100
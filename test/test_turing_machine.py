@@ -0,0 +1,171 @@
+import os
+from array import array
+from typing import List
+import pytest
+from src.config.config import load_from_file, load_from_string
+from src.turing_machine.ast_turing_machine import ASTTuringMachine
+from src.turing_machine.transition_cache import TransitionCache
+from src.turing_machine.machine import GrowableTape
+from src.compiler.symbol_table import SymbolTable
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+def run_machine(machine: ASTTuringMachine) -> tuple[str, List[List[str]], List[int]]:
+    machine.run_auto()
+    return (machine.state, machine.get_tapes_content(), machine.get_tape_positions())
+
+def test_transition_cache_gives_the_same_result_as_tree_walk():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+
+    uncached = ASTTuringMachine(config, cache_size=0)
+    assert uncached.transition_cache is None
+    cached = ASTTuringMachine(config)
+    assert cached.transition_cache is not None
+
+    assert run_machine(uncached) == run_machine(cached)
+    assert cached.state == "ok_found"
+    assert cached.transition_cache.hits > 0
+
+def test_transition_cache_bounded_size():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+
+    reference = ASTTuringMachine(config, cache_size=0)
+    machine = ASTTuringMachine(config, cache_size=2)
+
+    assert run_machine(reference) == run_machine(machine)
+    assert machine.transition_cache is not None
+    assert len(machine.transition_cache) == 2
+    assert machine.transition_cache.evictions > 0
+
+def test_transition_cache_lru_eviction():
+    cache = TransitionCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.hits == 3
+    assert cache.misses == 1
+    assert cache.hit_rate() == 0.75
+
+def test_transition_cache_repeated_states():
+    config = load_from_string(r'''
+[tape]
+alphabet = [0, 1, $]
+T.0 = [0, 0, 0, 0, 0, 0, 0, 0, $]
+
+[program]
+START s0
+END done
+s0 {
+    IF (T.0 == "$") THEN {
+        GOTO done {}
+    } ELSE {
+        GOTO s0 {
+            T.0: ["1", MOV_R],
+        }
+    }
+}
+done {}
+''')
+    assert config is not None
+
+    machine = ASTTuringMachine(config)
+    machine.run_auto()
+
+    assert machine.state == "done"
+    assert machine.tapes[0].get_content() == ["1", "1", "1", "1", "1", "1", "1", "1", "$"]
+    assert machine.transition_cache is not None
+    assert machine.transition_cache.misses == 2
+    assert machine.transition_cache.hits == 7
+
+def test_symbol_table_encoding():
+    symbols = SymbolTable(["^", "a", "b", "$"])
+    cells = symbols.encode_tape(["^", "b", "a", "$"])
+
+    assert isinstance(cells, bytearray)
+    assert list(cells) == [0, 2, 1, 3]
+    assert symbols.decode_tape(cells) == ["^", "b", "a", "$"]
+
+    large_symbols = SymbolTable([f"s{i}" for i in range(300)])
+    large_cells = large_symbols.encode_tape(["s0", "s299"])
+    assert isinstance(large_cells, array)
+    assert large_cells.typecode == 'H'
+    assert list(large_cells) == [0, 299]
+
+def test_machine_tapes_are_encoded():
+    config = load_from_file(CONFIG_PATH)
+    assert config is not None
+
+    machine = ASTTuringMachine(config)
+    assert all(isinstance(tape.cells, bytearray) for tape in machine.tapes)
+    assert machine.get_tapes_content() == config.tapes
+
+    machine.run_auto()
+    assert machine.get_tapes_content()[2] == ["^", "0", "2", "3", "$"]
+
+BLANK_TAPE_CONFIG = r'''
+[tape]
+alphabet = [0, 1, _]
+blank = _
+T.0 = [1, 1]
+
+[program]
+START go_left
+END done
+go_left {
+    IF (T.0 == "_") THEN {
+        GOTO go_right { T.0: ["0", MOV_R] }
+    } ELSE {
+        GOTO go_left { T.0: [T.0, MOV_L] }
+    }
+}
+go_right {
+    IF (T.0 == "_") THEN {
+        GOTO done { T.0: ["0", MOV_L] }
+    } ELSE {
+        GOTO go_right { T.0: [T.0, MOV_R] }
+    }
+}
+done {}
+'''
+
+def test_growable_tape_grows_in_both_directions():
+    config = load_from_string(BLANK_TAPE_CONFIG)
+    assert config is not None
+    assert config.blank == "_"
+
+    machine = ASTTuringMachine(config)
+    machine.run_auto()
+
+    assert machine.state == "done"
+    assert machine.get_tapes_content() == [["0", "1", "1", "0"]]
+    assert machine.get_tape_positions() == [1]
+
+def test_growable_tape_max_size():
+    config = load_from_string(BLANK_TAPE_CONFIG)
+    assert config is not None
+
+    machine = ASTTuringMachine(config, max_tape_size=3)
+    with pytest.raises(Exception, match="maximum tape size"):
+        machine.run_auto()
+
+def test_growable_tape_trims_blanks():
+    symbols = SymbolTable(["_", "a"])
+    tape = GrowableTape(symbols.encode_tape(["_", "a", "_"]), symbols, symbols.encode("_"))
+    for _ in range(200):
+        tape.move_left()
+    assert tape.get_position() == -200
+    assert len(tape.cells) >= 203
+    assert tape.get_content() == ["a"]
+    tape.set_value(symbols.encode("a"))
+    assert tape.get_content() == ["a"] + ["_"] * 200 + ["a"]
+
+def test_blank_symbol_must_be_in_alphabet():
+    config = load_from_string(BLANK_TAPE_CONFIG.replace("blank = _", "blank = x"))
+    assert config is None